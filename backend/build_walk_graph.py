@@ -0,0 +1,210 @@
+# backend/build_walk_graph.py - 보행 그래프 오프라인 빌드 (배포 전 실행, 서빙 프로세스는 결과 파일만 로드)
+#
+# 사용 예:
+#   OSM_DB_HOST=... OSM_DB_PASSWORD=... python build_walk_graph.py
+#   python build_walk_graph.py --pbf south-korea-latest.osm.pbf --output cache/walk_network.bin
+
+import argparse
+import logging
+import os
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from contraction_hierarchy import ContractionHierarchy
+from graph_store import save_arrays
+from osm_ingest import INGEST_BATCH_ROWS, ingest_network
+from simple_osm_routing import (
+    CACHE_VERSION,
+    HIGHWAY_WEIGHTS,
+    NETWORK_BBOX,
+    default_network_path,
+)
+from walk_graph import CSRGraph, GraphBuilder, highway_code
+
+logger = logging.getLogger(__name__)
+
+
+def connect_postgis(dsn: str = ""):
+    """PostGIS 연결 (DSN이 없으면 OSM_DB_* 환경변수 사용)"""
+    import psycopg2
+
+    dsn = dsn or os.getenv("OSM_DATABASE_URL", "")
+    if dsn:
+        return psycopg2.connect(dsn)
+    password = os.getenv("OSM_DB_PASSWORD")
+    if not password:
+        raise RuntimeError("OSM_DATABASE_URL 또는 OSM_DB_PASSWORD 환경변수가 필요합니다")
+    return psycopg2.connect(
+        host=os.getenv("OSM_DB_HOST", "localhost"),
+        port=int(os.getenv("OSM_DB_PORT", "5432")),
+        database=os.getenv("OSM_DB_NAME", "seoul_gis"),
+        user=os.getenv("OSM_DB_USER", "postgres"),
+        password=password,
+    )
+
+
+def build_from_postgis(
+    dsn: str,
+    highway_weights: Dict[str, float],
+    bbox: Tuple[float, float, float, float],
+    batch_rows: int,
+) -> Tuple[CSRGraph, Dict]:
+    conn = connect_postgis(dsn)
+    try:
+        builder = GraphBuilder()
+        stats = ingest_network(conn, builder, highway_weights, bbox, batch_rows)
+    finally:
+        conn.close()
+    return builder.build(), stats
+
+
+def build_from_pbf(
+    path: str,
+    highway_weights: Dict[str, float],
+    bbox: Tuple[float, float, float, float],
+    batch_rows: int,
+) -> Tuple[CSRGraph, Dict]:
+    """.osm.pbf 파일에서 도로망 구성 (pyosmium 필요, 범위에 한 점이라도 걸친 way만 사용)"""
+    try:
+        import osmium
+    except ImportError:
+        raise RuntimeError("PBF 빌드에는 pyosmium이 필요합니다 (pip install osmium)")
+
+    builder = GraphBuilder()
+    highways = list(highway_weights)
+    codes = np.array([highway_code(h) for h in highways], dtype=np.uint8)
+    multipliers = np.array([highway_weights[h] for h in highways], dtype=np.float64)
+    index_of = {h: i for i, h in enumerate(highways)}
+    min_lng, min_lat, max_lng, max_lat = bbox
+    stats = {"rows": 0, "segments": 0, "skipped": 0, "by_highway": {}}
+
+    class WayCollector(osmium.SimpleHandler):
+        def __init__(self):
+            super().__init__()
+            self.lat: List[float] = []
+            self.lng: List[float] = []
+            self.rows: List[int] = []
+            self.kinds: List[int] = []
+
+        def way(self, way):
+            kind = index_of.get(way.tags.get("highway"))
+            if kind is None:
+                return
+            try:
+                points = [(node.lat, node.lon) for node in way.nodes]
+            except osmium.InvalidLocationError:
+                stats["skipped"] += 1
+                return
+            if len(points) < 2 or not any(
+                min_lat <= lat <= max_lat and min_lng <= lng <= max_lng
+                for lat, lng in points
+            ):
+                return
+            row = len(self.kinds)
+            self.kinds.append(kind)
+            for lat, lng in points:
+                self.lat.append(lat)
+                self.lng.append(lng)
+                self.rows.append(row)
+            if len(self.kinds) >= batch_rows:
+                self.flush()
+
+        def flush(self):
+            if not self.kinds:
+                return
+            kinds = np.array(self.kinds)
+            stats["segments"] += builder.add_polylines(
+                np.array(self.lat), np.array(self.lng), np.array(self.rows),
+                codes[kinds], multipliers[kinds],
+            )
+            stats["rows"] += len(kinds)
+            for kind, count in zip(*np.unique(kinds, return_counts=True)):
+                name = highways[kind]
+                stats["by_highway"][name] = stats["by_highway"].get(name, 0) + int(count)
+            logger.info(f"📥 PBF 도로 적재: {stats['rows']:,}개 way, {stats['segments']:,}개 선분")
+            self.lat, self.lng, self.rows, self.kinds = [], [], [], []
+
+    collector = WayCollector()
+    collector.apply_file(path, locations=True)
+    collector.flush()
+    return builder.build(), stats
+
+
+def write_artifact(
+    path: str,
+    graph: CSRGraph,
+    ch,
+    metadata: Dict,
+) -> int:
+    """그래프 + KD-트리 + CH + 메타데이터를 서빙용 파일 하나로 저장"""
+    arrays = graph.to_arrays()
+    if ch is not None:
+        arrays.update(ch.to_arrays())
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return save_arrays(path, arrays, {
+        **metadata,
+        "created_time": time.time(),
+        "node_count": graph.node_count,
+        "edge_count": graph.edge_count,
+        "graph_bytes": graph.nbytes,
+        "ch_shortcuts": ch.shortcut_count if ch else 0,
+        "source": "osm",
+        "version": CACHE_VERSION,
+    })
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="보행 그래프 배포 파일 빌드")
+    parser.add_argument("--pbf", help=".osm.pbf 입력 파일 (없으면 PostGIS에서 읽음)")
+    parser.add_argument("--dsn", default="", help="PostGIS DSN (기본: OSM_DATABASE_URL 또는 OSM_DB_* 환경변수)")
+    parser.add_argument("--output", default=default_network_path(), help="출력 파일 경로")
+    parser.add_argument("--bbox", type=float, nargs=4, default=list(NETWORK_BBOX),
+                        metavar=("MIN_LNG", "MIN_LAT", "MAX_LNG", "MAX_LAT"))
+    parser.add_argument("--batch-rows", type=int, default=INGEST_BATCH_ROWS)
+    parser.add_argument("--no-ch", action="store_true", help="축약 계층 전처리 생략 (A*로만 탐색)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    started = time.time()
+    bbox = tuple(args.bbox)
+
+    try:
+        if args.pbf:
+            graph, stats = build_from_pbf(args.pbf, HIGHWAY_WEIGHTS, bbox, args.batch_rows)
+        else:
+            graph, stats = build_from_postgis(args.dsn, HIGHWAY_WEIGHTS, bbox, args.batch_rows)
+    except Exception as e:
+        logger.error(f"❌ 도로망 읽기 실패: {e}")
+        return 1
+    if graph.node_count == 0:
+        logger.error("❌ 도로망이 비어 있어 파일을 만들지 않습니다")
+        return 1
+    logger.info(
+        f"🗺️ 그래프 구성 완료: {graph.node_count:,}개 노드, {graph.edge_count:,}개 엣지, "
+        f"{graph.nbytes / 1e6:.1f}MB"
+    )
+
+    ch = None if args.no_ch else ContractionHierarchy.build(graph)
+    file_size = write_artifact(args.output, graph, ch, {
+        "input": os.path.basename(args.pbf) if args.pbf else "postgis",
+        "bbox": list(bbox),
+        "highway_weights": HIGHWAY_WEIGHTS,
+        "ingest": {k: v for k, v in stats.items() if k != "seconds"},
+    })
+    logger.info(
+        f"✅ 보행 그래프 파일 생성: {args.output} ({file_size / 1e6:.1f}MB, "
+        f"{time.time() - started:.1f}초)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,491 @@
+# backend/construction_data.py - 공사장 데이터 컬럼형 로더
+
+import os
+import json
+import codecs
+import hashlib
+import logging
+import traceback
+from datetime import datetime
+from typing import List, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from zone_index import ZoneSpatialIndex
+
+logger = logging.getLogger(__name__)
+
+CONSTRUCTION_CSV_NAME = "필터링결과.csv"
+
+# 공사 상태/위험도 산출 규칙 버전 (규칙이 바뀌면 올려서 파생 캐시를 무효화)
+CONSTRUCTION_STATUS_RULE_VERSION = "hash-v1"
+CONSTRUCTION_STATUSES = ["진행중", "완료", "예정"]
+CONSTRUCTION_STATUS_WEIGHTS = [0.3, 0.6, 0.1]
+CONSTRUCTION_RISK_RANGES = {"진행중": (0.6, 0.9), "예정": (0.3, 0.6), "완료": (0.1, 0.3)}
+# 프론트엔드 필터 값(active/completed/planned)도 상태로 인정
+CONSTRUCTION_STATUS_ALIASES = {"active": "진행중", "completed": "완료", "planned": "예정"}
+
+REQUIRED_COLUMNS = ["위도", "경도", "지오코딩주소"]
+OPTIONAL_COLUMNS = ["공사상태", "위험도"]
+
+# 서울 지역 좌표 범위 (더 넓게 설정)
+SEOUL_LAT_RANGE = (37.3, 37.8)
+SEOUL_LNG_RANGE = (126.7, 127.3)
+
+CSV_ENCODINGS = ["utf-8", "cp949", "euc-kr", "utf-8-sig"]
+ENCODING_SNIFF_BYTES = 64 * 1024
+
+# CSV 옆에 저장하는 바이너리 스냅샷 (디렉토리 내 .npy 배열 + meta.json)
+SNAPSHOT_SUFFIX = ".snapshot"
+SNAPSHOT_FORMAT_VERSION = 1
+SNAPSHOT_ARRAYS = ["lat", "lng", "address_blob", "address_offsets", "status_code", "risk"]
+
+
+class ConstructionDataset:
+    """공사장 데이터 컬럼 저장소 (NumPy 배열 + 지연 생성 dict 뷰)
+
+    주소 문자열은 UTF-8 바이트 blob + 오프셋 배열로 보관해 스냅샷에서
+    그대로 메모리 매핑할 수 있게 함
+    """
+
+    def __init__(
+        self,
+        lat: np.ndarray,
+        lng: np.ndarray,
+        address_blob: np.ndarray,
+        address_offsets: np.ndarray,
+        status_code: np.ndarray,
+        risk: np.ndarray,
+        source: str = "csv",
+        id_prefix: str = "CONST-",
+        version: Optional[str] = None,
+    ):
+        # dtype이 같으면 np.asarray는 복사하지 않으므로 memmap 배열이 그대로 유지됨
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lng = np.asarray(lng, dtype=np.float64)
+        self.address_blob = np.asarray(address_blob, dtype=np.uint8)
+        self.address_offsets = np.asarray(address_offsets, dtype=np.int64)
+        self.status_code = np.asarray(status_code, dtype=np.uint8)
+        self.risk = np.asarray(risk, dtype=np.float64)
+        self.source = source
+        self.id_prefix = id_prefix
+        self.version = version or self._compute_version()
+        self._records: List[Optional[Dict]] = [None] * len(self.lat)
+        self._all_materialized = False
+        self._spatial_index: Optional[ZoneSpatialIndex] = None
+
+        # 상태별 인덱스 파티션/개수는 로드 시 한 번만 계산
+        self.status_partitions = {
+            status: np.flatnonzero(self.status_code == code)
+            for code, status in enumerate(CONSTRUCTION_STATUSES)
+        }
+        self._status_counts = {
+            status: len(indices) for status, indices in self.status_partitions.items()
+        }
+
+    @classmethod
+    def from_addresses(
+        cls, lat, lng, addresses: List[str], status_code, risk, **kwargs
+    ) -> "ConstructionDataset":
+        """주소 문자열 목록으로 데이터셋 생성"""
+        encoded = [address.encode("utf-8") for address in addresses]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(b) for b in encoded])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(lat, lng, blob, offsets, status_code, risk, **kwargs)
+
+    @classmethod
+    def empty(cls) -> "ConstructionDataset":
+        return cls.from_addresses([], [], [], [], [], source="empty")
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def __getitem__(self, i: int) -> Dict:
+        return self.record(i)
+
+    def _compute_version(self) -> str:
+        """데이터 스냅샷 버전 (규칙 버전 + 내용 해시)"""
+        digest = hashlib.sha1(CONSTRUCTION_STATUS_RULE_VERSION.encode())
+        for array in (
+            self.lat,
+            self.lng,
+            self.status_code,
+            self.risk,
+            self.address_offsets,
+            self.address_blob,
+        ):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return f"{CONSTRUCTION_STATUS_RULE_VERSION}-{digest.hexdigest()[:12]}"
+
+    def address_at(self, i: int) -> str:
+        start, end = self.address_offsets[i], self.address_offsets[i + 1]
+        return self.address_blob[start:end].tobytes().decode("utf-8")
+
+    def record(self, i: int) -> Dict:
+        """i번째 공사장 dict (최초 접근 시 생성)"""
+        item = self._records[i]
+        if item is None:
+            address = self.address_at(i)
+            risk = float(self.risk[i])
+            item = {
+                "id": f"{self.id_prefix}{i + 1}",
+                "lat": float(self.lat[i]),
+                "lng": float(self.lng[i]),
+                "address": address,
+                "status": CONSTRUCTION_STATUSES[self.status_code[i]],
+                "type": "도로굴착공사",
+                "risk_level": risk,
+                "name": f"공사지역: {address[:50]}",  # 50자 제한
+                "risk": risk,  # risk 키 추가
+            }
+            self._records[i] = item
+        return item
+
+    def select(self, indices) -> List[Dict]:
+        """인덱스 배열에 해당하는 공사장 dict 목록"""
+        return [self.record(int(i)) for i in indices]
+
+    @property
+    def records(self) -> List[Dict]:
+        """전체 공사장 dict 목록 (기존 CONSTRUCTION_DATA 형식)"""
+        if not self._all_materialized:
+            for i in range(len(self)):
+                self.record(i)
+            self._all_materialized = True
+        return self._records
+
+    def status_indices(self, status: str) -> np.ndarray:
+        """특정 상태의 공사장 인덱스 (미리 계산된 파티션)"""
+        status = CONSTRUCTION_STATUS_ALIASES.get(status, status)
+        if status not in self.status_partitions:
+            return np.empty(0, dtype=np.intp)
+        return self.status_partitions[status]
+
+    def status_counts(self) -> Dict[str, int]:
+        return dict(self._status_counts)
+
+    @property
+    def spatial_index(self) -> ZoneSpatialIndex:
+        """공사장 좌표 KDTree (bbox 조회 시 최초 1회 구축)"""
+        if self._spatial_index is None:
+            self._spatial_index = ZoneSpatialIndex.from_arrays(
+                self.lat, self.lng, self.risk, self
+            )
+        return self._spatial_index
+
+    def query(
+        self,
+        status: Optional[str] = None,
+        bbox: Optional[List[float]] = None,
+        limit: Optional[int] = None,
+    ) -> np.ndarray:
+        """상태/bbox(lat_min, lng_min, lat_max, lng_max)/개수 조건에 맞는 인덱스"""
+        if status:
+            indices = self.status_indices(status)
+        else:
+            indices = np.arange(len(self), dtype=np.intp)
+
+        if bbox is not None:
+            in_bbox = self.spatial_index.indices_in_bbox(*bbox)
+            indices = np.intersect1d(indices, in_bbox, assume_unique=True)
+
+        if limit is not None:
+            indices = indices[:limit]
+        return indices
+
+
+def find_construction_csv(verbose: bool = True) -> Optional[str]:
+    """공사정보 CSV 파일 경로 탐색 (verbose=False면 주기적 감시용으로 로그 생략)"""
+    current_dir = os.getcwd()
+    if verbose:
+        logger.info(f"📂 현재 디렉토리: {current_dir}")
+
+    # 가능한 CSV 파일 경로들 (순서대로 시도)
+    possible_paths = [
+        CONSTRUCTION_CSV_NAME,
+        f"./{CONSTRUCTION_CSV_NAME}",
+        f"../{CONSTRUCTION_CSV_NAME}",
+        f"data/{CONSTRUCTION_CSV_NAME}",
+        os.path.join(current_dir, CONSTRUCTION_CSV_NAME),
+        # 백엔드 폴더 안에 있을 경우를 대비
+        os.path.join(os.path.dirname(__file__), CONSTRUCTION_CSV_NAME),
+        # 상위 디렉토리에 있을 경우를 대비
+        os.path.join(os.path.dirname(os.path.dirname(__file__)), CONSTRUCTION_CSV_NAME),
+    ]
+
+    for path in possible_paths:
+        if os.path.exists(path):
+            if verbose:
+                logger.info(f"✅ CSV 파일 발견: {path}")
+            return path
+
+    if verbose:
+        logger.error(f"❌ {CONSTRUCTION_CSV_NAME} 파일을 찾을 수 없습니다!")
+        logger.info("🔍 다음 위치들을 확인하세요:")
+        for path in possible_paths:
+            logger.info(f"   - {path}")
+    return None
+
+
+def sniff_encoding(csv_file_path: str) -> Optional[str]:
+    """파일 앞부분만 읽어 인코딩 판별 (한 번만 파싱하기 위함)"""
+    with open(csv_file_path, "rb") as f:
+        sample = f.read(ENCODING_SNIFF_BYTES)
+
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+
+    for encoding in CSV_ENCODINGS:
+        try:
+            # 샘플 끝에서 잘린 멀티바이트 문자는 허용
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return None
+
+
+def assign_status_codes(df: pd.DataFrame, row_hashes: np.ndarray) -> np.ndarray:
+    """공사 상태 코드 배정
+
+    CSV에 '공사상태' 컬럼이 있으면 그대로 사용하고, 없으면 행 해시로
+    진행중 30% / 완료 60% / 예정 10% 비율에 맞춰 결정적으로 배정
+    """
+    buckets = (row_hashes % 1000) / 1000
+    thresholds = np.cumsum(CONSTRUCTION_STATUS_WEIGHTS)[:-1]
+    codes = np.searchsorted(thresholds, buckets, side="right").astype(np.uint8)
+
+    if "공사상태" in df.columns:
+        persisted = df["공사상태"].astype("string").str.strip()
+        persisted_codes = persisted.map(
+            {status: i for i, status in enumerate(CONSTRUCTION_STATUSES)}
+        )
+        valid = persisted_codes.notna().to_numpy()
+        codes[valid] = persisted_codes[valid].to_numpy(dtype=np.uint8)
+
+    return codes
+
+
+def assign_risk(
+    df: pd.DataFrame, row_hashes: np.ndarray, status_codes: np.ndarray
+) -> np.ndarray:
+    """공사 상태에 따른 위험도 계산 ('위험도' 컬럼이 있으면 우선 사용)"""
+    ranges = np.array([CONSTRUCTION_RISK_RANGES[s] for s in CONSTRUCTION_STATUSES])
+    low, high = ranges[status_codes, 0], ranges[status_codes, 1]
+
+    # 상태 배정에 쓰지 않은 상위 비트로 범위 내 위치 결정
+    fraction = ((row_hashes >> np.uint64(32)) % 10000) / 10000
+    risk = np.round(low + (high - low) * fraction, 4)
+
+    if "위험도" in df.columns:
+        persisted = pd.to_numeric(df["위험도"], errors="coerce").to_numpy()
+        valid = ~np.isnan(persisted)
+        risk[valid] = persisted[valid]
+
+    return risk
+
+
+def build_dataset_from_frame(df: pd.DataFrame) -> ConstructionDataset:
+    """DataFrame을 컬럼 연산으로 정제해 ConstructionDataset 생성"""
+    # 행 내용 기반 해시 (프로세스/재시작과 무관하게 동일) - 상태/위험도 결정에 사용
+    row_hashes = pd.util.hash_pandas_object(
+        df[REQUIRED_COLUMNS], index=False
+    ).to_numpy()
+
+    lat = pd.to_numeric(df["위도"], errors="coerce").to_numpy(dtype=np.float64)
+    lng = pd.to_numeric(df["경도"], errors="coerce").to_numpy(dtype=np.float64)
+    address = df["지오코딩주소"]
+
+    has_values = ~np.isnan(lat) & ~np.isnan(lng) & address.notna().to_numpy()
+    in_seoul = (
+        (lat >= SEOUL_LAT_RANGE[0])
+        & (lat <= SEOUL_LAT_RANGE[1])
+        & (lng >= SEOUL_LNG_RANGE[0])
+        & (lng <= SEOUL_LNG_RANGE[1])
+    )
+    keep = has_values & in_seoul
+
+    missing_count = int((~has_values).sum())
+    outside_count = int((has_values & ~in_seoul).sum())
+    if missing_count:
+        logger.warning(f"⚠️ 필수 데이터 누락/좌표 변환 실패: {missing_count}건")
+    if outside_count:
+        logger.warning(f"⚠️ 서울 지역 외 좌표: {outside_count}건")
+
+    kept = df[keep]
+    status_codes = assign_status_codes(kept, row_hashes[keep])
+    risk = assign_risk(kept, row_hashes[keep], status_codes)
+
+    return ConstructionDataset.from_addresses(
+        lat=lat[keep],
+        lng=lng[keep],
+        addresses=kept["지오코딩주소"].astype(str).str.strip().tolist(),
+        status_code=status_codes,
+        risk=risk,
+        source="csv",
+    )
+
+
+def generate_dummy_construction_dataset() -> ConstructionDataset:
+    """더미 공사정보 데이터 생성 (파일 로드 실패 시)"""
+    logger.info("🔧 더미 공사정보 데이터를 생성합니다.")
+    return ConstructionDataset.from_addresses(
+        lat=[37.5665],
+        lng=[126.9780],
+        addresses=["서울시 중구 명동 (더미)"],
+        status_code=[CONSTRUCTION_STATUSES.index("진행중")],
+        risk=[0.75],
+        source="dummy",
+        id_prefix="CONST-DUMMY-",
+    )
+
+
+def snapshot_dir_for(csv_file_path: str) -> str:
+    return os.path.abspath(csv_file_path) + SNAPSHOT_SUFFIX
+
+
+def _snapshot_key(csv_file_path: str) -> Dict:
+    """스냅샷 유효성 키 (원본 경로/크기/수정시각 + 규칙/포맷 버전)"""
+    stat = os.stat(csv_file_path)
+    return {
+        "source_path": os.path.abspath(csv_file_path),
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+        "rule_version": CONSTRUCTION_STATUS_RULE_VERSION,
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+    }
+
+
+def load_snapshot(csv_file_path: str) -> Optional[ConstructionDataset]:
+    """유효한 스냅샷이 있으면 메모리 매핑으로 로드 (워커 간 페이지 공유)"""
+    snapshot_dir = snapshot_dir_for(csv_file_path)
+    meta_path = os.path.join(snapshot_dir, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        if meta.get("key") != _snapshot_key(csv_file_path):
+            logger.info("♻️ 공사장 스냅샷이 원본 CSV와 달라 다시 생성합니다")
+            return None
+
+        arrays = {
+            name: np.load(os.path.join(snapshot_dir, f"{name}.npy"), mmap_mode="r")
+            for name in SNAPSHOT_ARRAYS
+        }
+        dataset = ConstructionDataset(
+            source="snapshot", version=meta["version"], **arrays
+        )
+        if len(dataset) != meta["count"]:
+            logger.warning("⚠️ 공사장 스냅샷 행 수 불일치. 다시 생성합니다")
+            return None
+        return dataset
+
+    except Exception as e:
+        logger.warning(f"⚠️ 공사장 스냅샷 로드 실패: {e}")
+        return None
+
+
+def save_snapshot(dataset: ConstructionDataset, csv_file_path: str):
+    """데이터셋을 CSV 옆 스냅샷 디렉토리에 저장
+
+    배열을 임시 파일에 쓴 뒤 os.replace로 교체하고 meta.json을 마지막에 기록하므로
+    다른 워커가 동시에 읽더라도 meta.json 키가 맞는 완성본만 사용됨
+    """
+    snapshot_dir = snapshot_dir_for(csv_file_path)
+    meta_path = os.path.join(snapshot_dir, "meta.json")
+    suffix = f".tmp-{os.getpid()}"
+
+    try:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        # 기존 meta.json을 먼저 지워 배열 교체 중에는 스냅샷이 무효로 보이게 함
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
+        for name in SNAPSHOT_ARRAYS:
+            path = os.path.join(snapshot_dir, f"{name}.npy")
+            with open(path + suffix, "wb") as f:
+                np.save(f, np.ascontiguousarray(getattr(dataset, name)))
+            os.replace(path + suffix, path)
+
+        meta = {
+            "key": _snapshot_key(csv_file_path),
+            "version": dataset.version,
+            "count": len(dataset),
+            "created_at": datetime.now().isoformat(),
+        }
+        with open(meta_path + suffix, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(meta_path + suffix, meta_path)
+
+        logger.info(f"💾 공사장 스냅샷 저장: {snapshot_dir}")
+
+    except Exception as e:
+        # 읽기 전용 볼륨 등에서는 스냅샷 없이 계속 진행
+        logger.warning(f"⚠️ 공사장 스냅샷 저장 실패: {e}")
+
+
+def load_construction_dataset(
+    csv_file_path: Optional[str] = None,
+) -> ConstructionDataset:
+    """CSV 파일에서 공사정보 데이터를 컬럼 단위로 로드"""
+    logger.info("🏗️ 공사장 데이터 로드 시작...")
+
+    try:
+        csv_file_path = csv_file_path or find_construction_csv()
+        if not csv_file_path:
+            return generate_dummy_construction_dataset()
+
+        file_size = os.path.getsize(csv_file_path)
+        logger.info(f"📋 파일 크기: {file_size} bytes")
+        if file_size == 0:
+            logger.error("❌ CSV 파일이 비어있습니다!")
+            return generate_dummy_construction_dataset()
+
+        snapshot = load_snapshot(csv_file_path)
+        if snapshot is not None:
+            logger.info(
+                f"⚡ 공사장 스냅샷 로드 (mmap): {len(snapshot)}건, 버전 {snapshot.version}"
+            )
+            return snapshot
+
+        encoding = sniff_encoding(csv_file_path)
+        if encoding is None:
+            logger.error("❌ CSV 인코딩을 판별할 수 없습니다!")
+            return generate_dummy_construction_dataset()
+
+        wanted_columns = set(REQUIRED_COLUMNS + OPTIONAL_COLUMNS)
+        df = pd.read_csv(
+            csv_file_path,
+            encoding=encoding,
+            usecols=lambda column: column in wanted_columns,
+        )
+        logger.info(
+            f"📊 CSV 로드 성공: {len(df)}개 행, {len(df.columns)}개 컬럼 (인코딩: {encoding})"
+        )
+
+        missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+        if missing_columns:
+            logger.error(f"❌ 필수 컬럼 누락: {missing_columns}")
+            return generate_dummy_construction_dataset()
+
+        dataset = build_dataset_from_frame(df)
+
+        logger.info("✅ 공사정보 데이터 로드 완료!")
+        logger.info(f"   📊 성공: {len(dataset)}건 / 전체 {len(df)}건")
+        logger.info(f"📊 상태별 통계: {dataset.status_counts()}")
+
+        if len(dataset) == 0:
+            return generate_dummy_construction_dataset()
+
+        save_snapshot(dataset, csv_file_path)
+        return dataset
+
+    except Exception as e:
+        logger.error(f"❌ 공사정보 데이터 로드 중 전체 오류: {e}")
+        logger.error(f"📄 오류 상세: {traceback.format_exc()}")
+        return generate_dummy_construction_dataset()
@@ -0,0 +1,259 @@
+# backend/contraction_hierarchy.py - 보행 그래프 축약 계층(CH) 전처리 및 양방향 질의
+
+import heapq
+import logging
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from walk_graph import CSRGraph
+
+logger = logging.getLogger(__name__)
+
+# 위트니스(우회 경로) 탐색에서 확정할 최대 노드 수
+# 한도를 넘으면 우회 경로가 없다고 보고 바로가기를 추가함 (결과 정확도에는 영향 없음)
+WITNESS_SETTLE_LIMIT = 60
+
+
+def _witness_search(
+    adj: List[Dict[int, Tuple[float, int]]],
+    source: int,
+    excluded: int,
+    max_cost: float,
+    targets: Dict[int, float],
+) -> Dict[int, float]:
+    """excluded 노드를 거치지 않는 source 기준 최단거리 (max_cost 이내, 제한된 탐색)"""
+    dist = {source: 0.0}
+    heap = [(0.0, source)]
+    remaining = set(targets)
+    settled = 0
+    while heap and remaining and settled < WITNESS_SETTLE_LIMIT:
+        cost, node = heapq.heappop(heap)
+        if cost > dist[node]:
+            continue
+        if cost > max_cost:
+            break
+        settled += 1
+        remaining.discard(node)
+        for neighbor, (weight, _) in adj[node].items():
+            if neighbor == excluded:
+                continue
+            candidate = cost + weight
+            if candidate < dist.get(neighbor, np.inf):
+                dist[neighbor] = candidate
+                heapq.heappush(heap, (candidate, neighbor))
+    return dist
+
+
+class ContractionHierarchy:
+    """무방향 보행 그래프의 축약 계층 (기본 가중치 전용)
+
+    중요도가 낮은 노드부터 축약하며 필요한 바로가기 엣지를 추가하고, 각 노드에서
+    순위가 더 높은 이웃으로 가는 상향 엣지만 CSR로 저장함. 무방향이므로 질의는
+    출발/도착 양쪽 모두 같은 상향 그래프를 탐색함. 위험 가중치 배율처럼 가중치가
+    바뀌는 탐색에는 사용할 수 없음
+    """
+
+    def __init__(
+        self,
+        rank: np.ndarray,
+        up_indptr: np.ndarray,
+        up_indices: np.ndarray,
+        up_weight: np.ndarray,
+        up_middle: np.ndarray,
+    ):
+        self.rank = rank
+        self.up_indptr = up_indptr
+        self.up_indices = up_indices
+        self.up_weight = up_weight
+        # 바로가기가 건너뛰는 중간 노드 (원래 엣지는 -1)
+        self.up_middle = up_middle
+
+    ARRAY_FIELDS = ("rank", "up_indptr", "up_indices", "up_weight", "up_middle")
+
+    @property
+    def node_count(self) -> int:
+        return len(self.rank)
+
+    @property
+    def shortcut_count(self) -> int:
+        return int((self.up_middle >= 0).sum())
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            array.nbytes
+            for array in (
+                self.rank, self.up_indptr, self.up_indices, self.up_weight, self.up_middle,
+            )
+        )
+
+    def to_arrays(self, prefix: str = "ch.") -> Dict[str, np.ndarray]:
+        return {prefix + name: getattr(self, name) for name in self.ARRAY_FIELDS}
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], prefix: str = "ch.") -> Optional["ContractionHierarchy"]:
+        """to_arrays 결과로 구성, CH 배열이 없으면 None"""
+        if prefix + "rank" not in arrays:
+            return None
+        return cls(**{name: arrays[prefix + name] for name in cls.ARRAY_FIELDS})
+
+    @classmethod
+    def build(cls, graph: CSRGraph) -> "ContractionHierarchy":
+        """노드 축약 순서 결정 + 바로가기 생성 (우선순위: 엣지 차이 + 축약된 이웃 수, 지연 갱신)"""
+        started = time.time()
+        node_count = graph.node_count
+        adj: List[Dict[int, Tuple[float, int]]] = [dict() for _ in range(node_count)]
+        for u, v, weight in zip(
+            graph.edge_u.tolist(), graph.edge_v.tolist(), graph.weight.tolist()
+        ):
+            adj[u][v] = (weight, -1)
+            adj[v][u] = (weight, -1)
+
+        deleted_neighbors = [0] * node_count
+
+        def shortcuts_for(node: int) -> List[Tuple[int, int, float]]:
+            neighbors = list(adj[node].items())
+            shortcuts = []
+            for i, (u, (w_u, _)) in enumerate(neighbors):
+                targets = {x: w_u + w_x for x, (w_x, _) in neighbors[i + 1:]}
+                if not targets:
+                    continue
+                dist = _witness_search(adj, u, node, max(targets.values()), targets)
+                for x, via in targets.items():
+                    if dist.get(x, np.inf) > via:
+                        shortcuts.append((u, x, via))
+            return shortcuts
+
+        def priority(node: int, shortcuts: List) -> int:
+            return len(shortcuts) - len(adj[node]) + deleted_neighbors[node]
+
+        heap = [(priority(v, shortcuts_for(v)), v) for v in range(node_count)]
+        heapq.heapify(heap)
+
+        rank = np.full(node_count, -1, dtype=np.int32)
+        up_lists: List[List[Tuple[int, float, int]]] = [[] for _ in range(node_count)]
+        next_rank = 0
+        report_every = max(node_count // 10, 10000)
+
+        while heap:
+            _, node = heapq.heappop(heap)
+            if rank[node] >= 0:
+                continue
+            # 지연 갱신: 다시 계산한 우선순위가 다음 후보보다 나쁘면 뒤로 미룸
+            shortcuts = shortcuts_for(node)
+            current = priority(node, shortcuts)
+            if heap and current > heap[0][0]:
+                heapq.heappush(heap, (current, node))
+                continue
+
+            rank[node] = next_rank
+            next_rank += 1
+            up_lists[node] = [(x, w, middle) for x, (w, middle) in adj[node].items()]
+            for x in adj[node]:
+                del adj[x][node]
+                deleted_neighbors[x] += 1
+            for u, x, via in shortcuts:
+                existing = adj[u].get(x)
+                if existing is None or via < existing[0]:
+                    adj[u][x] = (via, node)
+                    adj[x][u] = (via, node)
+            adj[node] = {}
+
+            if next_rank % report_every == 0:
+                logger.info(f"🏗️ CH 축약 진행: {next_rank:,}/{node_count:,}")
+
+        counts = np.array([len(edges) for edges in up_lists], dtype=np.int64)
+        up_indptr = np.zeros(node_count + 1, dtype=np.int32)
+        np.cumsum(counts, out=up_indptr[1:])
+        flat = [edge for edges in up_lists for edge in edges]
+        ch = cls(
+            rank=rank,
+            up_indptr=up_indptr,
+            up_indices=np.array([e[0] for e in flat], dtype=np.int32),
+            up_weight=np.array([e[1] for e in flat], dtype=np.float32),
+            up_middle=np.array([e[2] for e in flat], dtype=np.int32),
+        )
+        logger.info(
+            f"✅ CH 전처리 완료: {node_count:,}개 노드, 바로가기 {ch.shortcut_count:,}개, "
+            f"{time.time() - started:.1f}초"
+        )
+        return ch
+
+    def query(self, source: int, target: int) -> Tuple[Optional[List[int]], float]:
+        """양방향 상향 탐색으로 (원래 그래프의 노드 경로, 비용) 반환, 경로가 없으면 (None, inf)"""
+        if source == target:
+            return [source], 0.0
+
+        indptr, indices, weights = self.up_indptr, self.up_indices, self.up_weight
+        dist = ({source: 0.0}, {target: 0.0})
+        parent = ({source: -1}, {target: -1})
+        heaps = ([(0.0, source)], [(0.0, target)])
+        settled = (set(), set())
+        best, meet = np.inf, -1
+
+        while True:
+            # 양쪽 최소 키가 모두 현재 최선 비용 이상이면 종료
+            sides = [s for s in (0, 1) if heaps[s] and heaps[s][0][0] < best]
+            if not sides:
+                break
+            side = min(sides, key=lambda s: heaps[s][0][0])
+            cost, node = heapq.heappop(heaps[side])
+            if node in settled[side]:
+                continue
+            settled[side].add(node)
+
+            other = dist[1 - side].get(node)
+            if other is not None and cost + other < best:
+                best, meet = cost + other, node
+
+            start, end = indptr[node], indptr[node + 1]
+            neighbors = indices[start:end].tolist()
+            edge_weights = weights[start:end].tolist()
+            # stall-on-demand: 더 높은 순위 노드를 거쳐 더 싸게 도달할 수 있으면 확장하지 않음
+            # (무방향이므로 상향 엣지가 곧 위에서 내려오는 엣지)
+            reached = dist[side]
+            if any(
+                reached.get(neighbor, np.inf) + weight < cost
+                for neighbor, weight in zip(neighbors, edge_weights)
+            ):
+                continue
+            for neighbor, weight in zip(neighbors, edge_weights):
+                candidate = cost + weight
+                if candidate < dist[side].get(neighbor, np.inf):
+                    dist[side][neighbor] = candidate
+                    parent[side][neighbor] = node
+                    heapq.heappush(heaps[side], (candidate, neighbor))
+
+        if meet < 0:
+            return None, float("inf")
+
+        forward = [meet]
+        while parent[0][forward[-1]] != -1:
+            forward.append(parent[0][forward[-1]])
+        backward = [meet]
+        while parent[1][backward[-1]] != -1:
+            backward.append(parent[1][backward[-1]])
+        return self.unpack(forward[::-1] + backward[1:]), float(best)
+
+    def _middle(self, a: int, b: int) -> int:
+        # 상향 엣지는 순위가 낮은 쪽 노드에 저장됨
+        low, high = (a, b) if self.rank[a] < self.rank[b] else (b, a)
+        start, end = self.up_indptr[low], self.up_indptr[low + 1]
+        position = np.flatnonzero(self.up_indices[start:end] == high)
+        return int(self.up_middle[start + position[0]])
+
+    def unpack(self, path: Sequence[int]) -> List[int]:
+        """바로가기를 포함한 경로를 원래 엣지만으로 된 노드 경로로 펼침"""
+        result = [path[0]]
+        stack = [(a, b) for a, b in zip(path, path[1:])][::-1]
+        while stack:
+            a, b = stack.pop()
+            middle = self._middle(a, b)
+            if middle < 0:
+                result.append(b)
+            else:
+                stack.append((middle, b))
+                stack.append((a, middle))
+        return result
@@ -6,6 +6,9 @@ from geopy.distance import geodesic
 import json
 import time
 
+from osrm_pool import osrm_pool, OSRMUnavailableError
+from zone_index import ZoneSpatialIndex, zones_near_polyline
+
 logger = logging.getLogger(__name__)
 
 
@@ -13,15 +16,13 @@ class EnhancedRoutingService:
     """실제 도로만 사용하는 강화된 라우팅 서비스"""
 
     def __init__(self):
-        self.osrm_base_url = "https://router.project-osrm.org"
         self.session = None
+        self._owns_session = False
+        # 공용 세션을 쓰더라도 이 서비스의 요청 타임아웃은 유지
+        self.request_timeout = aiohttp.ClientTimeout(total=15, connect=5)
 
-        # 여러 OSRM 서버 백업 (순서대로 시도)
-        self.osrm_servers = [
-            "https://router.project-osrm.org",
-            "http://router.project-osrm.org",
-            # 추가 백업 서버들 (필요시)
-        ]
+        # OSRM 서버 풀 (OSRM_SERVERS 환경변수, 상태 점수순 선택 + 헤지 요청)
+        self.osrm_pool = osrm_pool
 
         # 도보 전용 프로파일들
         self.walking_profiles = {
@@ -34,20 +35,26 @@ class EnhancedRoutingService:
         self.max_detour_ratio = 2.5  # 직선거리 대비 최대 우회 비율
         self.min_route_points = 3  # 최소 경로 포인트 수
 
+    def use_shared_session(self, session: aiohttp.ClientSession):
+        """애플리케이션 공용 세션 주입 (세션 종료는 공용 클라이언트가 관리)"""
+        self.session = session
+        self._owns_session = False
+
     async def get_session(self):
-        """비동기 HTTP 세션 획득"""
-        if not self.session:
-            timeout = aiohttp.ClientTimeout(total=15, connect=5)
+        """비동기 HTTP 세션 획득 (공용 세션이 주입되지 않았으면 자체 생성)"""
+        if not self.session or self.session.closed:
             self.session = aiohttp.ClientSession(
-                timeout=timeout, headers={"User-Agent": "Seoul-Safety-Navigation/1.0"}
+                timeout=self.request_timeout,
+                headers={"User-Agent": "Seoul-Safety-Navigation/1.0"},
             )
+            self._owns_session = True
         return self.session
 
     async def close_session(self):
-        """세션 정리"""
-        if self.session:
+        """세션 정리 (자체 생성한 세션만 닫음)"""
+        if self.session and self._owns_session:
             await self.session.close()
-            self.session = None
+        self.session = None
 
     def calculate_direct_distance(
         self, start_lat: float, start_lng: float, end_lat: float, end_lng: float
@@ -73,44 +80,23 @@ class EnhancedRoutingService:
 
         logger.info(f"🚶 실제 도보 경로 요청: {direct_distance:.2f}km (직선거리)")
 
-        # 1단계: 여러 OSRM 서버로 경로 시도
-        route_result = None
-        successful_server = None
-
-        for server_url in self.osrm_servers:
-            try:
-                logger.info(f"🌐 OSRM 서버 시도: {server_url}")
-                result = await self._request_osrm_route(
-                    server_url,
-                    start_lat,
-                    start_lng,
-                    end_lat,
-                    end_lng,
-                    profile,
-                    alternatives,
-                )
-
-                if result["success"]:
-                    route_result = result
-                    successful_server = server_url
-                    logger.info(f"✅ OSRM 경로 성공: {server_url}")
-                    break
-                else:
-                    logger.warning(f"⚠️ OSRM 실패: {server_url} - {result.get('error')}")
-
-            except Exception as e:
-                logger.warning(f"❌ OSRM 오류: {server_url} - {e}")
-                continue
-
-        if not route_result or not route_result["success"]:
-            logger.error("❌ 모든 OSRM 서버에서 경로 생성 실패")
+        # 1단계: OSRM 서버 풀로 경로 요청 (느린 서버는 다음 서버로 헤지)
+        route_result = await self._request_osrm_route(
+            start_lat, start_lng, end_lat, end_lng, profile, alternatives
+        )
+
+        if not route_result["success"]:
+            logger.error(f"❌ OSRM 경로 생성 실패: {route_result.get('error')}")
             return {
                 "success": False,
                 "error": "실제 도로 경로를 찾을 수 없습니다. 도보로 접근 불가능한 지역일 수 있습니다.",
                 "direct_distance": direct_distance,
-                "attempted_servers": len(self.osrm_servers),
+                "attempted_servers": len(self.osrm_pool),
             }
 
+        successful_server = route_result["server_used"]
+        logger.info(f"✅ OSRM 경로 성공: {successful_server}")
+
         # 2단계: 경로 품질 검증
         route_data = route_result["route_data"]
         validation_result = self._validate_route_quality(
@@ -154,7 +140,6 @@ class EnhancedRoutingService:
 
     async def _request_osrm_route(
         self,
-        server_url: str,
         start_lat: float,
         start_lng: float,
         end_lat: float,
@@ -162,7 +147,7 @@ class EnhancedRoutingService:
         profile: str = "foot",
         alternatives: bool = True,
     ) -> Dict:
-        """개별 OSRM 서버에 경로 요청"""
+        """OSRM 서버 풀에 경로 요청"""
 
         session = await self.get_session()
 
@@ -178,37 +163,30 @@ class EnhancedRoutingService:
             "continue_straight": "false",  # 직진 강제 비활성화
         }
 
-        url = f"{server_url}/route/v1/{profile}/{coordinates}"
+        path = f"/route/v1/{profile}/{coordinates}"
 
         try:
-            async with session.get(url, params=params) as response:
-                if response.status != 200:
-                    return {"success": False, "error": f"HTTP {response.status}"}
-
-                data = await response.json()
-
-                if data.get("code") != "Ok":
-                    return {
-                        "success": False,
-                        "error": f"OSRM 코드: {data.get('code')} - {data.get('message', 'Unknown error')}",
-                    }
+            status, data, server_url = await self.osrm_pool.get_json(
+                session, path, params, timeout=self.request_timeout
+            )
+        except OSRMUnavailableError as e:
+            return {"success": False, "error": f"OSRM 서버 응답 없음: {e}"}
 
-                if not data.get("routes"):
-                    return {"success": False, "error": "No routes found"}
+        if data.get("code") != "Ok":
+            return {
+                "success": False,
+                "error": f"OSRM 코드: {data.get('code')} - {data.get('message', 'Unknown error')}",
+            }
 
-                return {
-                    "success": True,
-                    "route_data": data["routes"][0],
-                    "alternatives": (
-                        data["routes"][1:] if len(data["routes"]) > 1 else []
-                    ),
-                    "server_used": server_url,
-                }
+        if status != 200 or not data.get("routes"):
+            return {"success": False, "error": "No routes found"}
 
-        except asyncio.TimeoutError:
-            return {"success": False, "error": "Request timeout"}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+        return {
+            "success": True,
+            "route_data": data["routes"][0],
+            "alternatives": (data["routes"][1:] if len(data["routes"]) > 1 else []),
+            "server_used": server_url,
+        }
 
     def _validate_route_quality(
         self,
@@ -448,8 +426,12 @@ class EnhancedRoutingService:
         end_lat: float,
         end_lng: float,
         avoid_zones: List[Dict] = None,
+        zone_index: Optional[ZoneSpatialIndex] = None,
     ) -> Dict:
-        """위험지역을 우회하는 실제 도로 경로"""
+        """위험지역을 우회하는 실제 도로 경로
+
+        zone_index는 avoid_zones를 담고 있는 공용 공간 인덱스 (있으면 교차 검사에 재사용)
+        """
 
         logger.info("🛡️ 안전 우회 경로 생성 시작")
 
@@ -466,13 +448,14 @@ class EnhancedRoutingService:
             basic_route["message"] += " (위험지역 없음)"
             return basic_route
 
-        crossing_zones = []
-        for zone in avoid_zones:
-            if self._route_crosses_danger_zone(
-                basic_route["waypoints"], zone, threshold_km=0.3
-            ):
-                if zone.get("risk", 0) > 0.7:  # 고위험 지역만
-                    crossing_zones.append(zone)
+        crossing_zones = [
+            zone
+            for zone in self._find_crossing_danger_zones(
+                basic_route["waypoints"], avoid_zones, threshold_km=0.3,
+                zone_index=zone_index,
+            )
+            if zone.get("risk", 0) > 0.7  # 고위험 지역만
+        ]
 
         if not crossing_zones:
             basic_route["message"] += " (위험지역 우회 불필요)"
@@ -511,32 +494,29 @@ class EnhancedRoutingService:
         self, waypoints: List[Dict], zone: Dict, threshold_km: float = 0.3
     ) -> bool:
         """경로가 위험지역과 교차하는지 정밀 검사"""
+        return bool(self._find_crossing_danger_zones(waypoints, [zone], threshold_km))
 
-        zone_lat, zone_lng = zone["lat"], zone["lng"]
-
-        # 모든 waypoint에서 위험지역까지의 거리 검사
-        for i, waypoint in enumerate(waypoints):
-            distance = geodesid(
-                (waypoint["lat"], waypoint["lng"]), (zone_lat, zone_lng)
-            ).kilometers
-
-            if distance <= threshold_km:
-                return True
-
-        # 인접한 waypoint들 사이의 중간점들도 검사 (정밀도 향상)
-        for i in range(len(waypoints) - 1):
-            wp1 = waypoints[i]
-            wp2 = waypoints[i + 1]
-
-            # 두 점 사이의 중간점 검사
-            mid_lat = (wp1["lat"] + wp2["lat"]) / 2
-            mid_lng = (wp1["lng"] + wp2["lng"]) / 2
-
-            distance = geodesic((mid_lat, mid_lng), (zone_lat, zone_lng)).kilometers
-            if distance <= threshold_km:
-                return True
-
-        return False
+    def _find_crossing_danger_zones(
+        self,
+        waypoints: List[Dict],
+        zones: List[Dict],
+        threshold_km: float = 0.3,
+        zone_index: Optional[ZoneSpatialIndex] = None,
+    ) -> List[Dict]:
+        """경로와 교차하는 위험지역 목록
+
+        waypoint 사이 선분 전체에 대한 점-선분 거리로 검사하므로 중간점만 보던
+        방식과 달리 긴 선분이 위험지역을 관통하는 경우도 놓치지 않음
+        """
+        if not waypoints or not zones:
+            return []
+        return zones_near_polyline(
+            [wp["lat"] for wp in waypoints],
+            [wp["lng"] for wp in waypoints],
+            zones,
+            threshold_km,
+            index=zone_index,
+        )
 
     def _calculate_detour_waypoints(
         self,
@@ -599,35 +579,37 @@ class EnhancedRoutingService:
                 "annotations": "duration,distance",
             }
 
-            url = f"{self.osrm_base_url}/route/v1/foot/{coordinates_str}"
-
-            async with session.get(url, params=params) as response:
-                if response.status != 200:
-                    return {"success": False, "error": f"HTTP {response.status}"}
+            status, data, server_url = await self.osrm_pool.get_json(
+                session,
+                f"/route/v1/foot/{coordinates_str}",
+                params,
+                timeout=self.request_timeout,
+            )
 
-                data = await response.json()
+            if status != 200:
+                return {"success": False, "error": f"HTTP {status}"}
 
-                if data.get("code") != "Ok" or not data.get("routes"):
-                    return {"success": False, "error": "No multi-waypoint route found"}
+            if data.get("code") != "Ok" or not data.get("routes"):
+                return {"success": False, "error": "No multi-waypoint route found"}
 
-                # 기본 경로 처리와 동일한 방식으로 가공
-                route_data = data["routes"][0]
-                direct_distance = self.calculate_direct_distance(
-                    waypoints[0][0], waypoints[0][1], waypoints[-1][0], waypoints[-1][1]
-                )
+            # 기본 경로 처리와 동일한 방식으로 가공
+            route_data = data["routes"][0]
+            direct_distance = self.calculate_direct_distance(
+                waypoints[0][0], waypoints[0][1], waypoints[-1][0], waypoints[-1][1]
+            )
 
-                validation_result = self._validate_route_quality(
-                    route_data,
-                    direct_distance,
-                    waypoints[0][0],
-                    waypoints[0][1],
-                    waypoints[-1][0],
-                    waypoints[-1][1],
-                )
+            validation_result = self._validate_route_quality(
+                route_data,
+                direct_distance,
+                waypoints[0][0],
+                waypoints[0][1],
+                waypoints[-1][0],
+                waypoints[-1][1],
+            )
 
-                return self._process_route_data(
-                    route_data, self.osrm_base_url, validation_result, direct_distance
-                )
+            return self._process_route_data(
+                route_data, server_url, validation_result, direct_distance
+            )
 
         except Exception as e:
             logger.error(f"❌ 다중 경유지 경로 오류: {e}")
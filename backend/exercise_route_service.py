@@ -17,6 +17,7 @@ class ExerciseRouteService:
     def __init__(self, osrm_base_url: str = "https://router.project-osrm.org"):
         self.osrm_base_url = osrm_base_url
         self.session = None
+        self._owns_session = False
         self.steps_per_kilometer = 1250
         self.default_target_steps = 10000
         self.walking_speed_kmh = 4.0
@@ -319,15 +320,21 @@ class ExerciseRouteService:
             },
         ]
 
+    def use_shared_session(self, session: aiohttp.ClientSession):
+        """애플리케이션 공용 세션 주입 (세션 종료는 공용 클라이언트가 관리)"""
+        self.session = session
+        self._owns_session = False
+
     async def get_session(self):
-        if not self.session:
+        if not self.session or self.session.closed:
             self.session = aiohttp.ClientSession()
+            self._owns_session = True
         return self.session
 
     async def close_session(self):
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.close()
-            self.session = None
+        self.session = None
 
     def find_best_exercise_area(self, start_location: Dict) -> Dict:
         start_lat, start_lng = start_location["lat"], start_location["lng"]
@@ -0,0 +1,236 @@
+# backend/gazetteer.py - 지명 자동완성용 로컬 지명 사전 (접두어 인덱스 + 초성 검색)
+
+import re
+import time
+import bisect
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 한글 음절 → 초성 분해
+_HANGUL_BASE = 0xAC00
+_HANGUL_LAST = 0xD7A3
+_JUNGSEONG_COUNT = 21
+_JONGSEONG_COUNT = 28
+CHOSEONG = [
+    "ㄱ", "ㄲ", "ㄴ", "ㄷ", "ㄸ", "ㄹ", "ㅁ", "ㅂ", "ㅃ", "ㅅ",
+    "ㅆ", "ㅇ", "ㅈ", "ㅉ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ",
+]
+_CHOSEONG_SET = set(CHOSEONG)
+
+# 학습(지오코딩 결과)으로 추가되는 항목 상한 (만료된 항목은 상한에 닿으면 정리)
+MAX_LEARNED_ENTRIES = 5000
+
+# 같은 점수일 때 우선할 출처 (작을수록 우선)
+SOURCE_PRIORITY = {"exercise_area": 0, "station": 1, "risk_zone": 2, "geocode": 3}
+
+_TRAILING_NOISE = re.compile(r"\s*(\(.*?\)|일대|인근|부근)$")
+_STATION_PATTERN = re.compile(r"(\S+역)")
+
+
+def to_choseong(text: str) -> str:
+    """한글 음절을 초성으로 변환 (그 외 문자는 그대로)"""
+    chars = []
+    for ch in text:
+        code = ord(ch)
+        if _HANGUL_BASE <= code <= _HANGUL_LAST:
+            index = (code - _HANGUL_BASE) // (_JUNGSEONG_COUNT * _JONGSEONG_COUNT)
+            chars.append(CHOSEONG[index])
+        else:
+            chars.append(ch)
+    return "".join(chars)
+
+
+def normalize_name(text: str) -> str:
+    """검색 키 정규화 (공백 제거 + 대소문자 무시)"""
+    return re.sub(r"\s+", "", text or "").casefold()
+
+
+def _matches_mixed(query: str, key: str) -> bool:
+    """초성이 섞인 검색어('강ㄴ')가 키의 접두어와 맞는지 글자 단위로 확인"""
+    if len(query) > len(key):
+        return False
+    for q, k in zip(query, key):
+        if q in _CHOSEONG_SET:
+            if to_choseong(k) != q:
+                return False
+        elif q != k:
+            return False
+    return True
+
+
+class Gazetteer:
+    """정렬 배열 + bisect 기반 접두어 인덱스
+
+    각 지명에 대해 단어 시작 위치마다 접미 키를 만들어 '역삼'으로
+    '강남구 역삼동'을 찾을 수 있게 하고, 같은 키의 초성 버전도 색인함.
+    학습 항목은 expires_at이 지나면 검색되지 않고 같은 이름으로 다시 학습하면 갱신됨
+    """
+
+    def __init__(self):
+        self.entries: List[Dict] = []
+        # 정규화된 이름 → 항목 번호
+        self._names: Dict[str, int] = {}
+        self._keys: List[Tuple[str, int]] = []
+        # (초성 키, 원래 키, 항목 번호)
+        self._choseong_keys: List[Tuple[str, str, int]] = []
+        self.learned_count = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(
+        self,
+        name: str,
+        lat: float,
+        lng: float,
+        source: str,
+        category: str = "",
+        address: str = "",
+        expires_at: Optional[float] = None,
+    ) -> bool:
+        """지명 추가 (이미 있는 이름은 무시, 만료된 학습 항목은 새 값으로 갱신)
+
+        expires_at(유닉스 시각)이 있으면 그 이후로는 검색되지 않음
+        """
+        normalized = normalize_name(name)
+        if len(normalized) < 2:
+            return False
+        entry = {
+            "name": name.strip(),
+            "lat": float(lat),
+            "lng": float(lng),
+            "source": source,
+            "category": category,
+            "address": address or name.strip(),
+            "expires_at": expires_at,
+        }
+
+        existing = self._names.get(normalized)
+        if existing is not None:
+            if not self._is_expired(self.entries[existing], time.time()):
+                return False
+            # 같은 이름이므로 색인 키는 그대로 두고 내용만 교체
+            if self.entries[existing]["source"] == "geocode":
+                self.learned_count -= 1
+            if source == "geocode":
+                self.learned_count += 1
+            self.entries[existing] = entry
+            return True
+
+        if source == "geocode":
+            if self.learned_count >= MAX_LEARNED_ENTRIES:
+                self.purge_expired()
+            if self.learned_count >= MAX_LEARNED_ENTRIES:
+                return False
+            self.learned_count += 1
+
+        self._index(entry)
+        return True
+
+    @staticmethod
+    def _is_expired(entry: Dict, now: float) -> bool:
+        return entry["expires_at"] is not None and entry["expires_at"] <= now
+
+    def _index(self, entry: Dict):
+        entry_id = len(self.entries)
+        self.entries.append(entry)
+        name = entry["name"]
+        self._names[normalize_name(name)] = entry_id
+
+        # 단어 시작 위치마다 접미 키 생성 ('강남구 역삼동' → '강남구역삼동', '역삼동')
+        words = name.split()
+        for start in range(len(words)):
+            key = normalize_name("".join(words[start:]))
+            bisect.insort(self._keys, (key, entry_id))
+            bisect.insort(self._choseong_keys, (to_choseong(key), key, entry_id))
+
+    def purge_expired(self) -> int:
+        """만료된 항목을 빼고 색인을 다시 구성, 삭제한 항목 수 반환"""
+        now = time.time()
+        alive = [entry for entry in self.entries if not self._is_expired(entry, now)]
+        removed = len(self.entries) - len(alive)
+        if not removed:
+            return 0
+
+        self.entries, self._names = [], {}
+        self._keys, self._choseong_keys = [], []
+        for entry in alive:
+            self._index(entry)
+        self.learned_count = sum(1 for entry in alive if entry["source"] == "geocode")
+        logger.info(f"🧹 만료된 학습 지명 {removed}건 정리")
+        return removed
+
+    @staticmethod
+    def _prefix_scan(keys: List[Tuple], prefix: str):
+        start = bisect.bisect_left(keys, (prefix,))
+        for i in range(start, len(keys)):
+            if not keys[i][0].startswith(prefix):
+                break
+            yield keys[i]
+
+    def search(self, query: str, limit: int = 5) -> List[Dict]:
+        """접두어 검색 (초성만 입력해도 검색됨)"""
+        normalized = normalize_name(query)
+        if not normalized:
+            return []
+
+        if any(ch in _CHOSEONG_SET for ch in normalized):
+            # 초성이 섞인 검색어는 초성 인덱스로 후보를 찾고 글자 단위로 확인
+            matched = (
+                (key, entry_id)
+                for _, key, entry_id in self._prefix_scan(
+                    self._choseong_keys, to_choseong(normalized)
+                )
+                if _matches_mixed(normalized, key)
+            )
+        else:
+            matched = self._prefix_scan(self._keys, normalized)
+
+        now = time.time()
+        best: Dict[int, Tuple] = {}
+        for key, entry_id in matched:
+            entry = self.entries[entry_id]
+            if self._is_expired(entry, now):
+                continue
+            # 전체 이름 접두어 일치 > 짧은 이름 > 출처 우선순위
+            full_match = key == normalize_name(entry["name"])
+            rank = (
+                0 if full_match else 1,
+                len(entry["name"]),
+                SOURCE_PRIORITY.get(entry["source"], 9),
+            )
+            if entry_id not in best or rank < best[entry_id]:
+                best[entry_id] = rank
+
+        ranked = sorted(best, key=lambda entry_id: (best[entry_id], entry_id))
+        return [self.entries[entry_id] for entry_id in ranked[:limit]]
+
+
+def risk_zone_place_names(name: str) -> List[str]:
+    """위험지역 이름에서 검색용 지명 추출 ('광진구 건대입구역 일대' → 장소명, 역명)"""
+    names = []
+    parts = name.split(maxsplit=1)
+    if len(parts) == 2:
+        names.append(_TRAILING_NOISE.sub("", parts[1]).strip())
+    names.extend(_STATION_PATTERN.findall(name))
+    return names
+
+
+def to_place_result(entry: Dict) -> Dict:
+    """카카오 검색 응답 형식으로 변환"""
+    return {
+        "place_name": entry["name"],
+        "address_name": entry["address"],
+        "road_address_name": "",
+        "x": str(entry["lng"]),  # 경도
+        "y": str(entry["lat"]),  # 위도
+        "category_name": entry["category"],
+        "phone": "",
+        "place_url": "",
+    }
+
+
+# 전역 인스턴스
+gazetteer = Gazetteer()
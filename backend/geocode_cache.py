@@ -0,0 +1,231 @@
+# backend/geocode_cache.py - 지오코딩/지명 검색 결과 2단계 캐시 (메모리 LRU + SQLite)
+
+import os
+import re
+import json
+import time
+import sqlite3
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    from destination_processor import destination_processor
+
+    _basic_cleaning = destination_processor._basic_cleaning
+except ImportError as e:
+    logger.warning(f"⚠️ 목적지 정제 모듈 로드 실패, 공백 정리만 적용: {e}")
+
+    def _basic_cleaning(text: str) -> str:
+        return re.sub(r"\s+", " ", text).strip()
+
+
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", "geocode_cache.db")
+GEOCODE_CACHE_MEMORY_ENTRIES = int(os.getenv("GEOCODE_CACHE_MEMORY_ENTRIES", "2048"))
+
+# 제공자별 캐시 유효기간 (초). 주소 좌표는 거의 바뀌지 않으므로 길게 유지
+PROVIDER_TTLS = {
+    "nominatim": 30 * 24 * 3600,
+    "kakao": 24 * 3600,
+}
+# 결과 없음(negative) 캐시 유효기간 (초)
+NEGATIVE_TTLS = {
+    "nominatim": 3600,
+    "kakao": 600,
+}
+DEFAULT_TTL = 24 * 3600
+DEFAULT_NEGATIVE_TTL = 600
+
+# 저장된 결과가 없음을 나타내는 값 (JSON null과 구분)
+_NEGATIVE = {"__negative__": True}
+
+
+class GeocodeCache:
+    """제공자별 TTL을 갖는 지오코딩 결과 캐시
+
+    1단계는 프로세스 내 LRU, 2단계는 SQLite 파일로 재시작/워커 간에 공유됨
+    """
+
+    def __init__(
+        self,
+        path: str = GEOCODE_CACHE_PATH,
+        memory_entries: int = GEOCODE_CACHE_MEMORY_ENTRIES,
+    ):
+        self.path = path
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "disk_errors": 0,
+        }
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """검색어 정규화 (목적지 정제의 기본 정리 + 대소문자 무시)"""
+        return _basic_cleaning(query or "").casefold()
+
+    def _key(self, provider: str, query: str) -> str:
+        return f"{provider}:{self.normalize_query(query)}"
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocode_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+        return self._conn
+
+    def _disk_get(self, key: str) -> Optional[Tuple[float, Any]]:
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT value, expires_at FROM geocode_cache WHERE key = ?", (key,)
+                )
+                .fetchone()
+            )
+        if row is None:
+            return None
+        return row[1], json.loads(row[0])
+
+    def _disk_set(self, key: str, value: Any, expires_at: float):
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO geocode_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), expires_at),
+            )
+            conn.commit()
+
+    def _remember(self, key: str, expires_at: float, value: Any):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, provider: str, query: str) -> Tuple[bool, Any]:
+        """(캐시 적중 여부, 값) 반환. 결과 없음이 캐시된 경우 값은 None"""
+        key = self._key(provider, query)
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry is not None and entry[0] > now:
+            self._memory.move_to_end(key)
+            self.counters["memory_hits"] += 1
+        else:
+            try:
+                entry = await asyncio.to_thread(self._disk_get, key)
+            except Exception as e:
+                self.counters["disk_errors"] += 1
+                logger.warning(f"⚠️ 지오코딩 캐시 조회 실패: {e}")
+                entry = None
+
+            if entry is None or entry[0] <= now:
+                self.counters["misses"] += 1
+                return False, None
+            self._remember(key, *entry)
+            self.counters["disk_hits"] += 1
+
+        value = entry[1]
+        if value == _NEGATIVE:
+            self.counters["negative_hits"] += 1
+            return True, None
+        return True, value
+
+    async def set(self, provider: str, query: str, value: Any):
+        """결과 저장 (value가 None이면 결과 없음으로 짧게 캐시)"""
+        key = self._key(provider, query)
+        if value is None:
+            ttl = NEGATIVE_TTLS.get(provider, DEFAULT_NEGATIVE_TTL)
+            value = _NEGATIVE
+            expires_at = time.time() + ttl
+        else:
+            expires_at = self.positive_expiry(provider)
+
+        self._remember(key, expires_at, value)
+        self.counters["stores"] += 1
+        try:
+            await asyncio.to_thread(self._disk_set, key, value, expires_at)
+        except Exception as e:
+            self.counters["disk_errors"] += 1
+            logger.warning(f"⚠️ 지오코딩 캐시 저장 실패: {e}")
+
+    @staticmethod
+    def positive_expiry(provider: str) -> float:
+        """지금 저장하는 성공 결과의 만료 시각 (캐시 밖에서 결과를 보관할 때 같은 TTL 적용)"""
+        return time.time() + PROVIDER_TTLS.get(provider, DEFAULT_TTL)
+
+    def purge_expired(self) -> int:
+        """만료된 디스크 항목 삭제"""
+        try:
+            with self._lock:
+                conn = self._connect()
+                cursor = conn.execute(
+                    "DELETE FROM geocode_cache WHERE expires_at <= ?", (time.time(),)
+                )
+                conn.commit()
+            if cursor.rowcount:
+                logger.info(f"🧹 만료된 지오코딩 캐시 {cursor.rowcount}건 삭제")
+            return cursor.rowcount
+        except Exception as e:
+            logger.warning(f"⚠️ 지오코딩 캐시 정리 실패: {e}")
+            return 0
+
+    def positive_entries(self, provider: str) -> List[Tuple[str, Any, float]]:
+        """만료되지 않은 성공 결과 목록 (정규화된 검색어, 값, 만료 시각) - 지명 사전 초기화용"""
+        prefix = f"{provider}:"
+        try:
+            with self._lock:
+                rows = (
+                    self._connect()
+                    .execute(
+                        "SELECT key, value, expires_at FROM geocode_cache"
+                        " WHERE key >= ? AND key < ? AND expires_at > ?",
+                        (prefix, prefix + "\uffff", time.time()),
+                    )
+                    .fetchall()
+                )
+        except Exception as e:
+            logger.warning(f"⚠️ 지오코딩 캐시 목록 조회 실패: {e}")
+            return []
+
+        entries = []
+        for key, value, expires_at in rows:
+            value = json.loads(value)
+            if value != _NEGATIVE:
+                entries.append((key[len(prefix):], value, expires_at))
+        return entries
+
+    def stats(self) -> Dict:
+        lookups = sum(
+            self.counters[k] for k in ("memory_hits", "disk_hits", "misses")
+        )
+        hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+        return {
+            **self.counters,
+            "memory_entries": len(self._memory),
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# 전역 인스턴스
+geocode_cache = GeocodeCache()
@@ -0,0 +1,125 @@
+# backend/graph_store.py - 보행 그래프 바이너리 파일 (버전 헤더 + 정렬된 배열 + 체크섬, 읽기 전용 memmap)
+
+import json
+import logging
+import os
+import struct
+import zlib
+from typing import Dict, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 파일 구조: [매직 8B][형식 버전 u32][헤더 길이 u32][헤더 JSON][패딩][배열 데이터 (64바이트 정렬)]
+MAGIC = b"SWGRAPH\x00"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct("<8sII")
+
+
+class GraphFileError(Exception):
+    """그래프 파일 형식/버전/체크섬 오류"""
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def save_arrays(path: str, arrays: Dict[str, np.ndarray], metadata: Dict) -> int:
+    """배열 묶음과 메타데이터를 저장하고 파일 크기 반환
+
+    임시 파일에 쓴 뒤 os.replace로 교체하므로, 이전 파일을 memmap 중인 프로세스는
+    기존 내용을 그대로 사용함
+    """
+    entries = []
+    blocks = []
+    offset = 0
+    checksum = 0
+    for name, array in arrays.items():
+        # ascontiguousarray는 0차원 배열을 1차원으로 바꾸므로 직접 복사
+        array = np.asarray(array)
+        if not array.flags.c_contiguous:
+            array = array.copy(order="C")
+        if array.dtype.hasobject:
+            raise ValueError(f"객체 배열은 저장할 수 없습니다: {name}")
+        padding = _align(offset + array.nbytes) - (offset + array.nbytes)
+        entries.append({
+            "name": name,
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+        })
+        checksum = zlib.crc32(array.data.cast("B") if array.nbytes else b"", checksum)
+        checksum = zlib.crc32(b"\x00" * padding, checksum)
+        blocks.append((array, padding))
+        offset += array.nbytes + padding
+
+    header = json.dumps({
+        "metadata": metadata,
+        "arrays": entries,
+        "data_size": offset,
+        "data_crc32": checksum,
+    }).encode("utf-8")
+    preamble = _PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header))
+    header_end = len(preamble) + len(header)
+
+    temp_path = f"{path}.tmp{os.getpid()}"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(preamble)
+            f.write(header)
+            f.write(b"\x00" * (_align(header_end) - header_end))
+            for array, padding in blocks:
+                f.write(array.data.cast("B") if array.nbytes else b"")
+                f.write(b"\x00" * padding)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return _align(header_end) + offset
+
+
+def load_arrays(path: str, verify: bool = True) -> Tuple[Dict[str, np.ndarray], Dict]:
+    """파일을 읽기 전용으로 memmap 하고 (배열 뷰, 메타데이터) 반환
+
+    배열은 복사하지 않으므로 같은 파일을 여는 여러 워커가 페이지 캐시를 공유함.
+    verify=True면 데이터 영역의 CRC32를 확인함
+    """
+    try:
+        mapped = np.memmap(path, dtype=np.uint8, mode="r")
+    except (OSError, ValueError) as e:
+        raise GraphFileError(f"파일을 열 수 없습니다: {e}") from e
+
+    if len(mapped) < _PREAMBLE.size:
+        raise GraphFileError("파일이 너무 짧습니다")
+    magic, version, header_length = _PREAMBLE.unpack(mapped[:_PREAMBLE.size].tobytes())
+    if magic != MAGIC:
+        raise GraphFileError("그래프 파일이 아닙니다")
+    if version != FORMAT_VERSION:
+        raise GraphFileError(f"지원하지 않는 형식 버전: {version}")
+
+    header_end = _PREAMBLE.size + header_length
+    try:
+        header = json.loads(mapped[_PREAMBLE.size:header_end].tobytes().decode("utf-8"))
+    except ValueError as e:
+        raise GraphFileError(f"헤더를 읽을 수 없습니다: {e}") from e
+
+    data_start = _align(header_end)
+    data_size = header["data_size"]
+    if len(mapped) < data_start + data_size:
+        raise GraphFileError("파일이 잘렸습니다")
+    data = mapped[data_start:data_start + data_size]
+    if verify and zlib.crc32(data) != header["data_crc32"]:
+        raise GraphFileError("체크섬이 일치하지 않습니다")
+
+    arrays = {}
+    for entry in header["arrays"]:
+        # memmap 하위 클래스 대신 같은 버퍼를 가리키는 일반 ndarray 뷰로 생성
+        arrays[entry["name"]] = np.ndarray(
+            shape=tuple(entry["shape"]),
+            dtype=np.dtype(entry["dtype"]),
+            buffer=data,
+            offset=entry["offset"],
+        )
+    return arrays, header["metadata"]
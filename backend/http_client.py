@@ -0,0 +1,70 @@
+# backend/http_client.py - 애플리케이션 공용 aiohttp 클라이언트
+
+import os
+import logging
+from typing import Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# 커넥션 풀 설정 (환경변수로 조정 가능)
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "20"))
+HTTP_KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "60"))
+HTTP_DNS_CACHE_SECONDS = int(os.getenv("HTTP_DNS_CACHE_SECONDS", "300"))
+HTTP_TOTAL_TIMEOUT_SECONDS = float(os.getenv("HTTP_TOTAL_TIMEOUT_SECONDS", "30"))
+HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+
+DEFAULT_USER_AGENT = "Seoul-Safety-Navigation/1.0"
+
+
+class SharedHTTPClient:
+    """OSRM/Nominatim 등 외부 API 호출용 공유 세션
+
+    startup에서 한 번 생성해 각 서비스에 주입하므로 호스트별 keep-alive 연결과
+    TLS 핸드셰이크, DNS 조회 결과를 모든 요청이 재사용함.
+    aiohttp는 HTTP/1.1 파이프라이닝을 지원하지 않으므로 동시 요청은 호스트별
+    연결 수(limit_per_host)로 병렬화함
+    """
+
+    def __init__(self):
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=HTTP_POOL_LIMIT,
+                limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+                keepalive_timeout=HTTP_KEEPALIVE_SECONDS,
+                ttl_dns_cache=HTTP_DNS_CACHE_SECONDS,
+                use_dns_cache=True,
+                enable_cleanup_closed=True,
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    total=HTTP_TOTAL_TIMEOUT_SECONDS,
+                    connect=HTTP_CONNECT_TIMEOUT_SECONDS,
+                ),
+                headers={"User-Agent": DEFAULT_USER_AGENT},
+            )
+            logger.info(
+                f"🌐 공용 HTTP 클라이언트 생성 (전체 {HTTP_POOL_LIMIT}, "
+                f"호스트별 {HTTP_POOL_LIMIT_PER_HOST} 연결)"
+            )
+        return self.session
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """공유 세션 반환 (startup 이전 호출 시 즉시 생성)"""
+        return await self.start()
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+            logger.info("🌐 공용 HTTP 클라이언트 종료")
+
+
+# 전역 인스턴스
+http_client = SharedHTTPClient()
@@ -0,0 +1,105 @@
+# backend/kakao_search.py - 카카오 로컬 키워드 검색 (비동기)
+
+import os
+import asyncio
+import logging
+from typing import Dict, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+KAKAO_KEYWORD_SEARCH_URL = "https://dapi.kakao.com/v2/local/search/keyword.json"
+
+# 카카오 API 응답 코드별 안내 메시지
+KAKAO_ERROR_MESSAGES = {
+    400: "잘못된 요청입니다.",
+    401: "API 키가 유효하지 않습니다.",
+    403: "API 키 권한이 없습니다.",
+    429: "API 호출 한도를 초과했습니다.",
+}
+
+
+class KakaoSearchService:
+    """카카오맵 키워드 검색 서비스 (공용 aiohttp 세션 사용)"""
+
+    def __init__(self, api_key: Optional[str] = None, timeout_seconds: float = 10):
+        self._api_key = api_key
+        self.timeout = aiohttp.ClientTimeout(total=timeout_seconds)
+        self.session = None
+        self._owns_session = False
+
+    @property
+    def api_key(self) -> str:
+        # main.py의 load_dotenv() 이후 값을 읽도록 호출 시점에 조회
+        return self._api_key or os.getenv("KAKAO_API_KEY", "YOUR_KAKAO_REST_API_KEY")
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key) and self.api_key != "YOUR_KAKAO_REST_API_KEY"
+
+    def use_shared_session(self, session: aiohttp.ClientSession):
+        """애플리케이션 공용 세션 주입 (세션 종료는 공용 클라이언트가 관리)"""
+        self.session = session
+        self._owns_session = False
+
+    async def get_session(self):
+        if not self.session or self.session.closed:
+            self.session = aiohttp.ClientSession()
+            self._owns_session = True
+        return self.session
+
+    async def close_session(self):
+        if self.session and self._owns_session:
+            await self.session.close()
+        self.session = None
+
+    async def search_keyword(self, query: str, size: int = 5) -> Dict:
+        """키워드로 장소 검색 (기존 /search-location 응답 형식)"""
+        if not self.configured:
+            return {"places": [], "error": "카카오 API 키가 설정되지 않았습니다."}
+
+        headers = {"Authorization": f"KakaoAK {self.api_key}"}
+        params = {"query": query.strip(), "size": size, "page": 1, "sort": "accuracy"}
+
+        try:
+            session = await self.get_session()
+            async with session.get(
+                KAKAO_KEYWORD_SEARCH_URL,
+                headers=headers,
+                params=params,
+                timeout=self.timeout,
+            ) as response:
+                if response.status != 200:
+                    error = KAKAO_ERROR_MESSAGES.get(
+                        response.status, f"API 호출 실패: {response.status}"
+                    )
+                    return {"places": [], "error": error}
+                data = await response.json()
+
+        except asyncio.TimeoutError:
+            return {"places": [], "error": "검색 시간이 초과되었습니다."}
+        except Exception as e:
+            logger.error(f"❌ 카카오 지명 검색 오류: {e}")
+            return {"places": [], "error": "검색 중 오류가 발생했습니다."}
+
+        formatted_places = []
+        for place in data.get("documents", []):
+            formatted_places.append(
+                {
+                    "place_name": place.get("place_name", ""),
+                    "address_name": place.get("address_name", ""),
+                    "road_address_name": place.get("road_address_name", ""),
+                    "x": place.get("x", ""),  # 경도
+                    "y": place.get("y", ""),  # 위도
+                    "category_name": place.get("category_name", ""),
+                    "phone": place.get("phone", ""),
+                    "place_url": place.get("place_url", ""),
+                }
+            )
+
+        return {"places": formatted_places, "total_count": len(formatted_places)}
+
+
+# 전역 인스턴스
+kakao_search_service = KakaoSearchService()
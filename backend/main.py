@@ -1,19 +1,20 @@
 # backend/main.py - 정리된 FastAPI 메인 애플리케이션
 
-from fastapi import FastAPI, Depends, HTTPException, status, File, Form, UploadFile
+from fastapi import FastAPI, Depends, HTTPException, status, File, Form, UploadFile, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import uvicorn
 from datetime import datetime, timedelta
 import random
 import math
 from math import radians, cos, sin, asin, sqrt
-import requests
 import os
 import base64
+import hashlib
+import json
 import aiohttp
 import tempfile
 import wave
@@ -26,13 +27,40 @@ import logging
 import traceback
 import subprocess
 import pandas as pd
+import numpy as np
 import csv
 import shutil
 from pathlib import Path
+from collections import OrderedDict
 from exercise_route_service import exercise_route_service
+from enhanced_routing_service import enhanced_routing_service
+from http_client import http_client
+from kakao_search import kakao_search_service
+from geocode_cache import geocode_cache
+from route_cache import route_cache
+from single_flight import single_flight
+from osrm_pool import osrm_pool
+from gazetteer import gazetteer, normalize_name, risk_zone_place_names, to_place_result
 from sinkhole_analysis_service import sinkhole_analyzer
+from zone_index import (
+    ZoneSpatialIndex,
+    grid_clusters,
+    zones_near_polyline,
+    polylines_zone_hits,
+    project_to_plane,
+    unproject_from_plane,
+    CLUSTER_MAX_ZOOM,
+)
+from construction_data import (
+    ConstructionDataset,
+    CONSTRUCTION_STATUSES,
+    CONSTRUCTION_STATUS_ALIASES,
+    find_construction_csv,
+    load_construction_dataset,
+)
+from risk_raster import RiskRaster
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 
 # 로컬 모듈 임포트
 from chatbot_routes import chatbot_router
@@ -43,6 +71,8 @@ from schemas import (
     UserResponse,
     LocationRequest,
     RiskResponse,
+    BatchRiskRequest,
+    BatchRiskResponse,
     RouteRequest,
     RouteResponse,
     RouteStep,
@@ -70,6 +100,13 @@ if not logging.getLogger().handlers:
     )
 logger = logging.getLogger(__name__)
 
+# 로컬 보행 그래프 라우터 (psycopg2 필요, 없으면 OSRM만 사용)
+try:
+    from simple_osm_routing import init_pedestrian_router
+except ImportError as e:
+    logger.warning(f"⚠️ 로컬 보행 라우터 모듈 로드 실패: {e}")
+    init_pedestrian_router = None
+
 # 목적지 처리 모듈 import (오류 처리 포함)
 try:
     from destination_processor import process_destination_text, destination_processor
@@ -391,247 +428,242 @@ RISK_ZONES = [
   {"lat": 37.5050, "lng": 126.9390, "risk": 0.83, "name": "동작구 상도동"},
   {"lat": 37.5000, "lng": 126.9200, "risk": 0.84, "name": "동작구 신대방동"}
 ]
-# 오픈 소스 라우팅 서비스
-OSRM_BASE_URL = "https://router.project-osrm.org"
+# 오픈 소스 라우팅 서비스 (OSRM 서버 목록은 osrm_pool의 OSRM_SERVERS 환경변수)
 NOMINATIM_BASE_URL = "https://nominatim.openstreetmap.org"
+# 안전 경로: 한 번에 받을 OSRM 대안 경로 수, 병렬 우회 경유지의 수직 거리(km)
+SAFE_ROUTE_ALTERNATIVES = 3
+DETOUR_OFFSETS_KM = (0.5, 1.0)
 
 
 ##################### 공사장 정보 로드 로직 (추가) #####################
-CONSTRUCTION_DATA = []
+# 컬럼형 데이터셋 (NumPy 배열). dict 목록이 필요하면 CONSTRUCTION_DATASET.records 사용
+CONSTRUCTION_DATASET = ConstructionDataset.empty()
 
+# 공사장 CSV 변경 감시 주기 (초)
+ZONE_RELOAD_INTERVAL_SECONDS = float(os.getenv("ZONE_RELOAD_INTERVAL_SECONDS", "30"))
 
-def load_construction_data():
-    """CSV 파일에서 공사정보 데이터를 로드 (수정된 버전)"""
-    global CONSTRUCTION_DATA
 
-    logger.info("🏗️ 공사장 데이터 로드 시작...")
+##################### 위험지역 공간 인덱스 #####################
+# RISK_ZONES + 진행중 공사장에 대한 KDTree. 데이터 교체 시 swap_zone_state()로 갱신
+ZONE_INDEX = ZoneSpatialIndex(RISK_ZONES)
+# /risk-zones 뷰포트 조회용 (고정 위험지역만)
+RISK_ZONE_INDEX = ZoneSpatialIndex(RISK_ZONES)
 
-    try:
-        # 현재 작업 디렉토리 확인
-        current_dir = os.getcwd()
-        logger.info(f"📂 현재 디렉토리: {current_dir}")
-
-        # 가능한 CSV 파일 경로들 (순서대로 시도)
-        possible_paths = [
-            "필터링결과.csv",
-            "./필터링결과.csv",
-            "../필터링결과.csv",
-            "data/필터링결과.csv",
-            os.path.join(current_dir, "필터링결과.csv"),
-            # 백엔드 폴더 안에 있을 경우를 대비
-            os.path.join(os.path.dirname(__file__), "필터링결과.csv"),
-            # 상위 디렉토리에 있을 경우를 대비
-            os.path.join(os.path.dirname(os.path.dirname(__file__)), "필터링결과.csv"),
-        ]
+# 서울 범위 위험도 래스터 (2km 밖은 0으로 두어 타일에서 투명 처리)
+RISK_RASTER = RiskRaster(
+    lambda distances, risks: calculate_risk_scores(distances, risks, far_score=0.0)
+)
 
-        csv_file_path = None
-        for path in possible_paths:
-            logger.info(f"📁 경로 확인: {path}")
-            if os.path.exists(path):
-                csv_file_path = path
-                logger.info(f"✅ CSV 파일 발견: {path}")
-                break
-            else:
-                logger.debug(f"❌ 파일 없음: {path}")
+# 데이터셋/인덱스가 교체될 때마다 1씩 증가 (파생 캐시 키로 사용)
+ZONE_DATA_GENERATION = 0
+# 현재 적재된 CSV의 (경로, 크기, 수정시각)
+CONSTRUCTION_SOURCE_SIGNATURE: Optional[tuple] = None
 
-        if not csv_file_path:
-            logger.error("❌ 필터링결과.csv 파일을 찾을 수 없습니다!")
-            logger.info("🔍 다음 위치들을 확인하세요:")
-            for path in possible_paths:
-                logger.info(f"   - {path}")
+# 이벤트 루프에 묶이므로 startup에서 생성
+zone_reload_lock: Optional[asyncio.Lock] = None
+zone_watcher_task: Optional[asyncio.Task] = None
 
-            # 디렉토리의 CSV 파일들 확인
-            try:
-                csv_files = [f for f in os.listdir(current_dir) if f.endswith(".csv")]
-                if csv_files:
-                    logger.info(f"📋 현재 디렉토리의 CSV 파일들: {csv_files}")
-                else:
-                    logger.info("📋 현재 디렉토리에 CSV 파일이 없습니다")
-            except Exception as e:
-                logger.warning(f"⚠️ 디렉토리 확인 실패: {e}")
+# 위험 가중 로컬 보행 그래프 (실제 OSM 데이터가 로드된 경우에만 사용, 그 외엔 OSRM)
+LOCAL_ROUTER_ENABLED = os.getenv("LOCAL_ROUTER_ENABLED", "true").lower() == "true"
+LOCAL_ROUTER = None
+local_router_task: Optional[asyncio.Task] = None
+# 로컬 그래프에서 가중치를 올릴 위험도 하한 (안전 경로 회피 대상과 동일)
+LOCAL_ROUTER_MIN_RISK = 0.6
 
-            # 더미 데이터 생성
-            logger.info("🔧 더미 데이터를 생성합니다...")
-            CONSTRUCTION_DATA = generate_dummy_construction_data()
-            return
 
-        # 파일 크기 확인
-        file_size = os.path.getsize(csv_file_path)
-        logger.info(f"📋 파일 크기: {file_size} bytes")
+def get_construction_source_signature() -> Optional[tuple]:
+    """공사장 CSV 변경 감지용 서명 (파일이 없으면 None)"""
+    csv_file_path = find_construction_csv(verbose=False)
+    if not csv_file_path:
+        return None
+    stat = os.stat(csv_file_path)
+    return (os.path.abspath(csv_file_path), stat.st_size, stat.st_mtime_ns)
 
-        if file_size == 0:
-            logger.error("❌ CSV 파일이 비어있습니다!")
-            CONSTRUCTION_DATA = generate_dummy_construction_data()
-            return
 
-        # CSV 파일 읽기 (여러 인코딩 시도)
-        df = None
-        encodings = ["utf-8", "cp949", "euc-kr", "utf-8-sig"]
+def compute_risk_raster(
+    previous_index: ZoneSpatialIndex, index: ZoneSpatialIndex
+) -> Optional[np.ndarray]:
+    """새 위험도 래스터 계산 (추가/삭제/위험도 변경된 지역 주변만, 변경 없으면 None)"""
+    if not RISK_RASTER.is_ready:
+        return RISK_RASTER.compute_full(index)
 
-        for encoding in encodings:
-            try:
-                logger.info(f"📖 인코딩 시도: {encoding}")
-                df = pd.read_csv(csv_file_path, encoding=encoding)
-                logger.info(f"✅ CSV 로드 성공 (인코딩: {encoding})")
-                break
-            except UnicodeDecodeError:
-                logger.warning(f"⚠️ 인코딩 실패: {encoding}")
-                continue
-            except Exception as e:
-                logger.error(f"❌ CSV 로드 오류 ({encoding}): {e}")
-                continue
+    def zone_key(zone):
+        return (zone["lat"], zone["lng"], zone.get("risk", 0.0))
 
-        if df is None:
-            logger.error("❌ 모든 인코딩으로 CSV 로드 실패!")
-            CONSTRUCTION_DATA = generate_dummy_construction_data()
-            return
+    previous = {zone_key(z): z for z in previous_index.zones}
+    current = {zone_key(z): z for z in index.zones}
+    changed = [previous[k] for k in previous.keys() - current.keys()]
+    changed += [current[k] for k in current.keys() - previous.keys()]
+    return RISK_RASTER.compute_update(index, changed)
 
-        logger.info(f"📊 CSV 로드 성공: {len(df)}개 행, {len(df.columns)}개 컬럼")
-        logger.info(f"📋 컬럼 목록: {list(df.columns)}")
 
-        # 필수 컬럼 확인
-        required_columns = ["위도", "경도", "지오코딩주소"]
-        missing_columns = [col for col in required_columns if col not in df.columns]
+def risk_penalty_inputs(index: ZoneSpatialIndex):
+    """로컬 보행 그래프 위험 가중치 계산용 (위도, 경도, 위험도) 배열"""
+    mask = index.risk > LOCAL_ROUTER_MIN_RISK
+    return index.lat[mask], index.lng[mask], index.risk[mask]
 
-        if missing_columns:
-            logger.error(f"❌ 필수 컬럼 누락: {missing_columns}")
-            logger.info(f"📋 사용 가능한 컬럼: {list(df.columns)}")
-            CONSTRUCTION_DATA = generate_dummy_construction_data()
-            return
 
-        # 데이터 처리
-        construction_list = []
-        success_count = 0
-        error_count = 0
+def build_zone_state(csv_file_path: Optional[str] = None):
+    """공사장 데이터셋과 인덱스/래스터를 새로 구축 (워커 스레드에서 실행, 전역 상태는 바꾸지 않음)"""
+    dataset = load_construction_dataset(csv_file_path)
+    dataset.spatial_index  # bbox 조회용 인덱스를 요청 경로 밖에서 미리 구축
 
-        logger.info("🔄 데이터 처리 시작...")
+    active_zones = dataset.select(dataset.status_indices("진행중"))
+    index = ZoneSpatialIndex(RISK_ZONES + active_zones)
+    logger.info(f"🗂️ 위험지역 공간 인덱스 구축 완료: {len(index)}개 지역")
 
-        for idx, row in df.iterrows():
-            try:
-                # 위도, 경도 확인
-                lat = row.get("위도")
-                lng = row.get("경도")
-                address = row.get("지오코딩주소")
-
-                # 데이터 유효성 검사
-                if pd.isna(lat) or pd.isna(lng) or pd.isna(address):
-                    error_count += 1
-                    if error_count <= 3:  # 처음 3개 오류만 로깅
-                        logger.warning(
-                            f"⚠️ 행 {idx}: 필수 데이터 누락 (lat={lat}, lng={lng}, address={address})"
-                        )
-                    continue
+    raster_grid = compute_risk_raster(ZONE_INDEX, index)
 
-                try:
-                    lat = float(lat)
-                    lng = float(lng)
-                except (ValueError, TypeError):
-                    error_count += 1
-                    if error_count <= 3:
-                        logger.warning(
-                            f"⚠️ 행 {idx}: 좌표 변환 실패 (lat={lat}, lng={lng})"
-                        )
-                    continue
+    # 로컬 보행 그래프의 엣지 위험 가중치도 미리 계산해 두고 교체 시점에 반영
+    penalties = None
+    if LOCAL_ROUTER is not None:
+        penalties = LOCAL_ROUTER.compute_risk_penalties(*risk_penalty_inputs(index))
+    return dataset, index, penalties, raster_grid
 
-                # 서울 지역 좌표 범위 확인 (더 넓게 설정)
-                if not (37.3 <= lat <= 37.8 and 126.7 <= lng <= 127.3):
-                    error_count += 1
-                    if error_count <= 3:
-                        logger.warning(
-                            f"⚠️ 행 {idx}: 서울 지역 외 좌표 (lat={lat}, lng={lng})"
-                        )
-                    continue
 
-                # 공사 상태 결정
-                status = determine_construction_status(row)
-                risk_level = calculate_construction_risk(status)
-
-                construction_item = {
-                    "id": f"CONST-{len(construction_list) + 1}",
-                    "lat": lat,
-                    "lng": lng,
-                    "address": str(address).strip(),
-                    "status": status,
-                    "type": "도로굴착공사",
-                    "risk_level": risk_level,
-                    "name": f"공사지역: {str(address).strip()[:50]}",  # 50자 제한
-                    "risk": risk_level,  # risk 키 추가
-                }
+def swap_zone_state(
+    dataset: ConstructionDataset,
+    index: ZoneSpatialIndex,
+    penalties=None,
+    raster_grid: Optional[np.ndarray] = None,
+):
+    """새 데이터셋/인덱스/래스터를 한 번에 교체 (이벤트 루프에서만 호출)"""
+    global CONSTRUCTION_DATASET, ZONE_INDEX, ZONE_DATA_GENERATION
+    CONSTRUCTION_DATASET, ZONE_INDEX = dataset, index
+    if raster_grid is not None:
+        RISK_RASTER.install(raster_grid)
+    if penalties is not None and LOCAL_ROUTER is not None:
+        LOCAL_ROUTER.edge_penalty = penalties
+    ZONE_DATA_GENERATION += 1
+    logger.info(
+        f"🔁 공사장 데이터 교체 완료: 세대 {ZONE_DATA_GENERATION}, "
+        f"{len(dataset)}건, 버전 {dataset.version}"
+    )
 
-                construction_list.append(construction_item)
-                success_count += 1
 
-                # 처음 3개는 상세 로깅
-                if success_count <= 3:
-                    logger.info(
-                        f"📍 공사장 {success_count}: {construction_item['address'][:30]}... (상태: {status})"
-                    )
+async def reload_zone_data(reason: str):
+    """공사장 데이터를 백그라운드 스레드에서 다시 로드한 뒤 원자적으로 교체"""
+    global CONSTRUCTION_SOURCE_SIGNATURE
 
-            except Exception as e:
-                error_count += 1
-                if error_count <= 3:
-                    logger.error(f"❌ 행 {idx} 처리 실패: {e}")
-                continue
+    async with zone_reload_lock:
+        signature = get_construction_source_signature()
+        logger.info(f"🏗️ 공사장 데이터 재로드 시작 ({reason})")
+        dataset, index, penalties, raster_grid = await asyncio.to_thread(
+            build_zone_state, signature[0] if signature else None
+        )
+        swap_zone_state(dataset, index, penalties, raster_grid)
+        # 로드 시작 전 서명을 저장해 로드 중 변경된 파일은 다음 주기에 다시 반영
+        CONSTRUCTION_SOURCE_SIGNATURE = signature
 
-        # 결과 저장
-        CONSTRUCTION_DATA = construction_list
 
-        logger.info(f"✅ 공사정보 데이터 로드 완료!")
-        logger.info(f"   📊 성공: {success_count}건")
-        logger.info(f"   ❌ 실패: {error_count}건")
-        logger.info(
-            f"   📈 성공률: {(success_count/(success_count+error_count))*100:.1f}%"
-            if (success_count + error_count) > 0
-            else "0%"
-        )
+async def init_local_router():
+    """로컬 보행 그래프 로드 (미리 빌드된 그래프 파일을 백그라운드에서 memmap)"""
+    global LOCAL_ROUTER
 
-        # 상태별 통계
-        if construction_list:
-            status_counts = {}
-            for item in construction_list:
-                status = item["status"]
-                status_counts[status] = status_counts.get(status, 0) + 1
-            logger.info(f"📊 상태별 통계: {status_counts}")
+    try:
+        router = await asyncio.to_thread(init_pedestrian_router)
+        if router is None or not router.is_osm_network:
+            logger.warning("⚠️ 실제 OSM 보행 그래프가 없어 안전 경로는 OSRM을 사용합니다")
+            return
 
+        # 재로드와 겹치지 않도록 잠금 안에서 현재 위험지역 기준 가중치 적용
+        async with zone_reload_lock:
+            await asyncio.to_thread(
+                router.apply_risk_penalties, *risk_penalty_inputs(ZONE_INDEX)
+            )
+            LOCAL_ROUTER = router
+        logger.info(
+            f"🧭 로컬 보행 그래프 준비 완료: {router.graph.node_count:,}개 노드"
+        )
     except Exception as e:
-        logger.error(f"❌ 공사정보 데이터 로드 중 전체 오류: {e}")
-        logger.error(f"📄 오류 상세: {traceback.format_exc()}")
-        CONSTRUCTION_DATA = generate_dummy_construction_data()
+        logger.error(f"❌ 로컬 보행 그래프 초기화 실패: {e}")
+
+
+def local_safe_route(
+    router,
+    start_lat: float,
+    start_lng: float,
+    end_lat: float,
+    end_lng: float,
+    avoid_zones: List[Dict],
+) -> Optional[Dict]:
+    """로컬 그래프 안전 경로 (워커 스레드에서 실행, 경로가 없으면 None)"""
+    safe = router.find_route(start_lat, start_lng, end_lat, end_lng, risk_weighted=True)
+    if safe is None:
+        return None
+    base = router.find_route(start_lat, start_lng, end_lat, end_lng)
+
+    # 가중치를 올린 지역과 같은 기준으로 회피 여부 판단
+    hazard_zones = [
+        zone for zone in avoid_zones if zone.get("risk", 0) > LOCAL_ROUTER_MIN_RISK
+    ]
+    crossing_safe = walking_service.find_crossing_zones(
+        safe["waypoints"], hazard_zones, 0.5
+    )
+    crossing_base = (
+        walking_service.find_crossing_zones(base["waypoints"], hazard_zones, 0.5)
+        if base
+        else crossing_safe
+    )
+    still_crossing = {id(zone) for zone in crossing_safe}
+    avoided = [zone for zone in crossing_base if id(zone) not in still_crossing]
+    route_type, message = describe_safe_route(avoided, crossing_safe)
 
+    return {
+        "success": True,
+        "waypoints": safe["waypoints"],
+        "distance": safe["distance"],
+        "duration": safe["duration"],
+        "steps": safe["steps"],
+        "route_type": route_type,
+        "avoided_zones": avoided,
+        "message": message,
+        "engine": "local_graph",
+    }
 
-def determine_construction_status(row):
-    """공사 상태 판단 로직"""
-    statuses = ["진행중", "완료", "예정"]
-    weights = [0.3, 0.6, 0.1]
-    return random.choices(statuses, weights=weights)[0]
 
+async def find_safe_walking_route(
+    start_lat: float,
+    start_lng: float,
+    end_lat: float,
+    end_lng: float,
+    avoid_zones: List[Dict],
+) -> Dict:
+    """안전 경로 계산 (로컬 위험 가중 그래프 우선, 없거나 실패하면 OSRM)"""
+    router = LOCAL_ROUTER
+    if router is not None:
+        try:
+            result = await asyncio.to_thread(
+                local_safe_route,
+                router,
+                start_lat,
+                start_lng,
+                end_lat,
+                end_lng,
+                avoid_zones,
+            )
+            if result is not None:
+                return result
+        except Exception as e:
+            logger.warning(f"⚠️ 로컬 안전 경로 실패, OSRM 사용: {e}")
 
-def calculate_construction_risk(status):
-    """공사 상태에 따른 위험도 계산"""
-    if status == "진행중":
-        return random.uniform(0.6, 0.9)
-    elif status == "예정":
-        return random.uniform(0.3, 0.6)
-    else:
-        return random.uniform(0.1, 0.3)
+    return await walking_service.get_safe_walking_route(
+        start_lat, start_lng, end_lat, end_lng, avoid_zones
+    )
 
 
-def generate_dummy_construction_data():
-    """더미 공사정보 데이터 생성 (파일 로드 실패 시)"""
-    logger.info("🔧 더미 공사정보 데이터를 생성합니다.")
-    return [
-        {
-            "id": "CONST-DUMMY-1",
-            "lat": 37.5665,
-            "lng": 126.9780,
-            "address": "서울시 중구 명동 (더미)",
-            "status": "진행중",
-            "type": "도로굴착공사",
-            "risk_level": 0.75,
-            "name": "공사지역: 서울시 중구 명동 (더미)",
-            "risk": 0.75,
-        }
-    ]
+async def watch_construction_csv():
+    """공사장 CSV 변경 감시 (수정시각/크기 변경 시 재로드)"""
+    while True:
+        await asyncio.sleep(ZONE_RELOAD_INTERVAL_SECONDS)
+        try:
+            signature = await asyncio.to_thread(get_construction_source_signature)
+            if signature != CONSTRUCTION_SOURCE_SIGNATURE:
+                await reload_zone_data("CSV 변경 감지")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ 공사장 데이터 재로드 실패: {e}")
 
 
 ######################################################################
@@ -1036,6 +1068,43 @@ def calculate_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> fl
     return R * c
 
 
+# 위험도 레벨 경계값 (오름차순) 및 배치 계산 시 최대 지점 수
+RISK_LEVEL_THRESHOLDS = [0.2, 0.4, 0.6, 0.8]
+MAX_BATCH_RISK_POINTS = 10000
+
+
+def calculate_risk_scores(
+    min_distances: np.ndarray,
+    nearest_risks: np.ndarray,
+    far_score: Optional[float] = None,
+) -> np.ndarray:
+    """최근접 위험지역 거리(km)와 위험도로 위험도 점수 계산 (벡터화)
+
+    far_score를 지정하지 않으면 2km 밖 지점은 0.1~0.3 사이 임의값을 사용
+    """
+    min_distances = np.asarray(min_distances, dtype=np.float64)
+    nearest_risks = np.asarray(nearest_risks, dtype=np.float64)
+
+    if far_score is None:
+        far_score = np.random.uniform(0.1, 0.3, size=min_distances.shape)
+
+    # 거리에 따른 위험도 조정 (500m / 1km / 2km 구간)
+    return np.select(
+        [min_distances < 0.5, min_distances < 1.0, min_distances < 2.0],
+        [
+            np.maximum(0.7, nearest_risks),
+            np.maximum(0.4, nearest_risks * 0.7),
+            np.maximum(0.2, nearest_risks * 0.5),
+        ],
+        default=far_score,
+    )
+
+
+def get_risk_level_codes(risk_scores: np.ndarray) -> np.ndarray:
+    """위험도 점수를 RISK_LEVEL_TABLE 인덱스로 변환 (벡터화)"""
+    return np.searchsorted(RISK_LEVEL_THRESHOLDS, risk_scores, side="right")
+
+
 def get_risk_level(risk_score: float) -> str:
     """위험도 점수를 레벨로 변환"""
     if risk_score >= 0.8:
@@ -1065,6 +1134,13 @@ def get_risk_message(risk_score: float) -> str:
         return "안전한 지역입니다."
 
 
+# 레벨 코드 → (레벨, 메시지) 테이블 ("안전"부터 "매우 위험" 순)
+RISK_LEVEL_TABLE = [
+    {"level": get_risk_level(score), "message": get_risk_message(score)}
+    for score in [0.0] + RISK_LEVEL_THRESHOLDS
+]
+
+
 def analyze_audio_file(audio_content: bytes) -> dict:
     """오디오 파일 분석 및 디버깅 정보 제공"""
     try:
@@ -1195,26 +1271,64 @@ def generate_stt_recommendations(debug_info: dict) -> list:
 # =============================================================================
 
 
+def describe_safe_route(avoided: List[Dict], still_crossing: List[Dict]) -> Tuple[str, str]:
+    """안전 경로 결과 분류 (route_type, 안내 메시지)
+
+    avoided는 기본 경로에서 지나던 지역 중 선택한 경로가 피한 지역,
+    still_crossing은 선택한 경로가 여전히 지나는 지역
+    """
+    if still_crossing and avoided:
+        return (
+            "partial_detour",
+            f"{len(avoided)}개의 위험지역을 우회했지만 {len(still_crossing)}개는 "
+            f"피할 수 없는 경로입니다. 주의하세요.",
+        )
+    if still_crossing:
+        return (
+            "direct_with_warning",
+            f"{len(still_crossing)}개의 위험지역을 피할 수 없는 경로입니다. 주의하세요.",
+        )
+    if avoided:
+        return "safe_detour", f"{len(avoided)}개의 위험지역을 우회하는 안전 경로입니다."
+    return "direct", "안전한 직선 경로입니다."
+
+
 class WalkingRouteService:
     """도보 경로 안내 서비스"""
 
     def __init__(self):
         self.session = None
+        self._owns_session = False
+
+    def use_shared_session(self, session: aiohttp.ClientSession):
+        """애플리케이션 공용 세션 주입 (세션 종료는 공용 클라이언트가 관리)"""
+        self.session = session
+        self._owns_session = False
 
     async def get_session(self):
-        """비동기 HTTP 세션 생성"""
-        if not self.session:
+        """비동기 HTTP 세션 (공용 세션이 주입되지 않았으면 자체 생성)"""
+        if not self.session or self.session.closed:
             self.session = aiohttp.ClientSession()
+            self._owns_session = True
         return self.session
 
     async def close_session(self):
-        """세션 정리"""
-        if self.session:
+        """세션 정리 (자체 생성한 세션만 닫음)"""
+        if self.session and self._owns_session:
             await self.session.close()
-            self.session = None
+        self.session = None
 
     async def geocode_address(self, address: str) -> Dict:
-        """주소를 좌표로 변환 (Nominatim API 사용)"""
+        """주소를 좌표로 변환 (Nominatim API 사용, 결과 캐시)"""
+        cached, result = await geocode_cache.get("nominatim", address)
+        if cached:
+            return result
+
+        key = "nominatim|" + geocode_cache.normalize_query(address)
+        return await single_flight.do(key, lambda: self._fetch_geocode(address))
+
+    async def _fetch_geocode(self, address: str) -> Optional[Dict]:
+        """Nominatim 지오코딩 요청"""
         session = await self.get_session()
 
         params = {
@@ -1233,14 +1347,28 @@ class WalkingRouteService:
             ) as response:
                 if response.status == 200:
                     data = await response.json()
+                    geocoded = None
                     if data:
                         result = data[0]
-                        return {
+                        geocoded = {
                             "latitude": float(result["lat"]),
                             "longitude": float(result["lon"]),
                             "display_name": result["display_name"],
                             "address": result.get("address", {}),
                         }
+                    # 정상 응답만 캐시 (결과 없음 포함, 오류 응답은 제외)
+                    await geocode_cache.set("nominatim", address, geocoded)
+                    if geocoded:
+                        gazetteer.add(
+                            address,
+                            geocoded["latitude"],
+                            geocoded["longitude"],
+                            "geocode",
+                            "지오코딩",
+                            geocoded["display_name"],
+                            expires_at=geocode_cache.positive_expiry("nominatim"),
+                        )
+                    return geocoded
                 return None
         except Exception as e:
             print(f"지오코딩 오류: {e}")
@@ -1249,11 +1377,37 @@ class WalkingRouteService:
     async def get_walking_route(
         self, start_lat: float, start_lng: float, end_lat: float, end_lng: float
     ) -> Dict:
-        """OSRM API를 사용한 도보 경로 생성"""
+        """OSRM API를 사용한 도보 경로 생성 (스냅된 출발/도착지 기준 캐시)"""
+        key = route_cache.make_key("walk", start_lat, start_lng, end_lat, end_lng)
+        return await route_cache.get_or_fetch(
+            key,
+            lambda: single_flight.do(
+                key,
+                lambda: self._fetch_walking_route(
+                    start_lat, start_lng, end_lat, end_lng
+                ),
+            ),
+        )
+
+    async def _fetch_walking_route(
+        self, start_lat: float, start_lng: float, end_lat: float, end_lng: float
+    ) -> Dict:
+        """OSRM 도보 경로 요청"""
+        result = await self._request_osrm_routes(
+            [(start_lat, start_lng), (end_lat, end_lng)]
+        )
+        if not result["success"]:
+            return result
+        return result["routes"][0]
+
+    async def _request_osrm_routes(
+        self, points: List[Tuple[float, float]], alternatives: int = 0
+    ) -> Dict:
+        """OSRM 경로 요청 (points: [(위도, 경도), ...]), 대안 경로 포함 목록 반환"""
         session = await self.get_session()
 
         # OSRM 좌표 형식: longitude,latitude
-        coordinates = f"{start_lng},{start_lat};{end_lng},{end_lat}"
+        coordinates = ";".join(f"{lng},{lat}" for lat, lng in points)
 
         params = {
             "overview": "full",
@@ -1261,57 +1415,57 @@ class WalkingRouteService:
             "steps": "true",
             "annotations": "true",
         }
+        if alternatives:
+            params["alternatives"] = str(alternatives)
 
-        url = f"{OSRM_BASE_URL}/route/v1/foot/{coordinates}"
+        path = f"/route/v1/foot/{coordinates}"
 
         try:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-
-                    if data["code"] == "Ok" and data["routes"]:
-                        route = data["routes"][0]
-
-                        # 경로 좌표 추출
-                        geometry = route["geometry"]["coordinates"]
-                        waypoints = [[coord[1], coord[0]] for coord in geometry]
-
-                        # 상세 안내 정보 추출
-                        steps = []
-                        if "legs" in route:
-                            for leg in route["legs"]:
-                                if "steps" in leg:
-                                    for step in leg["steps"]:
-                                        step_info = {
-                                            "instruction": step.get("maneuver", {}).get(
-                                                "instruction", "직진하세요"
-                                            ),
-                                            "distance": step.get("distance", 0),
-                                            "duration": step.get("duration", 0),
-                                            "name": step.get("name", ""),
-                                            "mode": step.get("mode", "walking"),
-                                        }
-                                        steps.append(step_info)
-
-                        return {
-                            "success": True,
-                            "waypoints": waypoints,
-                            "distance": route.get("distance", 0),
-                            "duration": route.get("duration", 0),
-                            "steps": steps,
-                            "geometry": route["geometry"],
-                        }
-                    else:
-                        return {"success": False, "error": "경로를 찾을 수 없습니다."}
-                else:
-                    return {
-                        "success": False,
-                        "error": f"라우팅 서비스 오류: {response.status}",
-                    }
+            status, data, _ = await osrm_pool.get_json(session, path, params)
+            if status != 200:
+                return {"success": False, "error": f"라우팅 서비스 오류: {status}"}
+            if data.get("code") != "Ok" or not data.get("routes"):
+                return {"success": False, "error": "경로를 찾을 수 없습니다."}
+            return {
+                "success": True,
+                "routes": [self._parse_osrm_route(route) for route in data["routes"]],
+            }
         except Exception as e:
             print(f"라우팅 오류: {e}")
             return {"success": False, "error": "경로 계산 중 오류가 발생했습니다."}
 
+    @staticmethod
+    def _parse_osrm_route(route: Dict) -> Dict:
+        """OSRM 경로 응답을 서비스 형식으로 변환"""
+        # 경로 좌표 추출
+        geometry = route["geometry"]["coordinates"]
+        waypoints = [[coord[1], coord[0]] for coord in geometry]
+
+        # 상세 안내 정보 추출
+        steps = []
+        for leg in route.get("legs", []):
+            for step in leg.get("steps", []):
+                steps.append(
+                    {
+                        "instruction": step.get("maneuver", {}).get(
+                            "instruction", "직진하세요"
+                        ),
+                        "distance": step.get("distance", 0),
+                        "duration": step.get("duration", 0),
+                        "name": step.get("name", ""),
+                        "mode": step.get("mode", "walking"),
+                    }
+                )
+
+        return {
+            "success": True,
+            "waypoints": waypoints,
+            "distance": route.get("distance", 0),
+            "duration": route.get("duration", 0),
+            "steps": steps,
+            "geometry": route["geometry"],
+        }
+
     async def get_safe_walking_route(
         self,
         start_lat: float,
@@ -1320,26 +1474,29 @@ class WalkingRouteService:
         end_lng: float,
         avoid_zones: List[Dict],
     ) -> Dict:
-        """위험지역을 우회하는 안전한 도보 경로"""
-
-        # 1. 기본 경로 생성
-        basic_route = await self.get_walking_route(
-            start_lat, start_lng, end_lat, end_lng
-        )
+        """위험지역을 우회하는 안전한 도보 경로
 
-        if not basic_route["success"]:
-            return basic_route
+        1) OSRM 대안 경로를 한 번에 받아 모든 후보를 위험지역과 함께 벡터 연산으로 평가하고,
+        2) 안전한 후보가 없을 때만 여러 우회 경유지 경로를 병렬로 요청함
+        """
+        start = (start_lat, start_lng)
+        end = (end_lat, end_lng)
 
-        # 2. 기본 경로가 위험지역과 교차하는지 확인
-        route_waypoints = basic_route["waypoints"]
-        crossing_zones = []
+        # 1. 기본 경로 + 대안 경로 (한 번의 요청)
+        result = await self._request_osrm_routes(
+            [start, end], alternatives=SAFE_ROUTE_ALTERNATIVES
+        )
+        if not result["success"]:
+            return result
+        candidates = result["routes"]
+        basic_route = candidates[0]
 
-        for zone in avoid_zones:
-            if self._route_crosses_zone(route_waypoints, zone["lat"], zone["lng"], 0.5):
-                if zone.get("risk", 0) > 0.7:
-                    crossing_zones.append(zone)
+        # 2. 모든 후보가 지나가는 고위험 지역 계산
+        hazard_zones = [zone for zone in avoid_zones if zone.get("risk", 0) > 0.7]
+        hits = self._candidate_zone_hits(candidates, hazard_zones)
+        crossing_zones = [hazard_zones[i] for i in np.flatnonzero(hits[0])]
 
-        # 3. 위험지역과 교차하지 않으면 기본 경로 반환
+        # 3. 기본 경로가 위험지역과 교차하지 않으면 그대로 반환
         if not crossing_zones:
             return {
                 **basic_route,
@@ -1348,131 +1505,105 @@ class WalkingRouteService:
                 "message": "안전한 직선 경로입니다.",
             }
 
-        # 4. 우회 경로 생성
-        detour_route = await self._generate_detour_route(
-            start_lat, start_lng, end_lat, end_lng, crossing_zones
-        )
-
-        if detour_route["success"]:
-            return {
-                **detour_route,
-                "route_type": "safe_detour",
-                "avoided_zones": crossing_zones,
-                "message": f"{len(crossing_zones)}개의 위험지역을 우회하는 안전 경로입니다.",
-            }
-        else:
-            return {
-                **basic_route,
-                "route_type": "direct_with_warning",
-                "avoided_zones": crossing_zones,
-                "message": f"우회 경로 생성에 실패했습니다. {len(crossing_zones)}개의 위험지역을 주의하세요.",
-            }
-
-    def _route_crosses_zone(
-        self,
-        waypoints: List[List[float]],
-        zone_lat: float,
-        zone_lng: float,
-        radius_km: float,
-    ) -> bool:
-        """경로가 위험지역과 교차하는지 확인"""
-        for waypoint in waypoints:
-            distance = calculate_distance(waypoint[0], waypoint[1], zone_lat, zone_lng)
-            if distance <= radius_km:
-                return True
-        return False
-
-    async def _generate_detour_route(
-        self,
-        start_lat: float,
-        start_lng: float,
-        end_lat: float,
-        end_lng: float,
-        zones_to_avoid: List[Dict],
-    ) -> Dict:
-        """우회 경로 생성 (중간 지점을 통한)"""
-
-        if not zones_to_avoid:
-            return await self.get_walking_route(start_lat, start_lng, end_lat, end_lng)
-
-        # 위험지역들의 평균 위치 계산
-        avg_zone_lat = sum(zone["lat"] for zone in zones_to_avoid) / len(zones_to_avoid)
-        avg_zone_lng = sum(zone["lng"] for zone in zones_to_avoid) / len(zones_to_avoid)
-
-        # 시작점과 끝점의 중점
-        mid_lat = (start_lat + end_lat) / 2
-        mid_lng = (start_lng + end_lng) / 2
-
-        # 우회 지점 계산 (위험지역에서 수직으로 1km 떨어진 지점)
-        detour_offset = 0.01  # 약 1km
-
-        # 위험지역의 반대 방향으로 우회 지점 설정
-        if avg_zone_lat > mid_lat:
-            detour_lat = mid_lat - detour_offset
-        else:
-            detour_lat = mid_lat + detour_offset
-
-        if avg_zone_lng > mid_lng:
-            detour_lng = mid_lng - detour_offset
-        else:
-            detour_lng = mid_lng + detour_offset
-
-        try:
-            # 다중 경유지 경로 요청
-            session = await self.get_session()
-            coordinates = (
-                f"{start_lng},{start_lat};{detour_lng},{detour_lat};{end_lng},{end_lat}"
+        # 4. 대안 경로 중 안전한 경로가 없으면 우회 경유지 경로를 병렬 요청
+        best, best_row = self._pick_safest_route(candidates, hits)
+        if best_row.any():
+            detour_results = await asyncio.gather(
+                *[
+                    self._request_osrm_routes([start, via, end])
+                    for via in self._detour_via_points(start, end, crossing_zones)
+                ]
             )
+            detours = [r["routes"][0] for r in detour_results if r["success"]]
+            if detours:
+                detour, detour_row = self._pick_safest_route(
+                    detours, self._candidate_zone_hits(detours, hazard_zones)
+                )
+                if detour_row.sum() < best_row.sum():
+                    best, best_row = detour, detour_row
 
-            params = {
-                "overview": "full",
-                "geometries": "geojson",
-                "steps": "true",
-                "annotations": "true",
-            }
-
-            url = f"{OSRM_BASE_URL}/route/v1/foot/{coordinates}"
-
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
+        # 5. 기본 경로보다 지나는 지역이 줄지 않으면 기본 경로 사용
+        if best is basic_route or best_row.sum() >= len(crossing_zones):
+            best, best_row = basic_route, hits[0]
 
-                    if data["code"] == "Ok" and data["routes"]:
-                        route = data["routes"][0]
-
-                        geometry = route["geometry"]["coordinates"]
-                        waypoints = [[coord[1], coord[0]] for coord in geometry]
-
-                        steps = []
-                        if "legs" in route:
-                            for leg in route["legs"]:
-                                if "steps" in leg:
-                                    for step in leg["steps"]:
-                                        step_info = {
-                                            "instruction": step.get("maneuver", {}).get(
-                                                "instruction", "직진하세요"
-                                            ),
-                                            "distance": step.get("distance", 0),
-                                            "duration": step.get("duration", 0),
-                                            "name": step.get("name", ""),
-                                            "mode": "walking",
-                                        }
-                                        steps.append(step_info)
-
-                        return {
-                            "success": True,
-                            "waypoints": waypoints,
-                            "distance": route.get("distance", 0),
-                            "duration": route.get("duration", 0),
-                            "steps": steps,
-                            "geometry": route["geometry"],
-                        }
+        # 선택한 경로가 실제로 피한 지역만 우회 지역으로 보고
+        avoided = [hazard_zones[i] for i in np.flatnonzero(hits[0] & ~best_row)]
+        still_crossing = [hazard_zones[i] for i in np.flatnonzero(best_row)]
+        route_type, message = describe_safe_route(avoided, still_crossing)
+        return {
+            **best,
+            "route_type": route_type,
+            "avoided_zones": avoided,
+            "message": message,
+        }
 
-        except Exception as e:
-            print(f"우회 경로 생성 오류: {e}")
+    def _candidate_zone_hits(
+        self, routes: List[Dict], zones: List[Dict], radius_km: float = 0.5
+    ) -> np.ndarray:
+        """후보 경로 x 위험지역 교차 행렬"""
+        paths = []
+        for route in routes:
+            path = np.asarray(route["waypoints"], dtype=np.float64).reshape(-1, 2)
+            paths.append((path[:, 0], path[:, 1]))
+        return polylines_zone_hits(
+            paths,
+            [zone["lat"] for zone in zones],
+            [zone["lng"] for zone in zones],
+            radius_km,
+        )
 
-        # 우회 경로 생성 실패 시 기본 경로 반환
-        return await self.get_walking_route(start_lat, start_lng, end_lat, end_lng)
+    @staticmethod
+    def _pick_safest_route(
+        routes: List[Dict], hits: np.ndarray
+    ) -> Tuple[Dict, np.ndarray]:
+        """교차 지역 수가 가장 적은 경로 (같으면 짧은 경로)와 그 경로의 교차 여부 행"""
+        counts = hits.sum(axis=1)
+        best = min(
+            range(len(routes)), key=lambda i: (counts[i], routes[i]["distance"])
+        )
+        return routes[best], hits[best]
+
+    @staticmethod
+    def _detour_via_points(
+        start: Tuple[float, float],
+        end: Tuple[float, float],
+        zones: List[Dict],
+    ) -> List[Tuple[float, float]]:
+        """출발-도착 선분의 수직 방향으로 떨어진 우회 경유지 후보
+
+        위험지역 반대편 후보를 먼저, 가까운 거리부터 나열함
+        """
+        # 로컬 km 평면(zone_index 투영)에서 진행 방향의 법선 벡터
+        start_xy, end_xy = project_to_plane([start[0], end[0]], [start[1], end[1]])
+        mid = (start_xy + end_xy) / 2
+        direction = end_xy - start_xy
+        length = float(np.hypot(*direction)) or 1.0
+        normal = np.array([-direction[1], direction[0]]) / length
+
+        # 위험지역 중심이 법선의 어느 쪽인지 확인해 반대편을 우선
+        zone_center = project_to_plane(
+            [z["lat"] for z in zones], [z["lng"] for z in zones]
+        ).mean(axis=0)
+        away = -1.0 if float(np.dot(zone_center - mid, normal)) > 0 else 1.0
+
+        offsets = [
+            side * offset_km
+            for offset_km in DETOUR_OFFSETS_KM
+            for side in (away, -away)
+        ]
+        lats, lngs = unproject_from_plane(mid + np.outer(offsets, normal))
+        return list(zip(lats.tolist(), lngs.tolist()))
+
+    def find_crossing_zones(
+        self, waypoints: List[List[float]], zones: List[Dict], radius_km: float
+    ) -> List[Dict]:
+        """경로가 반경 radius_km 이내로 지나가는 위험지역 목록 (공용 ZONE_INDEX로 후보 검색)"""
+        if not waypoints or not zones:
+            return []
+        path = np.asarray(waypoints, dtype=np.float64)
+        return zones_near_polyline(
+            path[:, 0], path[:, 1], zones, radius_km, index=ZONE_INDEX
+        )
 
 
 # 전역 서비스 인스턴스
@@ -1486,18 +1617,44 @@ walking_service = WalkingRouteService()
 @app.on_event("startup")
 async def startup_event():
     """앱 시작 시 실행"""
+    global zone_reload_lock, zone_watcher_task, local_router_task
+
     Base.metadata.create_all(bind=engine)
     print("🚀 Seoul Safety Navigation API 시작")
     print("🗺️ 도보 경로 서비스 초기화 완료")
     print("🎤 Azure Speech Service 준비 완료")
-    
-    load_construction_data()
+
+    # 외부 API 호출 서비스들이 하나의 커넥션 풀을 공유
+    shared_session = await http_client.start()
+    walking_service.use_shared_session(shared_session)
+    exercise_route_service.use_shared_session(shared_session)
+    enhanced_routing_service.use_shared_session(shared_session)
+    kakao_search_service.use_shared_session(shared_session)
+
+    await asyncio.to_thread(geocode_cache.purge_expired)
+    await asyncio.to_thread(build_gazetteer)
+
+    zone_reload_lock = asyncio.Lock()
+    await reload_zone_data("서버 시작")
+    zone_watcher_task = asyncio.create_task(watch_construction_csv())
+
+    if LOCAL_ROUTER_ENABLED and init_pedestrian_router is not None:
+        local_router_task = asyncio.create_task(init_local_router())
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """앱 종료 시 실행"""
+    if zone_watcher_task is not None:
+        zone_watcher_task.cancel()
+    if local_router_task is not None:
+        local_router_task.cancel()
     await walking_service.close_session()
     await exercise_route_service.close_session()
+    await enhanced_routing_service.close_session()
+    await kakao_search_service.close_session()
+    await http_client.close()
+    geocode_cache.close()
+    await route_cache.close()
     print("🔄 서비스 종료 완료")
 
 
@@ -1633,27 +1790,14 @@ def read_users_me(current_user: User = Depends(get_current_user)):
 async def predict_risk(location: LocationRequest):
     """특정 위치의 싱크홀 위험도 예측"""
 
-    # 가장 가까운 위험지역 찾기
-    min_distance = float("inf")
-    nearest_risk = 0.0
-
-    for zone in RISK_ZONES:
-        distance = calculate_distance(
-            location.latitude, location.longitude, zone["lat"], zone["lng"]
-        )
-        if distance < min_distance:
-            min_distance = distance
-            nearest_risk = zone["risk"]
+    # 가장 가까운 위험지역 찾기 (공간 인덱스)
+    nearest_zone, min_distance = ZONE_INDEX.nearest(
+        location.latitude, location.longitude
+    )
+    nearest_risk = nearest_zone["risk"] if nearest_zone else 0.0
 
     # 거리에 따른 위험도 조정
-    if min_distance < 0.5:  # 500m 이내
-        risk_score = max(0.7, nearest_risk)
-    elif min_distance < 1.0:  # 1km 이내
-        risk_score = max(0.4, nearest_risk * 0.7)
-    elif min_distance < 2.0:  # 2km 이내
-        risk_score = max(0.2, nearest_risk * 0.5)
-    else:
-        risk_score = min(0.3, random.uniform(0.1, 0.3))
+    risk_score = float(calculate_risk_scores(min_distance, nearest_risk))
 
     return RiskResponse(
         latitude=location.latitude,
@@ -1664,28 +1808,179 @@ async def predict_risk(location: LocationRequest):
     )
 
 
+@app.post("/predict-risk/batch", response_model=BatchRiskResponse)
+async def predict_risk_batch(request: BatchRiskRequest):
+    """여러 지점의 싱크홀 위험도를 한 번에 예측 (격자 셀 일괄 조회용)"""
+
+    if len(request.latitudes) != len(request.longitudes):
+        raise HTTPException(
+            status_code=400, detail="위도와 경도 목록의 길이가 다릅니다."
+        )
+
+    if len(request.latitudes) > MAX_BATCH_RISK_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"한 번에 최대 {MAX_BATCH_RISK_POINTS}개 지점까지 조회할 수 있습니다.",
+        )
+
+    # 전체 지점을 한 번에 최근접 위험지역 조회
+    nearest_indices, min_distances = ZONE_INDEX.nearest_many(
+        request.latitudes, request.longitudes
+    )
+    if len(ZONE_INDEX):
+        nearest_risks = ZONE_INDEX.risk[nearest_indices]
+    else:
+        nearest_risks = np.zeros(len(min_distances))
+
+    risk_scores = calculate_risk_scores(min_distances, nearest_risks)
+
+    return BatchRiskResponse(
+        count=len(risk_scores),
+        risk_scores=np.round(risk_scores, 3).tolist(),
+        risk_level_codes=get_risk_level_codes(risk_scores).tolist(),
+        levels=RISK_LEVEL_TABLE,
+    )
+
+
+def parse_bbox(bbox: Optional[str]) -> Optional[List[float]]:
+    """bbox 쿼리 파라미터 파싱
+
+    'west,south,east,north' (경도 최소, 위도 최소, 경도 최대, 위도 최대 - Leaflet
+    toBBoxString 순서)를 [lat_min, lng_min, lat_max, lng_max]로 변환
+    """
+    if not bbox:
+        return None
+    try:
+        west, south, east, north = [float(v) for v in bbox.split(",")]
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="bbox는 'west,south,east,north' 형식이어야 합니다."
+        )
+    if west > east or south > north:
+        raise HTTPException(status_code=400, detail="bbox 범위가 올바르지 않습니다.")
+    return [south, west, north, east]
+
+
+def validate_zoom(zoom: Optional[int]):
+    if zoom is not None and not 0 <= zoom <= 22:
+        raise HTTPException(status_code=400, detail="zoom은 0~22 범위여야 합니다.")
+
+
 @app.get("/risk-zones")
-async def get_risk_zones():
-    """서울시 위험지역 목록 반환"""
-    return {"zones": RISK_ZONES, "total_count": len(RISK_ZONES)}
+async def get_risk_zones(bbox: Optional[str] = None, zoom: Optional[int] = None):
+    """서울시 위험지역 목록 반환 (bbox 뷰포트 필터, 저배율 줌에서는 클러스터)"""
+    validate_zoom(zoom)
+    bbox_values = parse_bbox(bbox)
+    if bbox_values is None and zoom is None:
+        return {"zones": RISK_ZONES, "total_count": len(RISK_ZONES)}
+
+    if bbox_values is not None:
+        indices = RISK_ZONE_INDEX.indices_in_bbox(*bbox_values)
+    else:
+        indices = np.arange(len(RISK_ZONE_INDEX), dtype=np.intp)
+
+    clusters = []
+    if zoom is not None and zoom < CLUSTER_MAX_ZOOM:
+        clusters, indices = grid_clusters(
+            RISK_ZONE_INDEX.lat, RISK_ZONE_INDEX.lng, RISK_ZONE_INDEX.risk, indices, zoom
+        )
+
+    return {
+        "zones": [RISK_ZONES[int(i)] for i in indices],
+        "clusters": clusters,
+        "total_count": len(RISK_ZONES),
+        "matched_count": len(indices) + sum(c["count"] for c in clusters),
+    }
+
+
+@app.get("/risk-raster")
+async def get_risk_raster(request: Request):
+    """서울시 위험도 래스터 (uint8 바이너리 그리드, ETag 지원)"""
+    if not RISK_RASTER.is_ready:
+        raise HTTPException(status_code=503, detail="위험도 래스터를 준비 중입니다.")
+
+    headers = {
+        "ETag": RISK_RASTER.etag,
+        "Cache-Control": "no-cache",
+        "X-Raster-Rows": str(RISK_RASTER.rows),
+        "X-Raster-Cols": str(RISK_RASTER.cols),
+        "X-Raster-Cell-Deg": str(RISK_RASTER.cell_deg),
+        "X-Raster-Bounds": ",".join(
+            str(RISK_RASTER.bounds[k])
+            for k in ("lat_min", "lat_max", "lng_min", "lng_max")
+        ),
+    }
+    if request.headers.get("if-none-match") == RISK_RASTER.etag:
+        return Response(status_code=304, headers=headers)
+
+    return Response(
+        content=RISK_RASTER.to_bytes(),
+        media_type="application/octet-stream",
+        headers=headers,
+    )
+
+
+@app.get("/risk-raster/metadata")
+async def get_risk_raster_metadata():
+    """위험도 래스터 메타데이터"""
+    if not RISK_RASTER.is_ready:
+        raise HTTPException(status_code=503, detail="위험도 래스터를 준비 중입니다.")
+    return {**RISK_RASTER.metadata(), "etag": RISK_RASTER.etag}
+
+
+@app.get("/risk-tiles/{z}/{x}/{y}.png")
+async def get_risk_tile(z: int, x: int, y: int, request: Request):
+    """위험도 XYZ 타일 (Web Mercator, 256px PNG)"""
+    if not RISK_RASTER.is_ready:
+        raise HTTPException(status_code=503, detail="위험도 래스터를 준비 중입니다.")
+    if not (0 <= z <= 20 and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=400, detail="잘못된 타일 좌표입니다.")
+
+    etag = RISK_RASTER.tile_etag(z, x, y)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    return Response(
+        content=RISK_RASTER.tile_png(z, x, y), media_type="image/png", headers=headers
+    )
+
+
+# 직렬화된 공사지역 응답 캐시 (ETag → JSON 바이트). ETag에 데이터 버전이 포함되어
+# 데이터가 바뀌면 자연히 새 키가 사용됨
+CONSTRUCTION_RESPONSE_CACHE: "OrderedDict[str, bytes]" = OrderedDict()
+MAX_CACHED_CONSTRUCTION_RESPONSES = 128
 
 
 @app.get("/construction-zones")
-async def get_construction_zones():
-    """서울시 공사지역 목록 반환 (수정된 버전)"""
+async def get_construction_zones(
+    request: Request,
+    status: Optional[str] = None,
+    bbox: Optional[str] = None,
+    limit: Optional[int] = None,
+    zoom: Optional[int] = None,
+):
+    """서울시 공사지역 목록 반환 (status/bbox/limit/zoom 필터, ETag 지원)
+
+    zoom이 CLUSTER_MAX_ZOOM 미만이면 격자 클러스터(clusters)와 단독 지점(zones)으로 나눠 반환
+    """
     try:
         logger.info("🏗️ 공사지역 API 호출")
 
-        # 데이터가 없으면 로드 시도
-        if not CONSTRUCTION_DATA:
-            logger.warning("⚠️ CONSTRUCTION_DATA가 비어있음. 재로드 시도...")
-            load_construction_data()
+        if status and CONSTRUCTION_STATUS_ALIASES.get(status, status) not in CONSTRUCTION_STATUSES:
+            raise HTTPException(status_code=400, detail=f"알 수 없는 공사 상태: {status}")
+        if limit is not None and limit < 1:
+            raise HTTPException(status_code=400, detail="limit은 1 이상이어야 합니다.")
+        validate_zoom(zoom)
+        bbox_values = parse_bbox(bbox)
+        cluster_zoom = zoom if zoom is not None and zoom < CLUSTER_MAX_ZOOM else None
 
-        total_count = len(CONSTRUCTION_DATA)
-        logger.info(f"📊 현재 데이터 개수: {total_count}")
+        # 요청 처리 중에는 로드하지 않음 (백그라운드 감시 작업이 교체)
+        dataset = CONSTRUCTION_DATASET
+        total_count = len(dataset)
 
         if total_count == 0:
-            logger.error("❌ 공사장 데이터가 여전히 비어있음")
+            logger.error("❌ 공사장 데이터가 비어있음")
             return {
                 "zones": [],
                 "total_count": 0,
@@ -1693,34 +1988,56 @@ async def get_construction_zones():
                 "error": "공사장 데이터를 로드할 수 없습니다. 서버 로그를 확인하세요.",
             }
 
-        # 상태별 개수 계산
-        active_zones = [
-            zone for zone in CONSTRUCTION_DATA if zone.get("status") == "진행중"
-        ]
-        completed_zones = [
-            zone for zone in CONSTRUCTION_DATA if zone.get("status") == "완료"
-        ]
-        planned_zones = [
-            zone for zone in CONSTRUCTION_DATA if zone.get("status") == "예정"
-        ]
+        query_key = f"{dataset.version}|{status}|{bbox_values}|{limit}|{cluster_zoom}"
+        etag = f'"cz-{hashlib.sha1(query_key.encode()).hexdigest()[:16]}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
 
-        logger.info(
-            f"📊 상태별 개수: 진행중 {len(active_zones)}, 완료 {len(completed_zones)}, 예정 {len(planned_zones)}"
-        )
+        body = CONSTRUCTION_RESPONSE_CACHE.get(etag)
+        if body is not None:
+            CONSTRUCTION_RESPONSE_CACHE.move_to_end(etag)
+        else:
+            matched = dataset.query(status=status, bbox=bbox_values)
+            clusters = []
+            if cluster_zoom is not None:
+                clusters, matched = grid_clusters(
+                    dataset.lat, dataset.lng, dataset.risk, matched, cluster_zoom
+                )
+            selected = matched if limit is None else matched[:limit]
+            # 상태별 개수는 로드 시 계산된 값 사용
+            status_counts = dataset.status_counts()
+
+            logger.info(
+                f"📊 공사지역 응답 생성: {len(selected)}/{total_count}건 "
+                f"(status={status}, bbox={bbox}, limit={limit}, zoom={zoom}, "
+                f"클러스터 {len(clusters)}개)"
+            )
 
-        return {
-            "zones": CONSTRUCTION_DATA,
-            "total_count": total_count,
-            "active_count": len(active_zones),
-            "completed_count": len(completed_zones),
-            "planned_count": len(planned_zones),
-            "status_breakdown": {
-                "진행중": len(active_zones),
-                "완료": len(completed_zones),
-                "예정": len(planned_zones),
-            },
-        }
+            body = json.dumps(
+                {
+                    "zones": dataset.select(selected),
+                    "clusters": clusters,
+                    "data_version": dataset.version,
+                    "total_count": total_count,
+                    "matched_count": len(matched) + sum(c["count"] for c in clusters),
+                    "returned_count": len(selected),
+                    "active_count": status_counts["진행중"],
+                    "completed_count": status_counts["완료"],
+                    "planned_count": status_counts["예정"],
+                    "status_breakdown": status_counts,
+                },
+                ensure_ascii=False,
+            ).encode("utf-8")
+
+            CONSTRUCTION_RESPONSE_CACHE[etag] = body
+            if len(CONSTRUCTION_RESPONSE_CACHE) > MAX_CACHED_CONSTRUCTION_RESPONSES:
+                CONSTRUCTION_RESPONSE_CACHE.popitem(last=False)
 
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ 공사지역 API 오류: {e}")
         logger.error(f"📄 오류 상세: {traceback.format_exc()}")
@@ -1732,6 +2049,19 @@ async def get_construction_zones():
         }
 
 
+@app.get("/construction-zones/active")
+async def get_active_construction_zone_list(
+    request: Request,
+    bbox: Optional[str] = None,
+    limit: Optional[int] = None,
+    zoom: Optional[int] = None,
+):
+    """진행중 공사지역 목록 (프론트엔드 'active' 필터용)"""
+    return await get_construction_zones(
+        request, status="진행중", bbox=bbox, limit=limit, zoom=zoom
+    )
+
+
 # =============================================================================
 # 도보 경로 안내 API 엔드포인트
 # =============================================================================
@@ -1784,39 +2114,43 @@ async def get_walking_route(route_request: RouteRequest):
 async def get_safe_walking_route(route_request: RouteRequest):
     """위험지역 및 공사장을 우회하는 안전한 도보 경로 생성"""
     try:
-        # 위험지역 목록 가져오기 (싱크홀 + 공사장)
-        avoid_zones = []
-        all_risk_zones = RISK_ZONES + [
-            zone for zone in CONSTRUCTION_DATA if zone.get("status") == "진행중"
-        ]
-
-        for zone in all_risk_zones:
-            # 경로 주변 2km 내의 고위험 지역만 체크
-            start_distance = calculate_distance(
-                route_request.start_latitude,
-                route_request.start_longitude,
-                zone["lat"],
-                zone["lng"],
-            )
-            end_distance = calculate_distance(
-                route_request.end_latitude,
-                route_request.end_longitude,
-                zone["lat"],
-                zone["lng"],
-            )
+        # 위험지역 목록 가져오기 (싱크홀 + 진행중 공사장, 공간 인덱스)
+        # 출발지/도착지 주변 2km 내의 고위험 지역만 체크
+        nearby_indices = np.union1d(
+            ZONE_INDEX.indices_within_radius(
+                route_request.start_latitude, route_request.start_longitude, 2.0
+            ),
+            ZONE_INDEX.indices_within_radius(
+                route_request.end_latitude, route_request.end_longitude, 2.0
+            ),
+        )
 
-            # 위험도 0.7 이상인 싱크홀 지역 또는 진행중인 공사장
-            if (start_distance <= 2.0 or end_distance <= 2.0) and zone.get(
-                "risk", 0
-            ) > 0.6:
-                avoid_zones.append(zone)
+        # 위험도 0.7 이상인 싱크홀 지역 또는 진행중인 공사장
+        avoid_zones = [
+            ZONE_INDEX.zones[int(i)]
+            for i in nearby_indices
+            if ZONE_INDEX.zones[int(i)].get("risk", 0) > 0.6
+        ]
 
-        result = await walking_service.get_safe_walking_route(
+        # 우회 결과는 위험지역 데이터 세대가 바뀌면 다시 계산
+        cache_key = route_cache.make_key(
+            "safe",
             route_request.start_latitude,
             route_request.start_longitude,
             route_request.end_latitude,
             route_request.end_longitude,
-            avoid_zones,  # 수정된 avoid_zones 전달
+            ZONE_DATA_GENERATION,
+            "local" if LOCAL_ROUTER is not None else "osrm",
+        )
+        result = await route_cache.get_or_fetch(
+            cache_key,
+            lambda: find_safe_walking_route(
+                route_request.start_latitude,
+                route_request.start_longitude,
+                route_request.end_latitude,
+                route_request.end_longitude,
+                avoid_zones,  # 수정된 avoid_zones 전달
+            ),
         )
 
         if not result["success"]:
@@ -1879,104 +2213,172 @@ async def geocode_address(address: str):
     }
 
 
+def build_gazetteer():
+    """지명 사전 구축 (산책로, 운동 지역, 역/위험지역 이름, 과거 지오코딩 결과)"""
+    for area in exercise_route_service.safe_areas + EXERCISE_AREAS_DATA:
+        lat, lng = area["center"][0], area["center"][1]
+        gazetteer.add(
+            area["name"], lat, lng, "exercise_area", area.get("type_description", "산책로")
+        )
+
+    for zone in RISK_ZONES:
+        for name in risk_zone_place_names(zone["name"]):
+            source = "station" if name.endswith("역") else "risk_zone"
+            category = "지하철역" if source == "station" else "지역"
+            gazetteer.add(name, zone["lat"], zone["lng"], source, category, zone["name"])
+
+    for query, result, expires_at in geocode_cache.positive_entries("nominatim"):
+        gazetteer.add(
+            query, result["latitude"], result["longitude"], "geocode", "지오코딩",
+            result.get("display_name", ""), expires_at=expires_at,
+        )
+
+    logger.info(f"📖 지명 사전 구축 완료: {len(gazetteer)}개 지명")
+
+
+def learn_places(places: List[Dict]):
+    """원격 검색 결과를 지명 사전에 추가 (검색 캐시와 같은 유효기간 후 만료)"""
+    expires_at = geocode_cache.positive_expiry("kakao")
+    for place in places:
+        try:
+            gazetteer.add(
+                place["place_name"],
+                float(place["y"]),
+                float(place["x"]),
+                "geocode",
+                place.get("category_name", ""),
+                place.get("road_address_name") or place.get("address_name", ""),
+                expires_at=expires_at,
+            )
+        except (KeyError, TypeError, ValueError):
+            continue
+
+
+# 로컬 지명 사전만으로 응답할 최소 일치 수 (정확히 같은 이름이 있으면 그것만으로도 응답)
+GAZETTEER_LOCAL_LIMIT = 5
+
+
+def merge_place_results(local_places: List[Dict], remote_places: List[Dict]) -> List[Dict]:
+    """로컬 결과를 앞에 두고 이름+좌표가 같은 원격 결과는 제외"""
+
+    def place_key(place):
+        return (
+            normalize_name(place.get("place_name", "")),
+            round(float(place.get("y") or 0), 4),
+            round(float(place.get("x") or 0), 4),
+        )
+
+    merged, seen = [], set()
+    for place in local_places + remote_places:
+        try:
+            key = place_key(place)
+        except (TypeError, ValueError):
+            continue
+        if key not in seen:
+            seen.add(key)
+            merged.append(place)
+    return merged
+
+
 @app.get("/search-location")
 async def search_location(query: str):
-    """카카오맵 API를 사용한 지명 검색"""
+    """지명 검색 (로컬 지명 사전 + 카카오맵 API)"""
 
     if not query or len(query) < 2:
         return {"places": []}
 
-    if not KAKAO_API_KEY or KAKAO_API_KEY == "YOUR_KAKAO_REST_API_KEY":
-        return {"places": [], "error": "카카오 API 키가 설정되지 않았습니다."}
+    # 일치가 충분하거나 정확히 같은 지명이 있으면 로컬 사전에서 바로 응답
+    local_matches = gazetteer.search(query, limit=GAZETTEER_LOCAL_LIMIT)
+    local_places = [to_place_result(entry) for entry in local_matches]
+    exact_match = any(
+        normalize_name(entry["name"]) == normalize_name(query) for entry in local_matches
+    )
+    if len(local_matches) >= GAZETTEER_LOCAL_LIMIT or exact_match:
+        return {
+            "places": local_places,
+            "total_count": len(local_places),
+            "source": "gazetteer",
+        }
+
+    cached, result = await geocode_cache.get("kakao", query)
+    if not cached:
+        result = await kakao_search_service.search_keyword(query)
+        if "error" in result:
+            # 원격 검색 실패 시 로컬 일치라도 있으면 그것으로 응답
+            if local_places:
+                return {
+                    "places": local_places,
+                    "total_count": len(local_places),
+                    "source": "gazetteer",
+                }
+            return result
+        await geocode_cache.set("kakao", query, result if result["places"] else None)
+        learn_places(result["places"])
 
-    try:
-        url = "https://dapi.kakao.com/v2/local/search/keyword.json"
-        headers = {"Authorization": f"KakaoAK {KAKAO_API_KEY}"}
-
-        params = {"query": query.strip(), "size": 5, "page": 1, "sort": "accuracy"}
-
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-        response.raise_for_status()
-
-        data = response.json()
-        places = data.get("documents", [])
-
-        formatted_places = []
-        for place in places:
-            formatted_place = {
-                "place_name": place.get("place_name", ""),
-                "address_name": place.get("address_name", ""),
-                "road_address_name": place.get("road_address_name", ""),
-                "x": place.get("x", ""),  # 경도
-                "y": place.get("y", ""),  # 위도
-                "category_name": place.get("category_name", ""),
-                "phone": place.get("phone", ""),
-                "place_url": place.get("place_url", ""),
-            }
-            formatted_places.append(formatted_place)
-
-        return {"places": formatted_places, "total_count": len(formatted_places)}
-
-    except requests.exceptions.HTTPError as e:
-        if e.response.status_code == 400:
-            return {"places": [], "error": "잘못된 요청입니다."}
-        elif e.response.status_code == 401:
-            return {"places": [], "error": "API 키가 유효하지 않습니다."}
-        elif e.response.status_code == 403:
-            return {"places": [], "error": "API 키 권한이 없습니다."}
-        elif e.response.status_code == 429:
-            return {"places": [], "error": "API 호출 한도를 초과했습니다."}
-        else:
-            return {"places": [], "error": f"API 호출 실패: {e.response.status_code}"}
+    remote_places = result["places"] if result else []
+    if not local_places:
+        return result or {"places": [], "total_count": 0}
+    places = merge_place_results(local_places, remote_places)
+    return {"places": places, "total_count": len(places), "source": "gazetteer+kakao"}
 
-    except requests.exceptions.Timeout:
-        return {"places": [], "error": "검색 시간이 초과되었습니다."}
 
+async def search_openstreetmap(query: str) -> Dict:
+    """OpenStreetMap 지오코딩 결과를 지명 검색 응답 형식으로 변환"""
+    try:
+        osm_result = await walking_service.geocode_address(query)
     except Exception as e:
-        print(f"지명 검색 오류: {e}")
-        return {"places": [], "error": "검색 중 오류가 발생했습니다."}
+        print(f"OpenStreetMap 지오코딩 오류: {e}")
+        return {"places": []}
+
+    if not osm_result:
+        return {"places": []}
+
+    places = [
+        {
+            "place_name": query,
+            "address_name": osm_result["display_name"],
+            "road_address_name": osm_result["display_name"],
+            "x": str(osm_result["longitude"]),
+            "y": str(osm_result["latitude"]),
+            "category_name": "지오코딩",
+            "phone": "",
+            "place_url": "",
+        }
+    ]
+    return {"places": places, "total_count": len(places), "source": "openstreetmap"}
 
 
 @app.get("/search-location-combined")
 async def search_location_combined(query: str):
-    """통합 검색 API (카카오맵 + OpenStreetMap 백업)"""
+    """통합 검색 API (카카오맵 + OpenStreetMap 동시 요청, 먼저 성공한 결과 반환)"""
 
     if not query or len(query) < 2:
         return {"places": []}
 
-    # 1. 카카오맵 API 시도
-    kakao_result = await search_location(query)
-
-    if kakao_result.get("places") and len(kakao_result["places"]) > 0:
-        return kakao_result
-
-    # 2. 카카오맵 실패 시 OpenStreetMap 지오코딩 시도
+    pending = {
+        asyncio.create_task(search_location(query)),
+        asyncio.create_task(search_openstreetmap(query)),
+    }
     try:
-        osm_result = await walking_service.geocode_address(query)
-
-        if osm_result:
-            places = [
-                {
-                    "place_name": query,
-                    "address_name": osm_result["display_name"],
-                    "road_address_name": osm_result["display_name"],
-                    "x": str(osm_result["longitude"]),
-                    "y": str(osm_result["latitude"]),
-                    "category_name": "지오코딩",
-                    "phone": "",
-                    "place_url": "",
-                }
-            ]
-
-            return {
-                "places": places,
-                "total_count": len(places),
-                "source": "openstreetmap",
-            }
-    except Exception as e:
-        print(f"OpenStreetMap 지오코딩 오류: {e}")
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                # 한쪽 검색이 예외로 끝나도 남은 검색 결과를 계속 기다림
+                try:
+                    result = task.result()
+                except Exception as e:
+                    logger.warning(f"⚠️ 통합 검색 중 한 제공자 실패: {e}")
+                    continue
+                if result.get("places"):
+                    return result
+    finally:
+        # 응답이 정해지면 남은 검색은 취소
+        for task in pending:
+            task.cancel()
 
-    # 3. 모든 방법이 실패한 경우
+    # 모든 방법이 실패한 경우
     return {"places": [], "error": "검색 결과를 찾을 수 없습니다."}
 
 
@@ -2234,300 +2636,169 @@ async def validate_destination_endpoint(
         return {"success": False, "error": str(e), "is_valid": False}
 
 
-# 기존 @app.post("/api/tts", response_model=TTSResponse) 엔드포인트를 이것으로 교체하세요:
-
+DEFAULT_TTS_VOICE = "ko-KR-HyunsuMultilingualNeural"
 
-@app.post("/api/tts")
-async def text_to_speech_api(
-    text: str = Form(...), voice_name: str = Form("ko-KR-HyunsuMultilingualNeural")
-):
-    """텍스트를 Azure TTS로 음성 변환 (스피커 오류 해결)"""
 
-    if not text or len(text.strip()) == 0:
-        raise HTTPException(status_code=400, detail="텍스트가 비어있습니다.")
+def _synthesize_speech_sync(text: str, voice_name: str) -> bytes:
+    """Azure TTS 합성 (블로킹 SDK 호출, 스트림 → 스피커 → 파일 순서로 시도)"""
+    import azure.cognitiveservices.speech as speechsdk
 
-    if len(text) > 1000:
+    speech_key = os.getenv("AZURE_SPEECH_KEY")
+    speech_region = os.getenv("AZURE_SPEECH_REGION", "koreacentral")
+    if not speech_key:
         raise HTTPException(
-            status_code=400, detail="텍스트가 너무 깁니다. (최대 1000자)"
+            status_code=500, detail="Azure Speech Key가 설정되지 않았습니다"
         )
 
-    try:
-        logger.info(f"🔊 TTS 요청: '{text[:50]}...' (음성: {voice_name})")
-
-        try:
-            import azure.cognitiveservices.speech as speechsdk
-
-            speech_key = os.getenv("AZURE_SPEECH_KEY")
-            speech_region = os.getenv("AZURE_SPEECH_REGION", "koreacentral")
-
-            if not speech_key:
-                raise HTTPException(
-                    status_code=500, detail="Azure Speech Key가 설정되지 않았습니다"
-                )
-
-            # Speech 설정
-            speech_config = speechsdk.SpeechConfig(
-                subscription=speech_key, region=speech_region
-            )
-            speech_config.speech_synthesis_voice_name = voice_name
-
-            # 방법 1: 메모리 스트림으로 직접 출력 (권장)
-            try:
-                # Pull audio output stream 사용
-                pull_stream = speechsdk.audio.PullAudioOutputStream()
-                audio_config = speechsdk.audio.AudioOutputConfig(stream=pull_stream)
-
-                # 음성 합성기 생성
-                synthesizer = speechsdk.SpeechSynthesizer(
-                    speech_config=speech_config, audio_config=audio_config
-                )
-
-                # 음성 합성 수행
-                logger.info("🔄 Azure TTS 합성 수행 중... (스트림 방식)")
-                result = synthesizer.speak_text_async(text.strip()).get()
-
-                if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-                    # 스트림에서 오디오 데이터 읽기
-                    audio_data = result.audio_data
-
-                    if audio_data and len(audio_data) > 0:
-                        # 오디오 데이터를 Base64로 인코딩
-                        audio_base64 = base64.b64encode(audio_data).decode("utf-8")
-
-                        logger.info(f"✅ TTS 성공 (스트림): {len(audio_data)} bytes")
-
-                        return {
-                            "success": True,
-                            "audio_data": audio_base64,
-                            "voice_name": voice_name,
-                            "text": text,
-                        }
-                    else:
-                        raise Exception("오디오 데이터가 비어있습니다")
-
-                elif result.reason == speechsdk.ResultReason.Canceled:
-                    cancellation_details = result.cancellation_details
-                    error_msg = f"TTS 취소됨: {cancellation_details.reason}"
-                    if cancellation_details.error_details:
-                        error_msg += f" - {cancellation_details.error_details}"
-                    raise Exception(error_msg)
-
-                else:
-                    raise Exception(f"TTS 실패: {result.reason}")
-
-            except Exception as stream_error:
-                logger.warning(f"⚠️ 스트림 방식 실패: {stream_error}")
-
-                # 방법 2: 기본 스피커 활성화 방식 (백업)
-                try:
-                    logger.info("🔄 기본 스피커 방식으로 재시도...")
-
-                    # 기본 오디오 출력 설정 (스피커 사용)
-                    audio_config = speechsdk.audio.AudioOutputConfig(
-                        use_default_speaker=True
-                    )
-
-                    # 음성 합성기 생성
-                    synthesizer = speechsdk.SpeechSynthesizer(
-                        speech_config=speech_config, audio_config=audio_config
-                    )
-
-                    # 음성 합성 수행
-                    result = synthesizer.speak_text_async(text.strip()).get()
-
-                    if (
-                        result.reason
-                        == speechsdk.ResultReason.SynthesizingAudioCompleted
-                    ):
-                        # result.audio_data에서 직접 가져오기
-                        audio_data = result.audio_data
-
-                        if audio_data and len(audio_data) > 0:
-                            audio_base64 = base64.b64encode(audio_data).decode("utf-8")
-
-                            logger.info(
-                                f"✅ TTS 성공 (스피커): {len(audio_data)} bytes"
-                            )
-
-                            return {
-                                "success": True,
-                                "audio_data": audio_base64,
-                                "voice_name": voice_name,
-                                "text": text,
-                            }
-                        else:
-                            raise Exception("오디오 데이터가 비어있습니다")
-
-                    else:
-                        raise Exception(f"TTS 실패: {result.reason}")
-
-                except Exception as speaker_error:
-                    logger.warning(f"⚠️ 스피커 방식도 실패: {speaker_error}")
+    speech_config = speechsdk.SpeechConfig(
+        subscription=speech_key, region=speech_region
+    )
+    speech_config.speech_synthesis_voice_name = voice_name
 
-                    # 방법 3: 파일 방식 (최후의 수단)
-                    try:
-                        logger.info("🔄 파일 방식으로 재시도...")
+    def synthesize(audio_config):
+        synthesizer = speechsdk.SpeechSynthesizer(
+            speech_config=speech_config, audio_config=audio_config
+        )
+        result = synthesizer.speak_text_async(text).get()
+        if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
+            return result
+        if result.reason == speechsdk.ResultReason.Canceled:
+            cancellation_details = result.cancellation_details
+            error_msg = f"TTS 취소됨: {cancellation_details.reason}"
+            if cancellation_details.error_details:
+                error_msg += f" - {cancellation_details.error_details}"
+            raise Exception(error_msg)
+        raise Exception(f"TTS 실패: {result.reason}")
+
+    # 방법 1: 메모리 스트림으로 직접 출력 (권장)
+    try:
+        logger.info("🔄 Azure TTS 합성 수행 중... (스트림 방식)")
+        pull_stream = speechsdk.audio.PullAudioOutputStream()
+        result = synthesize(speechsdk.audio.AudioOutputConfig(stream=pull_stream))
+        if not result.audio_data:
+            raise Exception("오디오 데이터가 비어있습니다")
+        logger.info(f"✅ TTS 성공 (스트림): {len(result.audio_data)} bytes")
+        return result.audio_data
+    except Exception as e:
+        stream_error = e
+        logger.warning(f"⚠️ 스트림 방식 실패: {stream_error}")
 
-                        # 임시 파일 생성
-                        with tempfile.NamedTemporaryFile(
-                            suffix=".wav", delete=False
-                        ) as temp_file:
-                            temp_filename = temp_file.name
+    # 방법 2: 기본 스피커 활성화 방식 (백업)
+    try:
+        logger.info("🔄 기본 스피커 방식으로 재시도...")
+        result = synthesize(
+            speechsdk.audio.AudioOutputConfig(use_default_speaker=True)
+        )
+        if not result.audio_data:
+            raise Exception("오디오 데이터가 비어있습니다")
+        logger.info(f"✅ TTS 성공 (스피커): {len(result.audio_data)} bytes")
+        return result.audio_data
+    except Exception as e:
+        speaker_error = e
+        logger.warning(f"⚠️ 스피커 방식도 실패: {speaker_error}")
 
-                        # 파일 출력으로 설정
-                        audio_config = speechsdk.audio.AudioOutputConfig(
-                            filename=temp_filename
-                        )
+    # 방법 3: 파일 방식 (최후의 수단)
+    logger.info("🔄 파일 방식으로 재시도...")
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
+        temp_filename = temp_file.name
+    try:
+        synthesize(speechsdk.audio.AudioOutputConfig(filename=temp_filename))
+        with open(temp_filename, "rb") as audio_file:
+            audio_data = audio_file.read()
+    except Exception as file_error:
+        logger.error(f"❌ 파일 방식도 실패: {file_error}")
+        raise Exception(
+            f"모든 TTS 방식 실패: 스트림({stream_error}), 스피커({speaker_error}), 파일({file_error})"
+        )
+    finally:
+        try:
+            os.remove(temp_filename)
+        except OSError:
+            pass
 
-                        # 음성 합성기 생성
-                        synthesizer = speechsdk.SpeechSynthesizer(
-                            speech_config=speech_config, audio_config=audio_config
-                        )
+    if not audio_data:
+        raise Exception("파일이 비어있습니다")
+    logger.info(f"✅ TTS 성공 (파일): {len(audio_data)} bytes")
+    return audio_data
 
-                        # 음성 합성 수행
-                        result = synthesizer.speak_text_async(text.strip()).get()
-
-                        if (
-                            result.reason
-                            == speechsdk.ResultReason.SynthesizingAudioCompleted
-                        ):
-                            # 파일에서 오디오 데이터 읽기
-                            with open(temp_filename, "rb") as audio_file:
-                                audio_data = audio_file.read()
-
-                            # 임시 파일 삭제
-                            try:
-                                os.remove(temp_filename)
-                            except:
-                                pass
-
-                            if audio_data and len(audio_data) > 0:
-                                audio_base64 = base64.b64encode(audio_data).decode(
-                                    "utf-8"
-                                )
-
-                                logger.info(
-                                    f"✅ TTS 성공 (파일): {len(audio_data)} bytes"
-                                )
-
-                                return {
-                                    "success": True,
-                                    "audio_data": audio_base64,
-                                    "voice_name": voice_name,
-                                    "text": text,
-                                }
-                            else:
-                                raise Exception("파일이 비어있습니다")
-
-                        else:
-                            raise Exception(f"TTS 실패: {result.reason}")
-
-                    except Exception as file_error:
-                        logger.error(f"❌ 파일 방식도 실패: {file_error}")
-                        raise Exception(
-                            f"모든 TTS 방식 실패: 스트림({stream_error}), 스피커({speaker_error}), 파일({file_error})"
-                        )
 
-        except ImportError:
-            logger.error("❌ Azure Speech SDK가 설치되지 않음")
-            raise HTTPException(
-                status_code=500, detail="Azure Speech SDK가 설치되지 않았습니다"
-            )
+async def synthesize_speech(text: str, voice_name: str) -> str:
+    """TTS 합성 후 Base64 문자열 반환
 
-        except Exception as tts_error:
-            logger.error(f"❌ Azure TTS 처리 오류: {tts_error}")
-            raise HTTPException(
-                status_code=500, detail=f"TTS 처리 오류: {str(tts_error)}"
-            )
+    SDK 호출은 블로킹이므로 스레드에서 실행하고, 같은 문장/음성의 동시 요청은
+    한 번의 Azure 호출로 합침 (안내 문구가 몰릴 때 중복 과금 방지)
+    """
+    text = text.strip()
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"❌ TTS API 전체 오류: {e}")
-        raise HTTPException(status_code=500, detail=f"TTS 시스템 오류: {str(e)}")
+    async def run():
+        audio_data = await asyncio.to_thread(_synthesize_speech_sync, text, voice_name)
+        return base64.b64encode(audio_data).decode("utf-8")
 
+    return await single_flight.do(f"tts|{voice_name}|{text}", run)
 
-# 추가로 JSON 방식도 지원하려면 이 엔드포인트도 추가하세요:
-@app.post("/api/tts-json", response_model=TTSResponse)
-async def text_to_speech_json_api(request: TTSRequest):
-    """텍스트를 Azure TTS로 음성 변환 (JSON 방식 백업)"""
 
-    if not request.text or len(request.text.strip()) == 0:
+def _validate_tts_text(text: str):
+    if not text or len(text.strip()) == 0:
         raise HTTPException(status_code=400, detail="텍스트가 비어있습니다.")
 
-    if len(request.text) > 1000:
+    if len(text) > 1000:
         raise HTTPException(
             status_code=400, detail="텍스트가 너무 깁니다. (최대 1000자)"
         )
 
+
+async def _synthesize_or_raise(text: str, voice_name: str) -> str:
+    """TTS 합성 (오류는 HTTPException으로 변환)"""
     try:
-        logger.info(
-            f"🔊 TTS JSON 요청: '{request.text[:50]}...' (음성: {request.voice_name})"
+        return await synthesize_speech(text, voice_name)
+    except HTTPException:
+        raise
+    except ImportError:
+        logger.error("❌ Azure Speech SDK가 설치되지 않음")
+        raise HTTPException(
+            status_code=500, detail="Azure Speech SDK가 설치되지 않았습니다"
         )
+    except Exception as tts_error:
+        logger.error(f"❌ Azure TTS 처리 오류: {tts_error}")
+        raise HTTPException(status_code=500, detail=f"TTS 처리 오류: {str(tts_error)}")
 
-        try:
-            import azure.cognitiveservices.speech as speechsdk
-
-            speech_key = os.getenv("AZURE_SPEECH_KEY")
-            speech_region = os.getenv("AZURE_SPEECH_REGION", "koreacentral")
-
-            if not speech_key:
-                raise HTTPException(
-                    status_code=500, detail="Azure Speech Key가 설정되지 않았습니다"
-                )
-
-            # Speech 설정
-            speech_config = speechsdk.SpeechConfig(
-                subscription=speech_key, region=speech_region
-            )
-            speech_config.speech_synthesis_voice_name = request.voice_name
-
-            # 오디오 출력을 메모리 스트림으로 설정
-            audio_config = speechsdk.audio.AudioOutputConfig(use_default_speaker=False)
-
-            # 음성 합성기 생성
-            synthesizer = speechsdk.SpeechSynthesizer(
-                speech_config=speech_config, audio_config=audio_config
-            )
-
-            # 음성 합성 수행
-            logger.info("🔄 Azure TTS 합성 수행 중...")
-            result = synthesizer.speak_text_async(request.text.strip()).get()
-
-            if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-                # 오디오 데이터를 Base64로 인코딩
-                audio_data = base64.b64encode(result.audio_data).decode("utf-8")
 
-                logger.info(f"✅ TTS JSON 성공: {len(result.audio_data)} bytes")
+@app.post("/api/tts")
+async def text_to_speech_api(
+    text: str = Form(...), voice_name: str = Form(DEFAULT_TTS_VOICE)
+):
+    """텍스트를 Azure TTS로 음성 변환 (스피커 오류 해결)"""
+    _validate_tts_text(text)
 
-                return TTSResponse(
-                    success=True,
-                    audio_data=audio_data,
-                    voice_name=request.voice_name,
-                    text=request.text,
-                )
+    logger.info(f"🔊 TTS 요청: '{text[:50]}...' (음성: {voice_name})")
+    audio_base64 = await _synthesize_or_raise(text, voice_name)
 
-            else:
-                logger.error(f"❌ TTS 결과: {result.reason}")
-                raise HTTPException(status_code=500, detail="TTS 합성 실패")
+    return {
+        "success": True,
+        "audio_data": audio_base64,
+        "voice_name": voice_name,
+        "text": text,
+    }
 
-        except ImportError:
-            logger.error("❌ Azure Speech SDK가 설치되지 않음")
-            raise HTTPException(
-                status_code=500, detail="Azure Speech SDK가 설치되지 않았습니다"
-            )
 
-        except Exception as tts_error:
-            logger.error(f"❌ Azure TTS 처리 오류: {tts_error}")
-            raise HTTPException(
-                status_code=500, detail=f"TTS 처리 오류: {str(tts_error)}"
-            )
+# 추가로 JSON 방식도 지원하려면 이 엔드포인트도 추가하세요:
+@app.post("/api/tts-json", response_model=TTSResponse)
+async def text_to_speech_json_api(request: TTSRequest):
+    """텍스트를 Azure TTS로 음성 변환 (JSON 방식 백업)"""
+    _validate_tts_text(request.text)
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"❌ TTS JSON API 전체 오류: {e}")
-        raise HTTPException(status_code=500, detail=f"TTS 시스템 오류: {str(e)}")
+    logger.info(
+        f"🔊 TTS JSON 요청: '{request.text[:50]}...' (음성: {request.voice_name})"
+    )
+    voice_name = request.voice_name or DEFAULT_TTS_VOICE
+    audio_base64 = await _synthesize_or_raise(request.text, voice_name)
+
+    return TTSResponse(
+        success=True,
+        audio_data=audio_base64,
+        voice_name=voice_name,
+        text=request.text,
+    )
 
 
 @app.get("/api/voices")
@@ -2628,21 +2899,11 @@ async def generate_exercise_route(route_request: ExerciseRouteRequest):
         avoid_zones = []
         if route_request.avoid_dangerous_zones:
             # 기존 위험지역 데이터 + 공사장 데이터 활용
-            all_zones = RISK_ZONES + [
-                zone
-                for zone in CONSTRUCTION_DATA
-                if zone.get("status") == "진행중" and zone.get("risk", 0) > 0.6
-            ]
-
-            # 시작점 주변 3km 내 위험지역만 선별
-            for zone in all_zones:
-                distance = calculate_distance(
-                    route_request.start_latitude,
-                    route_request.start_longitude,
-                    zone["lat"],
-                    zone["lng"],
-                )
-                if distance <= 3.0 and zone.get("risk", 0) > 0.6:
+            # 시작점 주변 3km 내 위험지역만 선별 (공간 인덱스)
+            for zone in ZONE_INDEX.within_radius(
+                route_request.start_latitude, route_request.start_longitude, 3.0
+            ):
+                if zone.get("risk", 0) > 0.6:
                     avoid_zones.append(zone)
 
         # 운동 경로 생성
@@ -2693,383 +2954,384 @@ async def calculate_steps_for_distance(request: StepsCalculatorRequest):
         raise HTTPException(status_code=400, detail=f"계산 오류: {str(e)}")
 
 
+# 서울시 추천 산책로 (운동 지역 API 백업 데이터, 지명 사전에도 사용)
+EXERCISE_AREAS_DATA = [
+    # 공원 (Parks)
+    {
+        "name": "올림픽공원",
+        "center": [37.5213, 127.1218],
+        "type": "park",
+        "radius_km": 2.5,
+    },
+    {
+        "name": "서울숲",
+        "center": [37.5447, 127.0374],
+        "type": "park",
+        "radius_km": 1.8,
+    },
+    {
+        "name": "보라매공원",
+        "center": [37.4915, 126.9199],
+        "type": "park",
+        "radius_km": 1.2,
+    },
+    {
+        "name": "북서울꿈의숲",
+        "center": [37.6214, 127.0601],
+        "type": "park",
+        "radius_km": 2.0,
+    },
+    {
+        "name": "월드컵공원 (하늘공원)",
+        "center": [37.5709, 126.8828],
+        "type": "park",
+        "radius_km": 3.0,
+    },
+    {
+        "name": "선유도공원",
+        "center": [37.5434, 126.8973],
+        "type": "park",
+        "radius_km": 0.8,
+    },
+    {
+        "name": "어린이대공원",
+        "center": [37.5479, 127.0810],
+        "type": "park",
+        "radius_km": 1.5,
+    },
+    {
+        "name": "서서울호수공원",
+        "center": [37.5210, 126.8370],
+        "type": "park",
+        "radius_km": 1.0,
+    },
+    {
+        "name": "푸른수목원",
+        "center": [37.4836, 126.8155],
+        "type": "park",
+        "radius_km": 1.3,
+    },
+    {
+        "name": "율현공원",
+        "center": [37.4760, 127.1120],
+        "type": "park",
+        "radius_km": 0.8,
+    },
+    {
+        "name": "용산가족공원",
+        "center": [37.5280, 126.9697],
+        "type": "park",
+        "radius_km": 1.0,
+    },
+    {
+        "name": "여의도공원",
+        "center": [37.5267, 126.9242],
+        "type": "park",
+        "radius_km": 1.0,
+    },
+    {
+        "name": "남산공원",
+        "center": [37.5536, 126.9906],
+        "type": "mountain",
+        "radius_km": 2.0,
+    },
+    # 강변 (Rivers)
+    {
+        "name": "한강공원 여의도",
+        "center": [37.5285, 126.9337],
+        "type": "river",
+        "radius_km": 2.0,
+    },
+    {
+        "name": "한강공원 반포",
+        "center": [37.5131, 127.0009],
+        "type": "river",
+        "radius_km": 2.5,
+    },
+    {
+        "name": "한강공원 뚝섬",
+        "center": [37.5307, 127.0666],
+        "type": "river",
+        "radius_km": 3.0,
+    },
+    {
+        "name": "한강공원 잠실",
+        "center": [37.5202, 127.0825],
+        "type": "river",
+        "radius_km": 2.8,
+    },
+    {
+        "name": "한강공원 강서",
+        "center": [37.5653, 126.8153],
+        "type": "river",
+        "radius_km": 2.2,
+    },
+    {
+        "name": "한강공원 망원",
+        "center": [37.5553, 126.8949],
+        "type": "river",
+        "radius_km": 1.8,
+    },
+    {
+        "name": "한강공원 이촌",
+        "center": [37.5215, 126.9675],
+        "type": "river",
+        "radius_km": 1.5,
+    },
+    {
+        "name": "한강공원 난지",
+        "center": [37.5714, 126.8986],
+        "type": "river",
+        "radius_km": 1.6,
+    },
+    # 하천 (Streams)
+    {
+        "name": "청계천",
+        "center": [37.5704, 126.9910],
+        "type": "stream",
+        "radius_km": 3.8,
+    },
+    {
+        "name": "양재천",
+        "center": [37.4712, 127.0359],
+        "type": "stream",
+        "radius_km": 4.2,
+    },
+    {
+        "name": "중랑천",
+        "center": [37.5856, 127.0436],
+        "type": "stream",
+        "radius_km": 6.0,
+    },
+    {
+        "name": "탄천",
+        "center": [37.4015, 127.1105],
+        "type": "stream",
+        "radius_km": 5.5,
+    },
+    {
+        "name": "성북천",
+        "center": [37.5820, 127.0180],
+        "type": "stream",
+        "radius_km": 2.5,
+    },
+    {
+        "name": "불광천",
+        "center": [37.5880, 126.9130],
+        "type": "stream",
+        "radius_km": 3.2,
+    },
+    {
+        "name": "우이천",
+        "center": [37.6380, 127.0300],
+        "type": "stream",
+        "radius_km": 2.8,
+    },
+    # 산/숲길 (Mountains/Trails)
+    {
+        "name": "안산자락길",
+        "center": [37.5714, 126.9540],
+        "type": "mountain",
+        "radius_km": 2.2,
+    },
+    {
+        "name": "인왕산",
+        "center": [37.5824, 126.9571],
+        "type": "mountain",
+        "radius_km": 1.8,
+    },
+    {
+        "name": "북악산",
+        "center": [37.5934, 126.9810],
+        "type": "mountain",
+        "radius_km": 2.5,
+    },
+    {
+        "name": "관악산",
+        "center": [37.4483, 126.9615],
+        "type": "mountain",
+        "radius_km": 3.5,
+    },
+    {
+        "name": "대모산",
+        "center": [37.4642, 127.0648],
+        "type": "mountain",
+        "radius_km": 2.0,
+    },
+    {
+        "name": "수락산",
+        "center": [37.6975, 127.0662],
+        "type": "mountain",
+        "radius_km": 2.8,
+    },
+    {
+        "name": "아차산",
+        "center": [37.5539, 127.0988],
+        "type": "mountain",
+        "radius_km": 1.8,
+    },
+    # 숲길/산책로 (Nature Trails)
+    {
+        "name": "경의선숲길",
+        "center": [37.5663, 126.9251],
+        "type": "trail",
+        "radius_km": 6.3,
+    },
+    {
+        "name": "서울둘레길 1코스",
+        "center": [37.6362, 127.0203],
+        "type": "trail",
+        "radius_km": 3.2,
+    },
+    {
+        "name": "서울둘레길 2코스",
+        "center": [37.6089, 127.0736],
+        "type": "trail",
+        "radius_km": 4.1,
+    },
+    {
+        "name": "서울둘레길 3코스",
+        "center": [37.5441, 127.1269],
+        "type": "trail",
+        "radius_km": 3.8,
+    },
+    {
+        "name": "경춘선숲길",
+        "center": [37.6220, 127.0850],
+        "type": "trail",
+        "radius_km": 4.5,
+    },
+    {
+        "name": "암사생태공원",
+        "center": [37.5516, 127.1301],
+        "type": "trail",
+        "radius_km": 1.5,
+    },
+    # 역사/문화 (Historical/Cultural)
+    {
+        "name": "경복궁",
+        "center": [37.5788, 126.9770],
+        "type": "history",
+        "radius_km": 0.8,
+    },
+    {
+        "name": "창덕궁",
+        "center": [37.5814, 126.9910],
+        "type": "history",
+        "radius_km": 0.6,
+    },
+    {
+        "name": "덕수궁",
+        "center": [37.5657, 126.9751],
+        "type": "history",
+        "radius_km": 0.5,
+    },
+    {
+        "name": "창경궁",
+        "center": [37.5792, 126.9949],
+        "type": "history",
+        "radius_km": 0.7,
+    },
+    {
+        "name": "종묘",
+        "center": [37.5741, 126.9940],
+        "type": "history",
+        "radius_km": 0.4,
+    },
+    {
+        "name": "북촌한옥마을",
+        "center": [37.5814, 126.9849],
+        "type": "history",
+        "radius_km": 1.2,
+    },
+    {
+        "name": "인사동",
+        "center": [37.5719, 126.9854],
+        "type": "history",
+        "radius_km": 0.8,
+    },
+    {
+        "name": "명동",
+        "center": [37.5636, 126.9834],
+        "type": "history",
+        "radius_km": 0.6,
+    },
+    {
+        "name": "동대문디자인플라자",
+        "center": [37.5664, 127.0092],
+        "type": "history",
+        "radius_km": 0.5,
+    },
+    {
+        "name": "홍대상상마당",
+        "center": [37.5511, 126.9227],
+        "type": "history",
+        "radius_km": 0.7,
+    },
+    {
+        "name": "삼청동길",
+        "center": [37.5824, 126.9816],
+        "type": "history",
+        "radius_km": 1.0,
+    },
+    {
+        "name": "덕수궁 돌담길",
+        "center": [37.5659, 126.9749],
+        "type": "history",
+        "radius_km": 0.8,
+    },
+    {
+        "name": "한양도성길",
+        "center": [37.5788, 127.0072],
+        "type": "history",
+        "radius_km": 1.5,
+    },
+    {
+        "name": "석촌호수공원",
+        "center": [37.5093, 127.1048],
+        "type": "park",
+        "radius_km": 1.2,
+    },
+    {
+        "name": "몽마르뜨공원",
+        "center": [37.5003, 127.0016],
+        "type": "park",
+        "radius_km": 0.6,
+    },
+    {
+        "name": "국립현충원",
+        "center": [37.5029, 126.9769],
+        "type": "park",
+        "radius_km": 1.8,
+    },
+    {
+        "name": "매헌시민의숲",
+        "center": [37.4704, 127.0368],
+        "type": "park",
+        "radius_km": 1.4,
+    },
+    {
+        "name": "개운산공원",
+        "center": [37.5950, 127.0200],
+        "type": "mountain",
+        "radius_km": 1.0,
+    },
+    {
+        "name": "일자산허브천문공원",
+        "center": [37.5490, 127.1600],
+        "type": "park",
+        "radius_km": 1.2,
+    },
+]
+
+
 @app.get("/api/exercise-areas")
 async def get_exercise_areas():
     """서울시 추천 운동 지역 목록 (완전히 수정된 버전)"""
     try:
         logger.info("📍 산책로 API 호출 시작")
         
-        # 직접 산책로 데이터 정의 (확실한 백업)
-        safe_areas_data = [
-            # 공원 (Parks)
-            {
-                "name": "올림픽공원",
-                "center": [37.5213, 127.1218],
-                "type": "park",
-                "radius_km": 2.5,
-            },
-            {
-                "name": "서울숲",
-                "center": [37.5447, 127.0374],
-                "type": "park",
-                "radius_km": 1.8,
-            },
-            {
-                "name": "보라매공원",
-                "center": [37.4915, 126.9199],
-                "type": "park",
-                "radius_km": 1.2,
-            },
-            {
-                "name": "북서울꿈의숲",
-                "center": [37.6214, 127.0601],
-                "type": "park",
-                "radius_km": 2.0,
-            },
-            {
-                "name": "월드컵공원 (하늘공원)",
-                "center": [37.5709, 126.8828],
-                "type": "park",
-                "radius_km": 3.0,
-            },
-            {
-                "name": "선유도공원",
-                "center": [37.5434, 126.8973],
-                "type": "park",
-                "radius_km": 0.8,
-            },
-            {
-                "name": "어린이대공원",
-                "center": [37.5479, 127.0810],
-                "type": "park",
-                "radius_km": 1.5,
-            },
-            {
-                "name": "서서울호수공원",
-                "center": [37.5210, 126.8370],
-                "type": "park",
-                "radius_km": 1.0,
-            },
-            {
-                "name": "푸른수목원",
-                "center": [37.4836, 126.8155],
-                "type": "park",
-                "radius_km": 1.3,
-            },
-            {
-                "name": "율현공원",
-                "center": [37.4760, 127.1120],
-                "type": "park",
-                "radius_km": 0.8,
-            },
-            {
-                "name": "용산가족공원",
-                "center": [37.5280, 126.9697],
-                "type": "park",
-                "radius_km": 1.0,
-            },
-            {
-                "name": "여의도공원",
-                "center": [37.5267, 126.9242],
-                "type": "park",
-                "radius_km": 1.0,
-            },
-            {
-                "name": "남산공원",
-                "center": [37.5536, 126.9906],
-                "type": "mountain",
-                "radius_km": 2.0,
-            },
-            # 강변 (Rivers)
-            {
-                "name": "한강공원 여의도",
-                "center": [37.5285, 126.9337],
-                "type": "river",
-                "radius_km": 2.0,
-            },
-            {
-                "name": "한강공원 반포",
-                "center": [37.5131, 127.0009],
-                "type": "river",
-                "radius_km": 2.5,
-            },
-            {
-                "name": "한강공원 뚝섬",
-                "center": [37.5307, 127.0666],
-                "type": "river",
-                "radius_km": 3.0,
-            },
-            {
-                "name": "한강공원 잠실",
-                "center": [37.5202, 127.0825],
-                "type": "river",
-                "radius_km": 2.8,
-            },
-            {
-                "name": "한강공원 강서",
-                "center": [37.5653, 126.8153],
-                "type": "river",
-                "radius_km": 2.2,
-            },
-            {
-                "name": "한강공원 망원",
-                "center": [37.5553, 126.8949],
-                "type": "river",
-                "radius_km": 1.8,
-            },
-            {
-                "name": "한강공원 이촌",
-                "center": [37.5215, 126.9675],
-                "type": "river",
-                "radius_km": 1.5,
-            },
-            {
-                "name": "한강공원 난지",
-                "center": [37.5714, 126.8986],
-                "type": "river",
-                "radius_km": 1.6,
-            },
-            # 하천 (Streams)
-            {
-                "name": "청계천",
-                "center": [37.5704, 126.9910],
-                "type": "stream",
-                "radius_km": 3.8,
-            },
-            {
-                "name": "양재천",
-                "center": [37.4712, 127.0359],
-                "type": "stream",
-                "radius_km": 4.2,
-            },
-            {
-                "name": "중랑천",
-                "center": [37.5856, 127.0436],
-                "type": "stream",
-                "radius_km": 6.0,
-            },
-            {
-                "name": "탄천",
-                "center": [37.4015, 127.1105],
-                "type": "stream",
-                "radius_km": 5.5,
-            },
-            {
-                "name": "성북천",
-                "center": [37.5820, 127.0180],
-                "type": "stream",
-                "radius_km": 2.5,
-            },
-            {
-                "name": "불광천",
-                "center": [37.5880, 126.9130],
-                "type": "stream",
-                "radius_km": 3.2,
-            },
-            {
-                "name": "우이천",
-                "center": [37.6380, 127.0300],
-                "type": "stream",
-                "radius_km": 2.8,
-            },
-            # 산/숲길 (Mountains/Trails)
-            {
-                "name": "안산자락길",
-                "center": [37.5714, 126.9540],
-                "type": "mountain",
-                "radius_km": 2.2,
-            },
-            {
-                "name": "인왕산",
-                "center": [37.5824, 126.9571],
-                "type": "mountain",
-                "radius_km": 1.8,
-            },
-            {
-                "name": "북악산",
-                "center": [37.5934, 126.9810],
-                "type": "mountain",
-                "radius_km": 2.5,
-            },
-            {
-                "name": "관악산",
-                "center": [37.4483, 126.9615],
-                "type": "mountain",
-                "radius_km": 3.5,
-            },
-            {
-                "name": "대모산",
-                "center": [37.4642, 127.0648],
-                "type": "mountain",
-                "radius_km": 2.0,
-            },
-            {
-                "name": "수락산",
-                "center": [37.6975, 127.0662],
-                "type": "mountain",
-                "radius_km": 2.8,
-            },
-            {
-                "name": "아차산",
-                "center": [37.5539, 127.0988],
-                "type": "mountain",
-                "radius_km": 1.8,
-            },
-            # 숲길/산책로 (Nature Trails)
-            {
-                "name": "경의선숲길",
-                "center": [37.5663, 126.9251],
-                "type": "trail",
-                "radius_km": 6.3,
-            },
-            {
-                "name": "서울둘레길 1코스",
-                "center": [37.6362, 127.0203],
-                "type": "trail",
-                "radius_km": 3.2,
-            },
-            {
-                "name": "서울둘레길 2코스",
-                "center": [37.6089, 127.0736],
-                "type": "trail",
-                "radius_km": 4.1,
-            },
-            {
-                "name": "서울둘레길 3코스",
-                "center": [37.5441, 127.1269],
-                "type": "trail",
-                "radius_km": 3.8,
-            },
-            {
-                "name": "경춘선숲길",
-                "center": [37.6220, 127.0850],
-                "type": "trail",
-                "radius_km": 4.5,
-            },
-            {
-                "name": "암사생태공원",
-                "center": [37.5516, 127.1301],
-                "type": "trail",
-                "radius_km": 1.5,
-            },
-            # 역사/문화 (Historical/Cultural)
-            {
-                "name": "경복궁",
-                "center": [37.5788, 126.9770],
-                "type": "history",
-                "radius_km": 0.8,
-            },
-            {
-                "name": "창덕궁",
-                "center": [37.5814, 126.9910],
-                "type": "history",
-                "radius_km": 0.6,
-            },
-            {
-                "name": "덕수궁",
-                "center": [37.5657, 126.9751],
-                "type": "history",
-                "radius_km": 0.5,
-            },
-            {
-                "name": "창경궁",
-                "center": [37.5792, 126.9949],
-                "type": "history",
-                "radius_km": 0.7,
-            },
-            {
-                "name": "종묘",
-                "center": [37.5741, 126.9940],
-                "type": "history",
-                "radius_km": 0.4,
-            },
-            {
-                "name": "북촌한옥마을",
-                "center": [37.5814, 126.9849],
-                "type": "history",
-                "radius_km": 1.2,
-            },
-            {
-                "name": "인사동",
-                "center": [37.5719, 126.9854],
-                "type": "history",
-                "radius_km": 0.8,
-            },
-            {
-                "name": "명동",
-                "center": [37.5636, 126.9834],
-                "type": "history",
-                "radius_km": 0.6,
-            },
-            {
-                "name": "동대문디자인플라자",
-                "center": [37.5664, 127.0092],
-                "type": "history",
-                "radius_km": 0.5,
-            },
-            {
-                "name": "홍대상상마당",
-                "center": [37.5511, 126.9227],
-                "type": "history",
-                "radius_km": 0.7,
-            },
-            {
-                "name": "삼청동길",
-                "center": [37.5824, 126.9816],
-                "type": "history",
-                "radius_km": 1.0,
-            },
-            {
-                "name": "덕수궁 돌담길",
-                "center": [37.5659, 126.9749],
-                "type": "history",
-                "radius_km": 0.8,
-            },
-            {
-                "name": "한양도성길",
-                "center": [37.5788, 127.0072],
-                "type": "history",
-                "radius_km": 1.5,
-            },
-            {
-                "name": "석촌호수공원",
-                "center": [37.5093, 127.1048],
-                "type": "park",
-                "radius_km": 1.2,
-            },
-            {
-                "name": "몽마르뜨공원",
-                "center": [37.5003, 127.0016],
-                "type": "park",
-                "radius_km": 0.6,
-            },
-            {
-                "name": "국립현충원",
-                "center": [37.5029, 126.9769],
-                "type": "park",
-                "radius_km": 1.8,
-            },
-            {
-                "name": "매헌시민의숲",
-                "center": [37.4704, 127.0368],
-                "type": "park",
-                "radius_km": 1.4,
-            },
-            {
-                "name": "개운산공원",
-                "center": [37.5950, 127.0200],
-                "type": "mountain",
-                "radius_km": 1.0,
-            },
-            {
-                "name": "일자산허브천문공원",
-                "center": [37.5490, 127.1600],
-                "type": "park",
-                "radius_km": 1.2,
-            },
-        ]
-        
-        logger.info(f"📊 백업 데이터 준비: {len(safe_areas_data)}개 지역")
+        logger.info(f"📊 백업 데이터 준비: {len(EXERCISE_AREAS_DATA)}개 지역")
         
         areas_with_info = []
 
@@ -3111,14 +3373,14 @@ async def get_exercise_areas():
                 source_areas = exercise_route_service.safe_areas
             else:
                 logger.warning("⚠️ 기존 서비스 데이터가 비어있음")
-                source_areas = safe_areas_data
+                source_areas = EXERCISE_AREAS_DATA
         except Exception as e:
             logger.error(f"❌ 기존 서비스 접근 오류: {e}")
-            source_areas = safe_areas_data
+            source_areas = EXERCISE_AREAS_DATA
             
         if not source_areas:
             logger.warning("⚠️ source_areas가 비어있음, 백업 데이터 사용")
-            source_areas = safe_areas_data
+            source_areas = EXERCISE_AREAS_DATA
             
         logger.info(f"📍 최종 사용할 데이터: {len(source_areas)}개 지역")
 
@@ -3166,7 +3428,7 @@ async def get_exercise_areas():
             "areas": areas_with_info,
             "total_count": len(areas_with_info),
             "types": type_counts,
-            "data_source": "backup" if source_areas == safe_areas_data else "service",
+            "data_source": "backup" if source_areas == EXERCISE_AREAS_DATA else "service",
         }
 
     except Exception as e:
@@ -3522,14 +3784,13 @@ async def health_check():
 
     # OSRM 서비스 상태 확인
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{OSRM_BASE_URL}/route/v1/foot/126.9780,37.5665;127.0276,37.4979",
-                timeout=5,
-            ) as response:
-                osrm_status = (
-                    "healthy" if response.status == 200 else f"error: {response.status}"
-                )
+        session = await http_client.get_session()
+        status, _, _ = await osrm_pool.get_json(
+            session,
+            "/route/v1/foot/126.9780,37.5665;127.0276,37.4979",
+            timeout=aiohttp.ClientTimeout(total=5),
+        )
+        osrm_status = "healthy" if status == 200 else f"error: {status}"
     except Exception as e:
         osrm_status = f"error: {str(e)}"
 
@@ -3565,6 +3826,18 @@ async def get_system_status():
         "api_version": "2.0.0",
         "server_time": datetime.now().isoformat(),
         "risk_zones_count": len(RISK_ZONES),
+        "indexed_zones_count": len(ZONE_INDEX),
+        "construction_data_version": CONSTRUCTION_DATASET.version,
+        "zone_data_generation": ZONE_DATA_GENERATION,
+        "geocode_cache": geocode_cache.stats(),
+        "route_cache": route_cache.stats(),
+        "single_flight": single_flight.stats(),
+        "osrm_backends": osrm_pool.stats(),
+        "local_router": {
+            "ready": LOCAL_ROUTER is not None,
+            "nodes": LOCAL_ROUTER.graph.node_count if LOCAL_ROUTER else 0,
+        },
+        "gazetteer_entries": len(gazetteer),
         "supported_languages": ["ko-KR"],
         "routing_providers": ["OSRM", "Custom Safety Algorithm"],
         "geocoding_providers": ["Kakao Maps", "Nominatim/OpenStreetMap"],
@@ -3918,6 +4191,8 @@ async def serve_react_app(full_path: str):
             "token",
             "register",
             "predict-risk",
+            "risk-raster",
+            "risk-tiles",
             "walking-route",
             "geocode",
             "chatbot",
@@ -0,0 +1,134 @@
+# backend/osm_ingest.py - planet_osm_line 스트리밍 적재 (서버 측 커서 + WKB + NumPy 일괄 처리)
+
+import logging
+import os
+import time
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+from walk_graph import GraphBuilder, highway_code
+
+logger = logging.getLogger(__name__)
+
+# 한 번에 가져올 행 수 (서버 측 커서 itersize)
+INGEST_BATCH_ROWS = int(os.getenv("OSM_INGEST_BATCH_ROWS", "20000"))
+
+# 도로 종류 + 범위(EPSG:4326 경도/위도)로만 거르고 행 수 제한은 두지 않음
+LINE_QUERY = """
+    SELECT highway, ST_AsBinary(ST_Transform(way, 4326), 'NDR')
+    FROM planet_osm_line
+    WHERE highway = ANY(%s)
+      AND way && ST_Transform(ST_MakeEnvelope(%s, %s, %s, %s, 4326), 3857)
+"""
+
+# WKB 헤더: 바이트 순서(1) + 형식(uint32) + 점 개수(uint32)
+_WKB_HEADER = 9
+_WKB_NDR = 1
+_WKB_LINESTRING = 2
+
+
+def _read_uint32(raw: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """리틀 엔디언 uint32 (정렬되지 않은 위치도 읽을 수 있도록 바이트 단위로 조합)"""
+    value = np.zeros(len(offsets), dtype=np.int64)
+    for i in range(4):
+        value |= raw[offsets + i].astype(np.int64) << (8 * i)
+    return value
+
+
+def parse_linestrings(blobs: Sequence[bytes]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """NDR WKB LineString 묶음을 한 번에 해석
+
+    (좌표 (N, 2) [경도, 위도], 점별 행 번호, 행별 유효 여부) 반환.
+    LineString이 아니거나 길이가 맞지 않는 행은 유효하지 않은 것으로 표시하고 건너뜀
+    """
+    row_count = len(blobs)
+    lengths = np.fromiter((len(blob) for blob in blobs), dtype=np.int64, count=row_count)
+    raw = np.frombuffer(b"".join(blobs), dtype=np.uint8)
+    starts = np.zeros(row_count, dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+
+    valid = lengths >= _WKB_HEADER
+    point_counts = np.zeros(row_count, dtype=np.int64)
+    checked = np.flatnonzero(valid)
+    if len(checked):
+        head = starts[checked]
+        points = _read_uint32(raw, head + 5)
+        valid[checked] = (
+            (raw[head] == _WKB_NDR)
+            & (_read_uint32(raw, head + 1) == _WKB_LINESTRING)
+            & (lengths[checked] == _WKB_HEADER + 16 * points)
+        )
+        point_counts[checked] = np.where(valid[checked], points, 0)
+
+    # 유효한 행의 좌표 구간 [시작+9, 끝)만 남기고 float64로 재해석
+    marks = np.zeros(len(raw) + 1, dtype=np.int32)
+    np.add.at(marks, starts[valid] + _WKB_HEADER, 1)
+    np.add.at(marks, starts[valid] + lengths[valid], -1)
+    keep = np.cumsum(marks[:-1]) > 0
+    coords = raw[keep].view("<f8").reshape(-1, 2)
+    rows = np.repeat(np.arange(row_count), point_counts)
+    return coords, rows, valid
+
+
+def ingest_network(
+    conn,
+    builder: GraphBuilder,
+    highway_weights: Dict[str, float],
+    bbox: Tuple[float, float, float, float],
+    batch_rows: int = INGEST_BATCH_ROWS,
+) -> Dict:
+    """psycopg2 연결에서 도로망을 배치 단위로 읽어 builder에 추가하고 통계 반환
+
+    이름 있는(서버 측) 커서로 batch_rows 행씩 받아오므로 전체 결과를 메모리에 올리지 않음.
+    highway_weights는 적재할 도로 종류와 가중치 배율 (가중치 = 거리 × 배율)
+    """
+    started = time.time()
+    highways = list(highway_weights)
+    codes = np.array([highway_code(h) for h in highways], dtype=np.uint8)
+    multipliers = np.array([highway_weights[h] for h in highways], dtype=np.float64)
+    index_of = {h: i for i, h in enumerate(highways)}
+
+    stats = {"rows": 0, "segments": 0, "skipped": 0, "by_highway": {}}
+    cursor = conn.cursor(name="osm_walk_ingest")
+    cursor.itersize = batch_rows
+    try:
+        cursor.execute(LINE_QUERY, (highways, *bbox))
+        while True:
+            rows = cursor.fetchmany(batch_rows)
+            if not rows:
+                break
+            kinds = np.fromiter(
+                (index_of.get(highway, -1) for highway, _ in rows),
+                dtype=np.int64,
+                count=len(rows),
+            )
+            coords, point_rows, valid = parse_linestrings(
+                [bytes(blob) if blob is not None else b"" for _, blob in rows]
+            )
+            valid &= kinds >= 0
+            point_valid = valid[point_rows]
+            point_rows = point_rows[point_valid]
+            coords = coords[point_valid]
+
+            stats["segments"] += builder.add_polylines(
+                coords[:, 1], coords[:, 0], point_rows,
+                codes[np.maximum(kinds, 0)], multipliers[np.maximum(kinds, 0)],
+            )
+            stats["rows"] += int(valid.sum())
+            stats["skipped"] += int((~valid).sum())
+            for kind, count in zip(*np.unique(kinds[valid], return_counts=True)):
+                name = highways[kind]
+                stats["by_highway"][name] = stats["by_highway"].get(name, 0) + int(count)
+            logger.info(f"📥 OSM 도로 적재: {stats['rows']:,}행, {stats['segments']:,}개 선분")
+    finally:
+        cursor.close()
+        # 서버 측 커서 트랜잭션 종료 (읽기 전용)
+        conn.rollback()
+
+    stats["seconds"] = round(time.time() - started, 2)
+    logger.info(
+        f"✅ OSM 도로 적재 완료: {stats['rows']:,}행 (건너뜀 {stats['skipped']:,}), "
+        f"{stats['segments']:,}개 선분, {stats['seconds']}초"
+    )
+    return stats
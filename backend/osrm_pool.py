@@ -0,0 +1,305 @@
+# backend/osrm_pool.py - OSRM 백엔드 풀 (상태 점수, 서킷 브레이커, 헤지 요청)
+
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 쉼표로 구분한 OSRM 서버 목록 (예: "http://localhost:5000,https://router.project-osrm.org")
+DEFAULT_OSRM_SERVERS = "https://router.project-osrm.org,http://router.project-osrm.org"
+OSRM_SERVERS = [
+    url.strip().rstrip("/")
+    for url in os.getenv("OSRM_SERVERS", DEFAULT_OSRM_SERVERS).split(",")
+    if url.strip()
+]
+
+# 지연시간/실패율 EWMA 가중치
+EWMA_ALPHA = 0.2
+# 측정값이 없는 서버의 가정 지연시간 (초)
+DEFAULT_LATENCY_SECONDS = 1.0
+# 연속 실패가 이 횟수에 도달하면 서킷 개방
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("OSRM_CIRCUIT_FAILURES", "3"))
+CIRCUIT_COOLDOWN_SECONDS = float(os.getenv("OSRM_CIRCUIT_COOLDOWN_SECONDS", "30"))
+CIRCUIT_MAX_COOLDOWN_SECONDS = 300.0
+# 헤지 요청 대기시간은 1순위 서버의 p95 지연시간 (표본이 적으면 기본값)
+LATENCY_WINDOW = 100
+HEDGE_MIN_SAMPLES = 10
+HEDGE_DEFAULT_SECONDS = float(os.getenv("OSRM_HEDGE_DEFAULT_SECONDS", "2.0"))
+HEDGE_MIN_SECONDS = 0.2
+HEDGE_MAX_SECONDS = 5.0
+
+
+class OSRMUnavailableError(Exception):
+    """사용 가능한 OSRM 서버가 모두 응답하지 않음"""
+
+
+class OSRMBackend:
+    """개별 OSRM 서버의 수동(passive) 상태 정보"""
+
+    def __init__(self, url: str, order: int):
+        self.url = url
+        self.order = order
+        self.latency_ewma: Optional[float] = None
+        self.failure_ewma = 0.0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.consecutive_failures = 0
+        self.circuit_trips = 0
+        self.open_until = 0.0
+        # 반개방 상태에서 시험 요청이 진행 중이면 다른 요청은 이 서버를 건너뜀
+        self.probe_in_flight = False
+        self.successes = 0
+        self.failures = 0
+
+    def circuit_state(self, now: float) -> str:
+        if self.open_until == 0.0:
+            return "closed"
+        return "open" if now < self.open_until else "half_open"
+
+    def is_available(self, now: float) -> bool:
+        """닫힘 상태이거나, 반개방 상태에서 아직 시험 요청이 없으면 요청 가능"""
+        state = self.circuit_state(now)
+        return state == "closed" or (state == "half_open" and not self.probe_in_flight)
+
+    def acquire(self, now: float) -> Optional[bool]:
+        """요청 직전 호출. 시험 요청이면 True, 일반 요청이면 False, 시험 요청이 이미 있으면 None"""
+        if self.circuit_state(now) != "half_open":
+            return False
+        if self.probe_in_flight:
+            return None
+        self.probe_in_flight = True
+        return True
+
+    def release_probe(self, _task=None):
+        self.probe_in_flight = False
+
+    def score(self) -> float:
+        """낮을수록 우선 (지연시간 × 실패율 가중)"""
+        latency = (
+            self.latency_ewma
+            if self.latency_ewma is not None
+            else DEFAULT_LATENCY_SECONDS
+        )
+        return latency * (1.0 + 4.0 * self.failure_ewma)
+
+    def p95_latency(self) -> Optional[float]:
+        if len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        return float(np.percentile(self.latencies, 95))
+
+    def record_success(self, latency: float):
+        self.successes += 1
+        self.latencies.append(latency)
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += EWMA_ALPHA * (latency - self.latency_ewma)
+        self.failure_ewma *= 1.0 - EWMA_ALPHA
+        if self.open_until:
+            logger.info(f"✅ OSRM 서버 복구: {self.url}")
+        self.consecutive_failures = 0
+        self.circuit_trips = 0
+        self.open_until = 0.0
+
+    def record_failure(self, now: float):
+        self.failures += 1
+        self.failure_ewma += EWMA_ALPHA * (1.0 - self.failure_ewma)
+        self.consecutive_failures += 1
+        # 반개방 상태의 시험 요청 실패 또는 연속 실패 누적 시 서킷 개방
+        if (
+            self.circuit_state(now) == "half_open"
+            or self.consecutive_failures >= CIRCUIT_FAILURE_THRESHOLD
+        ):
+            self.circuit_trips += 1
+            cooldown = min(
+                CIRCUIT_COOLDOWN_SECONDS * (2 ** (self.circuit_trips - 1)),
+                CIRCUIT_MAX_COOLDOWN_SECONDS,
+            )
+            self.open_until = now + cooldown
+            logger.warning(f"🚫 OSRM 서버 차단 ({cooldown:.0f}초): {self.url}")
+
+    def stats(self, now: float) -> Dict:
+        p95 = self.p95_latency()
+        return {
+            "url": self.url,
+            "circuit": self.circuit_state(now),
+            "latency_ewma_ms": (
+                round(self.latency_ewma * 1000, 1)
+                if self.latency_ewma is not None
+                else None
+            ),
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "probe_in_flight": self.probe_in_flight,
+            "failure_rate": round(self.failure_ewma, 3),
+            "successes": self.successes,
+            "failures": self.failures,
+        }
+
+
+class OSRMBackendPool:
+    """상태 점수 순으로 OSRM 서버를 선택하고 느린 요청은 다음 서버로 헤지
+
+    5xx/타임아웃/연결 오류만 서버 실패로 보며, 4xx(NoRoute 등)는 정상 응답으로 취급함
+    """
+
+    def __init__(self, urls: List[str] = OSRM_SERVERS):
+        self.backends = [OSRMBackend(url, i) for i, url in enumerate(urls)]
+        self.counters = {
+            "requests": 0,
+            "hedged": 0,
+            "secondary_wins": 0,
+            "exhausted": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self.backends)
+
+    @property
+    def primary_url(self) -> Optional[str]:
+        """다음 요청을 받을 서버 (사용 가능한 서버가 없으면 None)"""
+        candidates = self.ranked()
+        return candidates[0].url if candidates else None
+
+    def ranked(self) -> List[OSRMBackend]:
+        """요청 순서: 닫힘/시험 요청 전 반개방 서버 (점수순)
+
+        개방 서버와 시험 요청이 진행 중인 반개방 서버는 제외하므로, 모든 서버가
+        차단되면 빈 목록을 돌려주고 요청은 타임아웃을 기다리지 않고 바로 실패함
+        """
+        now = time.time()
+        available = [b for b in self.backends if b.is_available(now)]
+        available.sort(key=lambda b: (b.score(), b.order))
+        return available
+
+    def hedge_delay(self, backend: OSRMBackend) -> float:
+        p95 = backend.p95_latency()
+        if p95 is None:
+            return HEDGE_DEFAULT_SECONDS
+        return min(max(p95, HEDGE_MIN_SECONDS), HEDGE_MAX_SECONDS)
+
+    async def _attempt(
+        self,
+        backend: OSRMBackend,
+        session: aiohttp.ClientSession,
+        path: str,
+        params: Dict,
+        timeout: Optional[aiohttp.ClientTimeout],
+    ) -> Tuple[int, Dict]:
+        started = time.monotonic()
+        try:
+            async with session.get(
+                f"{backend.url}{path}", params=params, timeout=timeout
+            ) as response:
+                if response.status >= 500:
+                    raise aiohttp.ClientResponseError(
+                        response.request_info,
+                        response.history,
+                        status=response.status,
+                        message=f"HTTP {response.status}",
+                    )
+                data = await response.json(content_type=None)
+        except asyncio.CancelledError:
+            # 헤지 경쟁에서 진 요청은 실패로 기록하지 않음
+            raise
+        except Exception:
+            backend.record_failure(time.time())
+            raise
+        backend.record_success(time.monotonic() - started)
+        return response.status, data
+
+    async def get_json(
+        self,
+        session: aiohttp.ClientSession,
+        path: str,
+        params: Optional[Dict] = None,
+        timeout: Optional[aiohttp.ClientTimeout] = None,
+    ) -> Tuple[int, Dict, str]:
+        """(HTTP 상태, 응답 JSON, 응답한 서버) 반환
+
+        1순위 서버 응답이 p95 지연시간 안에 오지 않으면 다음 서버에도 같은 요청을
+        보내고 먼저 도착한 응답을 사용함. 실패한 요청은 즉시 다음 서버로 넘김
+        """
+        self.counters["requests"] += 1
+        candidates = self.ranked()
+        pending: Dict[asyncio.Task, OSRMBackend] = {}
+        errors = []
+        next_index = 0
+
+        def launch() -> Optional[OSRMBackend]:
+            """다음 후보 서버로 요청 시작 (다른 요청이 시험 중인 반개방 서버는 건너뜀)"""
+            nonlocal next_index
+            while next_index < len(candidates):
+                backend = candidates[next_index]
+                next_index += 1
+                probe = backend.acquire(time.time())
+                if probe is None:
+                    continue
+                task = asyncio.ensure_future(
+                    self._attempt(backend, session, path, params or {}, timeout)
+                )
+                if probe:
+                    # 시작 전에 취소된 경우도 포함해 작업이 끝나면 항상 해제
+                    task.add_done_callback(backend.release_probe)
+                pending[task] = backend
+                return backend
+            return None
+
+        last = launch()
+        try:
+            while pending:
+                deadline = (
+                    self.hedge_delay(last) if next_index < len(candidates) else None
+                )
+                done, _ = await asyncio.wait(
+                    pending, timeout=deadline, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    hedge = launch()
+                    if hedge is not None:
+                        self.counters["hedged"] += 1
+                        logger.info(
+                            f"⏱️ OSRM 응답 지연 ({deadline:.2f}초), {hedge.url}로 헤지 요청"
+                        )
+                        last = hedge
+                    continue
+
+                for task in done:
+                    backend = pending.pop(task)
+                    try:
+                        status, data = task.result()
+                    except Exception as e:
+                        reason = str(e) or type(e).__name__
+                        errors.append(f"{backend.url}: {reason}")
+                        logger.warning(f"⚠️ OSRM 서버 실패: {backend.url} - {reason}")
+                        continue
+                    if backend is not candidates[0]:
+                        self.counters["secondary_wins"] += 1
+                    return status, data, backend.url
+
+                # 실패한 요청은 다음 서버로 바로 대체
+                replacement = launch()
+                if replacement is not None:
+                    last = replacement
+        finally:
+            for task in pending:
+                task.cancel()
+
+        self.counters["exhausted"] += 1
+        raise OSRMUnavailableError("; ".join(errors) or "사용 가능한 OSRM 서버가 없습니다")
+
+    def stats(self) -> Dict:
+        now = time.time()
+        return {
+            **self.counters,
+            "backends": [b.stats(now) for b in self.backends],
+        }
+
+
+# 전역 인스턴스
+osrm_pool = OSRMBackendPool()
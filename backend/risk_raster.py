@@ -0,0 +1,189 @@
+# backend/risk_raster.py - 서울시 위험도 래스터 및 XYZ 타일
+
+import io
+import math
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from zone_index import ZoneSpatialIndex
+
+logger = logging.getLogger(__name__)
+
+# 공사장 데이터 로드와 동일한 서울 범위 (위도 37.3~37.8, 경도 126.7~127.3)
+SEOUL_BOUNDS = {"lat_min": 37.3, "lat_max": 37.8, "lng_min": 126.7, "lng_max": 127.3}
+
+DEFAULT_CELL_DEG = 0.001  # 약 110m(위도) x 90m(경도)
+TILE_SIZE = 256
+MAX_CACHED_TILES = 512
+
+# 위험도 점수에 영향을 주는 최대 거리 (km). 이보다 먼 셀은 지역 변경의 영향을 받지 않음
+INFLUENCE_RADIUS_KM = 2.0
+
+
+class RiskRaster:
+    """위험도 점수 래스터 (uint8, 0=영향권 밖, 255=위험도 1.0)"""
+
+    def __init__(
+        self,
+        score_fn: Callable[[np.ndarray, np.ndarray], np.ndarray],
+        cell_deg: float = DEFAULT_CELL_DEG,
+        bounds: Dict[str, float] = SEOUL_BOUNDS,
+    ):
+        self.score_fn = score_fn
+        self.cell_deg = cell_deg
+        self.bounds = dict(bounds)
+        self.rows = int(round((bounds["lat_max"] - bounds["lat_min"]) / cell_deg))
+        self.cols = int(round((bounds["lng_max"] - bounds["lng_min"]) / cell_deg))
+
+        # 0번 행이 북쪽 (이미지 좌표계와 동일)
+        self.cell_lats = bounds["lat_max"] - (np.arange(self.rows) + 0.5) * cell_deg
+        self.cell_lngs = bounds["lng_min"] + (np.arange(self.cols) + 0.5) * cell_deg
+
+        self.grid: Optional[np.ndarray] = None
+        self.etag: Optional[str] = None
+        self.generation = 0
+        self._tile_cache: "OrderedDict[Tuple[int, int, int, int], bytes]" = OrderedDict()
+
+    @property
+    def is_ready(self) -> bool:
+        return self.grid is not None
+
+    def _score_window(
+        self, index: ZoneSpatialIndex, rows: slice, cols: slice
+    ) -> np.ndarray:
+        """래스터 일부 구간의 위험도 계산"""
+        lats, lngs = np.meshgrid(self.cell_lats[rows], self.cell_lngs[cols], indexing="ij")
+        nearest, distances = index.nearest_many(lats, lngs)
+        if len(index):
+            risks = index.risk[nearest]
+        else:
+            risks = np.zeros(distances.shape)
+        scores = self.score_fn(distances, risks)
+        return np.clip(np.rint(scores * 255), 0, 255).astype(np.uint8)
+
+    def install(self, grid: np.ndarray):
+        """계산된 그리드로 교체하고 ETag/세대 갱신 및 타일 캐시 무효화
+
+        그리드와 ETag를 함께 바꾸므로 이벤트 루프에서 호출하면 요청 처리 중에
+        새 그리드와 이전 ETag가 섞여 보이지 않음
+        """
+        digest = hashlib.sha1(grid.tobytes()).hexdigest()[:16]
+        self.grid = grid
+        self.etag = f'"risk-{digest}"'
+        self.generation += 1
+        self._tile_cache.clear()
+        logger.info(
+            f"🗺️ 위험도 래스터 교체 완료: {self.rows}x{self.cols} 셀, ETag {self.etag}"
+        )
+
+    def compute_full(self, index: ZoneSpatialIndex) -> np.ndarray:
+        """전체 래스터 계산 (현재 그리드는 바꾸지 않음)"""
+        return self._score_window(index, slice(None), slice(None))
+
+    def compute_update(
+        self, index: ZoneSpatialIndex, changed_zones: List[Dict]
+    ) -> Optional[np.ndarray]:
+        """변경된 지역 주변 영향권만 다시 계산한 새 그리드 (증분 갱신, 변경이 없으면 None)
+
+        현재 그리드의 복사본에 계산하므로 install 전까지는 요청에 영향을 주지 않음
+        """
+        if not self.is_ready:
+            return self.compute_full(index)
+        if not changed_zones:
+            return None
+
+        grid = self.grid.copy()
+        lat_margin = INFLUENCE_RADIUS_KM / 110.574 + self.cell_deg
+        lng_margin = lat_margin / math.cos(math.radians(self.bounds["lat_max"]))
+
+        for zone in changed_zones:
+            row_start = self._row_of(zone["lat"] + lat_margin)
+            row_end = self._row_of(zone["lat"] - lat_margin) + 1
+            col_start = self._col_of(zone["lng"] - lng_margin)
+            col_end = self._col_of(zone["lng"] + lng_margin) + 1
+            if row_start >= row_end or col_start >= col_end:
+                continue
+
+            rows, cols = slice(row_start, row_end), slice(col_start, col_end)
+            grid[rows, cols] = self._score_window(index, rows, cols)
+
+        logger.info(f"🗺️ 위험도 래스터 증분 계산: {len(changed_zones)}개 지역 변경")
+        return grid
+
+    def _row_of(self, lat: float) -> int:
+        row = int((self.bounds["lat_max"] - lat) / self.cell_deg)
+        return min(max(row, 0), self.rows)
+
+    def _col_of(self, lng: float) -> int:
+        col = int((lng - self.bounds["lng_min"]) / self.cell_deg)
+        return min(max(col, 0), self.cols)
+
+    def metadata(self) -> Dict:
+        """래스터 메타데이터 (바이너리 그리드 해석용)"""
+        return {
+            "rows": self.rows,
+            "cols": self.cols,
+            "cell_deg": self.cell_deg,
+            "bounds": self.bounds,
+            "dtype": "uint8",
+            "scale": 255,
+            "generation": self.generation,
+        }
+
+    def to_bytes(self) -> bytes:
+        """행 우선(북→남) uint8 그리드 바이트"""
+        return self.grid.tobytes()
+
+    def tile_png(self, z: int, x: int, y: int) -> bytes:
+        """Web Mercator XYZ 타일(256px PNG) 렌더링 (LRU 캐시)"""
+        # 세대를 키에 포함해 갱신 중 렌더링된 이전 그리드 타일이 섞이지 않게 함
+        grid, generation = self.grid, self.generation
+        key = (generation, z, x, y)
+        cached = self._tile_cache.get(key)
+        if cached is not None:
+            self._tile_cache.move_to_end(key)
+            return cached
+
+        # 타일 픽셀 중심의 위경도 계산
+        n = 2 ** z
+        offsets = (np.arange(TILE_SIZE) + 0.5) / TILE_SIZE
+        lngs = (x + offsets) / n * 360.0 - 180.0
+        lats = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + offsets) / n))))
+
+        rows = np.floor((self.bounds["lat_max"] - lats) / self.cell_deg).astype(np.intp)
+        cols = np.floor((lngs - self.bounds["lng_min"]) / self.cell_deg).astype(np.intp)
+        row_valid = (rows >= 0) & (rows < self.rows)
+        col_valid = (cols >= 0) & (cols < self.cols)
+
+        values = grid[
+            np.clip(rows, 0, self.rows - 1)[:, None],
+            np.clip(cols, 0, self.cols - 1)[None, :],
+        ]
+        values = np.where(row_valid[:, None] & col_valid[None, :], values, 0)
+
+        png = _render_png(values)
+        self._tile_cache[key] = png
+        if len(self._tile_cache) > MAX_CACHED_TILES:
+            self._tile_cache.popitem(last=False)
+        return png
+
+    def tile_etag(self, z: int, x: int, y: int) -> str:
+        return f'{self.etag[:-1]}-{z}-{x}-{y}"'
+
+
+def _render_png(values: np.ndarray) -> bytes:
+    """위험도(uint8)를 녹색→노랑→빨강 반투명 PNG로 변환"""
+    score = values.astype(np.float32) / 255.0
+    rgba = np.zeros(values.shape + (4,), dtype=np.uint8)
+    rgba[..., 0] = np.clip(score * 2, 0, 1) * 255
+    rgba[..., 1] = np.clip((1 - score) * 2, 0, 1) * 255
+    rgba[..., 3] = np.where(values > 0, 60 + score * 140, 0)
+
+    buffer = io.BytesIO()
+    Image.fromarray(rgba, "RGBA").save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
@@ -0,0 +1,199 @@
+# backend/route_cache.py - OSRM 경로 결과 캐시 (LRU + 선택적 SQLite, stale-while-revalidate)
+
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 좌표 스냅 자릿수 (소수 4자리 ≈ 11m). 이 범위 안의 출발/도착지는 같은 경로를 재사용
+ROUTE_SNAP_DECIMALS = int(os.getenv("ROUTE_SNAP_DECIMALS", "4"))
+ROUTE_CACHE_MAX_ENTRIES = int(os.getenv("ROUTE_CACHE_MAX_ENTRIES", "1024"))
+# 이 시간 동안은 그대로 사용
+ROUTE_CACHE_FRESH_SECONDS = float(os.getenv("ROUTE_CACHE_FRESH_SECONDS", "600"))
+# 신선 기간이 지나도 이 시간까지는 즉시 응답하고 백그라운드에서 갱신
+ROUTE_CACHE_STALE_SECONDS = float(os.getenv("ROUTE_CACHE_STALE_SECONDS", "86400"))
+# 설정 시 디스크 캐시 사용 (예: route_cache.db)
+ROUTE_CACHE_PATH = os.getenv("ROUTE_CACHE_PATH", "")
+
+RouteFetcher = Callable[[], Awaitable[Dict]]
+
+
+def snap_coordinate(value: float) -> str:
+    return f"{round(value, ROUTE_SNAP_DECIMALS):.{ROUTE_SNAP_DECIMALS}f}"
+
+
+class RouteCache:
+    """경로 결과 캐시
+
+    키는 스냅된 출발/도착 좌표와 호출자가 넣는 추가 구분값(위험지역 세대 등)으로 구성.
+    성공한 경로만 저장하며, 신선 기간이 지난 항목은 바로 돌려준 뒤 백그라운드에서 갱신함
+    """
+
+    def __init__(
+        self,
+        max_entries: int = ROUTE_CACHE_MAX_ENTRIES,
+        fresh_seconds: float = ROUTE_CACHE_FRESH_SECONDS,
+        stale_seconds: float = ROUTE_CACHE_STALE_SECONDS,
+        path: str = ROUTE_CACHE_PATH,
+    ):
+        self.max_entries = max_entries
+        self.fresh_seconds = fresh_seconds
+        self.stale_seconds = stale_seconds
+        self.path = path
+        self._memory: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.counters = {
+            "fresh_hits": 0,
+            "stale_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+        }
+
+    @staticmethod
+    def make_key(
+        kind: str,
+        start_lat: float,
+        start_lng: float,
+        end_lat: float,
+        end_lng: float,
+        *extra,
+    ) -> str:
+        parts = [
+            kind,
+            snap_coordinate(start_lat),
+            snap_coordinate(start_lng),
+            snap_coordinate(end_lat),
+            snap_coordinate(end_lng),
+        ]
+        parts.extend(str(value) for value in extra)
+        return "|".join(parts)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS route_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+        return self._conn
+
+    def _disk_get(self, key: str) -> Optional[Tuple[float, Dict]]:
+        with self._lock:
+            row = (
+                self._connect()
+                .execute("SELECT value, stored_at FROM route_cache WHERE key = ?", (key,))
+                .fetchone()
+            )
+        if row is None:
+            return None
+        return row[1], json.loads(row[0])
+
+    def _disk_set(self, key: str, stored_at: float, value: Dict):
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO route_cache (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), stored_at),
+            )
+            conn.commit()
+
+    def _remember(self, key: str, stored_at: float, value: Dict):
+        self._memory[key] = (stored_at, value)
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def _lookup(self, key: str) -> Optional[Tuple[float, Dict]]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            return entry
+        if not self.path:
+            return None
+        try:
+            entry = await asyncio.to_thread(self._disk_get, key)
+        except Exception as e:
+            logger.warning(f"⚠️ 경로 캐시 조회 실패: {e}")
+            return None
+        if entry is not None:
+            self.counters["disk_hits"] += 1
+            self._remember(key, *entry)
+        return entry
+
+    async def _store(self, key: str, value: Dict):
+        stored_at = time.time()
+        self._remember(key, stored_at, value)
+        if self.path:
+            try:
+                await asyncio.to_thread(self._disk_set, key, stored_at, value)
+            except Exception as e:
+                logger.warning(f"⚠️ 경로 캐시 저장 실패: {e}")
+
+    async def _fetch_and_store(self, key: str, fetch: RouteFetcher) -> Dict:
+        result = await fetch()
+        if result and result.get("success"):
+            await self._store(key, result)
+        return result
+
+    def _refresh_in_background(self, key: str, fetch: RouteFetcher):
+        if key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                await self._fetch_and_store(key, fetch)
+                self.counters["refreshes"] += 1
+            except Exception as e:
+                logger.warning(f"⚠️ 경로 캐시 갱신 실패: {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(refresh())
+
+    async def get_or_fetch(self, key: str, fetch: RouteFetcher) -> Dict:
+        """캐시된 경로 반환, 없으면 fetch() 호출 후 성공 결과 저장"""
+        entry = await self._lookup(key)
+        if entry is not None:
+            stored_at, value = entry
+            age = time.time() - stored_at
+            if age < self.fresh_seconds:
+                self.counters["fresh_hits"] += 1
+                return dict(value)
+            if age < self.stale_seconds:
+                self.counters["stale_hits"] += 1
+                self._refresh_in_background(key, fetch)
+                return dict(value)
+
+        self.counters["misses"] += 1
+        return await self._fetch_and_store(key, fetch)
+
+    def stats(self) -> Dict:
+        return {
+            **self.counters,
+            "memory_entries": len(self._memory),
+            "disk_enabled": bool(self.path),
+        }
+
+    async def close(self):
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# 전역 인스턴스
+route_cache = RouteCache()
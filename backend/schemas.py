@@ -44,6 +44,22 @@ class RiskResponse(BaseModel):
     risk_level: str
     message: str
 
+class BatchRiskRequest(BaseModel):
+    """다중 지점 위험도 요청 (컬럼 형식)"""
+    latitudes: List[float]
+    longitudes: List[float]
+
+class RiskLevelInfo(BaseModel):
+    level: str
+    message: str
+
+class BatchRiskResponse(BaseModel):
+    """다중 지점 위험도 응답 (컬럼 형식, 레벨은 levels 테이블의 인덱스)"""
+    count: int
+    risk_scores: List[float]
+    risk_level_codes: List[int]
+    levels: List[RiskLevelInfo]
+
 class RouteRequest(BaseModel):
     start_latitude: float
     start_longitude: float
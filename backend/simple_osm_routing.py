@@ -1,281 +1,149 @@
 # simple_osm_routing.py - 공간 인덱스 및 캐싱으로 최적화된 버전
 
-import psycopg2
-import networkx as nx
 import math
-import pickle
 import os
 import time
 from typing import List, Dict, Tuple, Optional
 from geopy.distance import geodesic
-from scipy.spatial import KDTree
+from scipy.spatial import cKDTree
 import logging
-import json
-from functools import lru_cache
 import hashlib
+import numpy as np
+
+from zone_index import haversine_km, project_to_plane
+from walk_graph import HIGHWAY_CLASSES, CSRGraph, GraphBuilder
+from contraction_hierarchy import ContractionHierarchy
+from graph_store import load_arrays
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 그래프 파일 형식 버전 (pickle로 저장하던 2.x 이전 캐시는 사용하지 않음)
+CACHE_VERSION = '3.0'
+# 그래프 + KD-트리 + CH를 담은 단일 바이너리 파일 (build_walk_graph.py로 미리 생성)
+NETWORK_CACHE_FILE = 'walk_network.bin'
+
+# 적재할 도로 종류별 가중치 배율 (가중치 = 거리 × 배율)
+HIGHWAY_WEIGHTS = {
+    'footway': 1.0,
+    'pedestrian': 1.0,
+    'path': 1.1,
+    'cycleway': 1.2,
+    'residential': 1.5
+}
+# 적재 범위 (경도/위도 최소, 최대)
+NETWORK_BBOX = (126.7, 37.4, 127.2, 37.7)
+
+# 위험지역 근접 가중치: 반경 안의 엣지는 weight * (1 + 배율 * 위험도 * 근접도)
+RISK_PENALTY_RADIUS_KM = 0.5
+RISK_PENALTY_SCALE = 5.0
+# 엣지 중점 KD-트리 후보 검색 반경에 더할 최대 반 길이 (km). 이보다 긴 엣지는 따로 검색
+EDGE_TREE_MAX_HALF_KM = 0.1
+
+# 예상 소요시간 계산용 보행 속도
+WALKING_SPEED_KMH = 4.0
+# 방향 변화가 이 각도 이상이면 회전 안내, 유턴 기준 각도
+TURN_ANGLE_DEG = 30.0
+UTURN_ANGLE_DEG = 150.0
+# 안내 문구에 쓰는 도로 종류 이름
+HIGHWAY_LABELS = {
+    'footway': '보도',
+    'pedestrian': '보행자 도로',
+    'path': '산책로',
+    'steps': '계단',
+    'cycleway': '자전거 도로',
+    'residential': '주택가 도로',
+    'service': '진입로',
+    'living_street': '생활 도로',
+    'tertiary': '도로',
+    'secondary': '도로',
+    'primary': '큰길',
+}
+
+
+def default_network_path(cache_dir: str = "cache") -> str:
+    """서빙에서 읽을 그래프 파일 경로 (WALK_GRAPH_PATH 환경변수 우선)"""
+    return os.getenv("WALK_GRAPH_PATH") or os.path.join(cache_dir, NETWORK_CACHE_FILE)
+
 class OptimizedOSMRouter:
-    def __init__(self, database_url: str, cache_dir: str = "cache"):
-        self.database_url = database_url
+    def __init__(self, cache_dir: str = "cache"):
+        """빌드된 그래프 파일(WALK_GRAPH_PATH 또는 cache_dir/walk_network.bin)만 로드하며 DB에는 연결하지 않음"""
         self.cache_dir = cache_dir
-        self.graph = nx.Graph()
-        
-        # 공간 인덱스를 위한 데이터 구조
-        self.node_coordinates = []  # [(lat, lng), ...]
-        self.node_ids = []          # [node_id, ...]
-        self.spatial_index = None   # KDTree
+        # CSR 그래프 (노드는 int32 번호, 공간 인덱스는 그래프가 보관)
+        self.graph = CSRGraph.empty()
         
         # 캐시 관련
         self.route_cache = {}       # 경로 캐시
         self.max_cache_size = 1000  # 최대 캐시 항목 수
         
-        # 캐시 디렉토리 생성
-        os.makedirs(cache_dir, exist_ok=True)
+        # 실제 OSM 데이터 여부 (대체 네트워크면 False)
+        self.is_osm_network = False
+        # 그래프 파일 메타데이터 (빌드 시각, 입력, 적재 통계)
+        self.metadata = {}
+        # 무방향 엣지별 위험 가중치 배율 (통째로 교체)
+        self.edge_penalty = np.ones(0)
+        # 기본 가중치 최단경로용 축약 계층 (그래프 파일에 포함)
+        self.ch = None
+        self.network_path = default_network_path(cache_dir)
         
-        try:
-            # 캐시된 네트워크 로드 시도
-            if self._load_cached_network():
-                logger.info("캐시된 네트워크 로드 성공")
-            else:
-                # 새로 네트워크 구축
-                self.conn = psycopg2.connect(
-                    host='192.168.165.133',
-                    port=5432,
-                    database='seoul_gis',
-                    user='postgres',
-                    password='sesacmicro31#!'
-                )
-                logger.info("직접 PostgreSQL 연결 성공")
-                self._load_and_cache_network()
-                
-        except Exception as e:
-            logger.error(f"연결 실패: {e}")
+        # 서빙 중에는 네트워크를 구축하지 않음: 빌드된 파일이 없으면 대체 네트워크 사용
+        if self._load_network_file():
+            logger.info("그래프 파일 로드 성공")
+        else:
+            logger.warning("그래프 파일이 없어 대체 네트워크 사용 (build_walk_graph.py로 생성)")
             self._create_fallback_network()
+        
+        self._index_edges()
     
-    def _get_cache_path(self, filename):
-        """캐시 파일 경로 생성"""
-        return os.path.join(self.cache_dir, filename)
-    
-    def _load_cached_network(self):
-        """캐시된 네트워크 로드"""
+    def _load_network_file(self):
+        """빌드된 그래프 파일 로드 (배열은 memmap 뷰로 사용하므로 복사/재구성 없음)"""
         try:
-            cache_files = {
-                'graph': self._get_cache_path('graph.pkl'),
-                'spatial': self._get_cache_path('spatial_index.pkl'),
-                'metadata': self._get_cache_path('metadata.json')
-            }
-            
-            # 모든 캐시 파일이 존재하는지 확인
-            if not all(os.path.exists(f) for f in cache_files.values()):
-                logger.info("일부 캐시 파일이 없음")
+            if not os.path.exists(self.network_path):
+                logger.info(f"그래프 파일이 없음: {self.network_path}")
                 return False
             
-            logger.info("캐시된 네트워크 로드 중...")
+            logger.info(f"그래프 파일 로드 중: {self.network_path}")
             start_time = time.time()
             
-            # 메타데이터 확인
-            with open(cache_files['metadata'], 'r') as f:
-                metadata = json.load(f)
+            arrays, metadata = load_arrays(self.network_path)
             
-            cache_age_days = (time.time() - metadata['created_time']) / (24 * 3600)
-            if cache_age_days > 7:  # 7일 이상 오래된 캐시는 무시
-                logger.info(f"캐시가 오래됨 ({cache_age_days:.1f}일)")
+            # 메타데이터 확인
+            if metadata.get('version') != CACHE_VERSION:
+                logger.warning(f"그래프 파일 형식이 다름 ({metadata.get('version')}), 다시 빌드 필요")
                 return False
             
-            # 그래프 로드
-            with open(cache_files['graph'], 'rb') as f:
-                self.graph = pickle.load(f)
-            
-            # 공간 인덱스 로드
-            with open(cache_files['spatial'], 'rb') as f:
-                spatial_data = pickle.load(f)
-                self.node_coordinates = spatial_data['coordinates']
-                self.node_ids = spatial_data['node_ids']
-                self.spatial_index = KDTree(self.node_coordinates)
+            # 그래프 + KD-트리, 축약 계층
+            self.graph = CSRGraph.from_arrays(arrays)
+            self.ch = ContractionHierarchy.from_arrays(arrays)
             
+            self.is_osm_network = metadata.get('source', 'osm') == 'osm'
+            self.metadata = metadata
             load_time = time.time() - start_time
-            logger.info(f"캐시 로드 완료: {load_time:.2f}초, "
-                       f"{self.graph.number_of_nodes():,}개 노드, "
-                       f"{self.graph.number_of_edges():,}개 엣지")
+            logger.info(f"그래프 파일 로드 완료: {load_time:.2f}초, "
+                       f"{self.graph.node_count:,}개 노드, "
+                       f"{self.graph.edge_count:,}개 엣지, "
+                       f"빌드 {time.strftime('%Y-%m-%d %H:%M', time.localtime(metadata['created_time']))}")
             return True
             
         except Exception as e:
-            logger.warning(f"캐시 로드 실패: {e}")
+            logger.warning(f"그래프 파일 로드 실패: {e}")
             return False
     
-    def _save_network_cache(self):
-        """네트워크를 캐시에 저장"""
-        try:
-            logger.info("네트워크 캐시 저장 중...")
-            start_time = time.time()
-            
-            # 그래프 저장
-            with open(self._get_cache_path('graph.pkl'), 'wb') as f:
-                pickle.dump(self.graph, f)
-            
-            # 공간 인덱스 저장
-            spatial_data = {
-                'coordinates': self.node_coordinates,
-                'node_ids': self.node_ids
-            }
-            with open(self._get_cache_path('spatial_index.pkl'), 'wb') as f:
-                pickle.dump(spatial_data, f)
-            
-            # 메타데이터 저장
-            metadata = {
-                'created_time': time.time(),
-                'node_count': self.graph.number_of_nodes(),
-                'edge_count': self.graph.number_of_edges(),
-                'version': '1.0'
-            }
-            with open(self._get_cache_path('metadata.json'), 'w') as f:
-                json.dump(metadata, f)
-            
-            save_time = time.time() - start_time
-            logger.info(f"캐시 저장 완료: {save_time:.2f}초")
-            
-        except Exception as e:
-            logger.error(f"캐시 저장 실패: {e}")
-    
-    def _load_and_cache_network(self):
-        """네트워크 로드 및 캐시"""
-        logger.info("새 네트워크 구축 시작...")
-        start_time = time.time()
-        
-        self._load_optimized_network()
-        self._build_spatial_index()
-        self._save_network_cache()
-        
-        total_time = time.time() - start_time
-        logger.info(f"네트워크 구축 완료: {total_time:.2f}초")
-    
-    def _load_optimized_network(self):
-        """최적화된 네트워크 로드"""
-        try:
-            cursor = self.conn.cursor()
-            
-            # 더 큰 영역으로 확장 + 배치 처리
-            logger.info("최적화된 OSM 데이터 로드...")
-            
-            # footway + residential + pedestrian 한번에 로드
-            cursor.execute("""
-                SELECT 
-                    osm_id,
-                    highway,
-                    name,
-                    ST_AsGeoJSON(ST_Transform(way, 4326)) as geometry
-                FROM planet_osm_line 
-                WHERE highway IN ('footway', 'residential', 'pedestrian', 'path', 'cycleway')
-                  AND way && ST_Transform(ST_MakeEnvelope(126.7, 37.4, 127.2, 37.7, 4326), 3857)
-                LIMIT 5000;
-            """)
-            
-            results = cursor.fetchall()
-            logger.info(f"총 {len(results)}개 도로 세그먼트 로드")
-            
-            # 배치 처리로 노드 및 엣지 생성
-            node_batch = {}
-            edge_batch = []
-            
-            for row in results:
-                try:
-                    osm_id, highway, name, geometry = row
-                    if geometry:
-                        geom = json.loads(geometry)
-                        if geom['type'] == 'LineString':
-                            coords = geom['coordinates']
-                            
-                            # 가중치 설정
-                            weight_multiplier = {
-                                'footway': 1.0,
-                                'pedestrian': 1.0,
-                                'path': 1.1,
-                                'cycleway': 1.2,
-                                'residential': 1.5
-                            }.get(highway, 1.3)
-                            
-                            for i in range(len(coords) - 1):
-                                start_lat, start_lng = coords[i][1], coords[i][0]
-                                end_lat, end_lng = coords[i+1][1], coords[i+1][0]
-                                
-                                start_node = f"{start_lat:.5f},{start_lng:.5f}"
-                                end_node = f"{end_lat:.5f},{end_lng:.5f}"
-                                
-                                distance = geodesic((start_lat, start_lng), (end_lat, end_lng)).meters
-                                
-                                if distance > 1:  # 1미터 이상만
-                                    # 노드 정보 저장
-                                    node_batch[start_node] = (start_lat, start_lng)
-                                    node_batch[end_node] = (end_lat, end_lng)
-                                    
-                                    # 엣지 정보 저장
-                                    edge_batch.append({
-                                        'start': start_node,
-                                        'end': end_node,
-                                        'weight': distance * weight_multiplier,
-                                        'highway_type': highway,
-                                        'distance': distance
-                                    })
-                
-                except Exception as e:
-                    logger.warning(f"데이터 처리 실패: {e}")
-                    continue
-            
-            # 배치로 그래프에 추가
-            logger.info(f"그래프 구축: {len(node_batch)}개 노드, {len(edge_batch)}개 엣지")
-            
-            # 노드 추가
-            for node_id, (lat, lng) in node_batch.items():
-                self.graph.add_node(node_id, lat=lat, lng=lng)
-            
-            # 엣지 추가
-            for edge in edge_batch:
-                self.graph.add_edge(
-                    edge['start'], edge['end'],
-                    weight=edge['weight'],
-                    highway_type=edge['highway_type'],
-                    distance=edge['distance']
-                )
-            
-            cursor.close()
-            
-            if self.graph.number_of_nodes() > 0:
-                logger.info(f"최적화된 OSM 네트워크 로드 완료: {self.graph.number_of_nodes():,}개 노드, {self.graph.number_of_edges():,}개 엣지")
-            else:
-                logger.warning("OSM 데이터 로드 실패, 대체 네트워크 생성")
-                self._create_fallback_network()
-                
-        except Exception as e:
-            logger.error(f"네트워크 로딩 실패: {e}")
-            self._create_fallback_network()
-    
     def _build_spatial_index(self):
-        """공간 인덱스 구축"""
-        logger.info("공간 인덱스 구축 중...")
-        start_time = time.time()
-        
-        self.node_coordinates = []
-        self.node_ids = []
-        
-        for node_id in self.graph.nodes():
-            node_data = self.graph.nodes[node_id]
-            if 'lat' in node_data and 'lng' in node_data:
-                self.node_coordinates.append([node_data['lat'], node_data['lng']])
-                self.node_ids.append(node_id)
-        
-        if self.node_coordinates:
-            self.spatial_index = KDTree(self.node_coordinates)
-            build_time = time.time() - start_time
-            logger.info(f"공간 인덱스 구축 완료: {len(self.node_coordinates):,}개 노드, {build_time:.2f}초")
-        else:
+        """공간 인덱스 구축 (그래프 노드 좌표의 평면 투영 KD-트리)"""
+        if self.graph.node_count == 0:
             logger.warning("공간 인덱스 구축 실패: 노드가 없음")
+            return
+        
+        start_time = time.time()
+        self.graph.tree  # 지연 생성되는 KD-트리를 미리 구성
+        build_time = time.time() - start_time
+        logger.info(f"공간 인덱스 구축 완료: {self.graph.node_count:,}개 노드, {build_time:.2f}초")
     
     def _create_fallback_network(self):
         """대체 네트워크 - 더 조밀하게"""
         logger.info("대체 네트워크 생성...")
+        self.is_osm_network = False
         
         # 서울 주요 지역 확장
         major_points = [
@@ -313,82 +181,194 @@ class OptimizedOSMRouter:
                         major_points.append((lat, lng, f"격자_{lat:.3f}_{lng:.3f}"))
         
         # 노드 추가
-        for i, (lat, lng, name) in enumerate(major_points):
-            node_id = f"fallback_{i}"
-            self.graph.add_node(node_id, lat=lat, lng=lng, name=name)
-        
-        # 효율적인 연결 (가까운 노드들끼리만)
-        nodes = list(self.graph.nodes())
-        for i, node1 in enumerate(nodes):
-            lat1 = self.graph.nodes[node1]['lat']
-            lng1 = self.graph.nodes[node1]['lng']
-            
-            for j in range(i + 1, len(nodes)):
-                node2 = nodes[j]
-                lat2 = self.graph.nodes[node2]['lat']
-                lng2 = self.graph.nodes[node2]['lng']
-                
-                distance = geodesic((lat1, lng1), (lat2, lng2)).meters
-                
-                # 거리별 연결 전략
-                if distance <= 500:      # 500m 이내는 직접 연결
-                    self.graph.add_edge(node1, node2, weight=distance, highway_type='fallback')
-                elif distance <= 1500:   # 1.5km 이내는 가중치 증가
-                    self.graph.add_edge(node1, node2, weight=distance * 1.2, highway_type='fallback')
+        builder = GraphBuilder()
+        nodes = np.array([builder.add_node(lat, lng) for lat, lng, name in major_points])
+        lat = np.array([p[0] for p in major_points])
+        lng = np.array([p[1] for p in major_points])
+        
+        # 효율적인 연결 (1.5km 이내 노드 쌍만 KD-트리로 조회)
+        pairs = cKDTree(project_to_plane(lat, lng)).query_pairs(1.6, output_type='ndarray')
+        i, j = pairs[:, 0], pairs[:, 1]
+        distance = haversine_km(lat[i], lng[i], lat[j], lng[j]) * 1000.0
+        
+        # 거리별 연결 전략: 500m 이내는 직접 연결, 1.5km 이내는 가중치 증가
+        linked = distance <= 1500
+        i, j, distance = i[linked], j[linked], distance[linked]
+        weight = np.where(distance <= 500, distance, distance * 1.2)
+        builder.add_edges(nodes[i], nodes[j], weight, distance, 'fallback')
         
+        self.graph = builder.build()
         self._build_spatial_index()
-        logger.info(f"대체 네트워크 완료: {self.graph.number_of_nodes():,}개 노드, {self.graph.number_of_edges():,}개 엣지")
+        logger.info(f"대체 네트워크 완료: {self.graph.node_count:,}개 노드, {self.graph.edge_count:,}개 엣지")
     
-    def _find_nearest_node_fast(self, target_lat, target_lng, k=5):
-        """공간 인덱스를 사용한 빠른 최근접 노드 찾기"""
-        if not self.spatial_index:
-            return self._find_nearest_node_slow(target_lat, target_lng)
-        
-        try:
-            # KDTree로 k개의 가장 가까운 노드 찾기
-            distances, indices = self.spatial_index.query([target_lat, target_lng], k=k)
-            
-            # 스칼라인 경우 리스트로 변환
-            if not hasattr(distances, '__len__'):
-                distances = [distances]
-                indices = [indices]
-            
-            # 가장 가까운 유효한 노드 반환
-            for dist_deg, idx in zip(distances, indices):
-                if idx < len(self.node_ids):
-                    node_id = self.node_ids[idx]
-                    # 거리를 미터로 변환 (대략적)
-                    dist_meters = dist_deg * 111000  # 1도 ≈ 111km
-                    
-                    if dist_meters <= 3000:  # 3km 이내
-                        logger.debug(f"빠른 노드 찾기: {node_id}, 거리: {dist_meters:.0f}m")
-                        return node_id
-            
+    def _find_nearest_node_fast(self, target_lat, target_lng, max_distance=3000):
+        """공간 인덱스를 사용한 빠른 최근접 노드 찾기 (3km 이내, 없으면 None)"""
+        node = self.graph.nearest_node(target_lat, target_lng, max_distance)
+        if node is None:
             logger.warning("공간 인덱스에서 가까운 노드를 찾지 못함")
+        return node
+    
+    def _index_edges(self):
+        """엣지 수에 맞춰 위험 가중치 배율 초기화"""
+        self.edge_penalty = np.ones(self.graph.edge_count)
+        # 엣지 중점 KD-트리 (위험 가중치 후보 검색용, 처음 사용할 때 그래프당 한 번 구축)
+        self._edge_index = None
+    
+    def _edge_midpoint_index(self):
+        """(짧은 엣지 번호, 중점 KD-트리, 최대 반 길이, 긴 엣지 번호, 긴 엣지 중점, 긴 엣지 반 길이)"""
+        if self._edge_index is None:
+            graph = self.graph
+            starts = graph.xy[graph.edge_u]
+            ends = graph.xy[graph.edge_v]
+            midpoints = (starts + ends) / 2
+            half_lengths = np.linalg.norm(ends - starts, axis=1) / 2
+            short = half_lengths <= EDGE_TREE_MAX_HALF_KM
+            short_ids = np.flatnonzero(short)
+            long_ids = np.flatnonzero(~short)
+            self._edge_index = (
+                short_ids,
+                cKDTree(midpoints[short_ids]) if short_ids.size else None,
+                float(half_lengths[short_ids].max()) if short_ids.size else 0.0,
+                long_ids,
+                midpoints[long_ids],
+                half_lengths[long_ids],
+            )
+        return self._edge_index
+    
+    def compute_risk_penalties(self, zone_lat, zone_lng, zone_risk):
+        """위험지역 근접도에 따른 엣지별 가중치 배율 계산 (엣지 선분과 지역 중심 거리 기준)
+        
+        엣지 중점 KD-트리로 (반경 + 반 길이) 안의 후보 엣지만 골라 정확한 점-선분 거리를 계산
+        """
+        zone_lat = np.asarray(zone_lat, dtype=np.float64).ravel()
+        zone_lng = np.asarray(zone_lng, dtype=np.float64).ravel()
+        zone_risk = np.asarray(zone_risk, dtype=np.float64).ravel()
+        
+        graph = self.graph
+        proximity = np.zeros(graph.edge_count)
+        if graph.edge_count == 0 or zone_lat.size == 0:
+            return 1.0 + proximity
+        
+        centers = project_to_plane(zone_lat, zone_lng).reshape(-1, 2)
+        short_ids, short_tree, max_half, long_ids, long_midpoints, long_halves = self._edge_midpoint_index()
+        
+        # 지역 x 후보 엣지 쌍 수집
+        zone_parts, edge_parts = [], []
+        if short_tree is not None:
+            groups = short_tree.query_ball_point(centers, r=RISK_PENALTY_RADIUS_KM + max_half)
+            counts = np.fromiter((len(g) for g in groups), dtype=np.int64, count=len(groups))
+            zone_parts.append(np.repeat(np.arange(len(centers)), counts))
+            edge_parts.append(short_ids[np.fromiter(
+                (i for g in groups for i in g), dtype=np.int64, count=int(counts.sum())
+            )])
+        if long_ids.size:
+            # 긴 엣지는 엣지별 반경으로 지역 KD-트리에서 검색
+            groups = cKDTree(centers).query_ball_point(
+                long_midpoints, r=RISK_PENALTY_RADIUS_KM + long_halves
+            )
+            counts = np.fromiter((len(g) for g in groups), dtype=np.int64, count=len(groups))
+            edge_parts.append(np.repeat(long_ids, counts))
+            zone_parts.append(np.fromiter(
+                (i for g in groups for i in g), dtype=np.int64, count=int(counts.sum())
+            ))
+        zone_idx = np.concatenate(zone_parts)
+        edge_idx = np.concatenate(edge_parts)
+        if edge_idx.size == 0:
+            return 1.0 + proximity
+        
+        starts = graph.xy[graph.edge_u[edge_idx]]
+        deltas = graph.xy[graph.edge_v[edge_idx]] - starts
+        lengths_sq = np.einsum("ij,ij->i", deltas, deltas)
+        offsets = centers[zone_idx] - starts
+        t = np.einsum("ij,ij->i", offsets, deltas) / np.where(lengths_sq > 0, lengths_sq, 1.0)
+        t = np.clip(t, 0.0, 1.0)
+        distances = np.linalg.norm(offsets - t[:, None] * deltas, axis=1)
+        closeness = np.clip(1.0 - distances / RISK_PENALTY_RADIUS_KM, 0.0, 1.0)
+        np.maximum.at(proximity, edge_idx, zone_risk[zone_idx] * closeness)
+        
+        return 1.0 + RISK_PENALTY_SCALE * proximity
+    
+    def apply_risk_penalties(self, zone_lat, zone_lng, zone_risk):
+        """위험 가중치 배율 재계산 후 교체"""
+        self.edge_penalty = self.compute_risk_penalties(zone_lat, zone_lng, zone_risk)
+        logger.info(f"위험 가중치 적용: {int((self.edge_penalty > 1.0).sum()):,}개 엣지")
+    
+    def find_route(self, start_lat, start_lng, end_lat, end_lng, risk_weighted=False):
+        """최단 경로 (waypoints [[위도, 경도], ...], 거리 m, 소요시간 초, 단계별 안내) 반환
+        
+        경로가 없으면 None.
+        risk_weighted=True이면 위험 가중치 배율을 곱한 가중치로 탐색
+        """
+        start_node = self._find_nearest_node_fast(start_lat, start_lng)
+        end_node = self._find_nearest_node_fast(end_lat, end_lng)
+        if start_node is None or end_node is None:
             return None
-            
-        except Exception as e:
-            logger.warning(f"공간 인덱스 검색 실패: {e}, 느린 검색으로 대체")
-            return self._find_nearest_node_slow(target_lat, target_lng)
+        
+        # 위험 가중치 배율은 CH 전처리 이후 바뀌므로 A*로 탐색
+        if risk_weighted:
+            path, _ = self.graph.shortest_path(start_node, end_node, edge_multiplier=self.edge_penalty)
+        else:
+            path = self._shortest_path(start_node, end_node)
+        if path is None:
+            return None
+        
+        waypoints = [[start_lat, start_lng]]
+        waypoints += [[float(self.graph.lat[n]), float(self.graph.lng[n])] for n in path]
+        waypoints.append([end_lat, end_lng])
+        
+        start_offset = geodesic(waypoints[0], waypoints[1]).meters
+        end_offset = geodesic(waypoints[-2], waypoints[-1]).meters
+        distance = start_offset + end_offset + self.graph.path_distance(path)
+        
+        return {
+            "waypoints": waypoints,
+            "distance": distance,
+            "duration": distance / (WALKING_SPEED_KMH / 3.6),
+            "steps": self._route_steps(path, start_offset, end_offset)
+        }
     
-    def _find_nearest_node_slow(self, target_lat, target_lng, max_distance=3000):
-        """기존 방식의 느린 최근접 노드 찾기 (백업용)"""
-        min_distance = float('inf')
-        nearest_node = None
-        
-        for node_id in self.graph.nodes():
-            node_data = self.graph.nodes[node_id]
-            if 'lat' in node_data and 'lng' in node_data:
-                distance = geodesic(
-                    (target_lat, target_lng),
-                    (node_data['lat'], node_data['lng'])
-                ).meters
-                
-                if distance < min_distance and distance <= max_distance:
-                    min_distance = distance
-                    nearest_node = node_id
+    def _route_steps(self, path, start_offset, end_offset):
+        """노드 경로의 단계별 안내 (방향이 꺾이거나 도로 종류가 바뀌는 곳마다 한 단계)
+        
+        OSRM 응답의 steps와 같은 형식 (instruction, distance m, duration 초, name, mode)
+        """
+        edges = self.graph.path_edges(path)
+        lat = self.graph.lat[path].astype(np.float64)
+        lng = self.graph.lng[path].astype(np.float64)
+        # 진행 방위각 (북쪽 기준 시계 방향, 도)
+        bearings = np.degrees(np.arctan2(
+            np.diff(lng) * np.cos(np.radians(lat[:-1])), np.diff(lat)
+        ))
+        distances = self.graph.distance[edges].tolist()
+        kinds = [HIGHWAY_CLASSES[k] for k in self.graph.highway[edges]]
+        
+        steps = []
+        current = {"instruction": "출발하세요", "distance": start_offset,
+                   "name": HIGHWAY_LABELS.get(kinds[0], '') if kinds else ''}
+        for i, edge_distance in enumerate(distances):
+            if i > 0:
+                turn = (bearings[i] - bearings[i - 1] + 180.0) % 360.0 - 180.0
+                if abs(turn) >= UTURN_ANGLE_DEG:
+                    instruction = "유턴하세요"
+                elif abs(turn) >= TURN_ANGLE_DEG:
+                    instruction = "우회전하세요" if turn > 0 else "좌회전하세요"
+                else:
+                    instruction = "직진하세요"
+                if instruction != "직진하세요" or kinds[i] != kinds[i - 1]:
+                    steps.append(current)
+                    current = {"instruction": instruction, "distance": 0.0,
+                               "name": HIGHWAY_LABELS.get(kinds[i], '')}
+            current["distance"] += edge_distance
+        current["distance"] += end_offset
+        steps.append(current)
+        steps.append({"instruction": "목적지에 도착했습니다", "distance": 0.0, "name": ""})
         
-        return nearest_node
+        speed = WALKING_SPEED_KMH / 3.6
+        for step in steps:
+            step["distance"] = round(step["distance"], 1)
+            step["duration"] = round(step["distance"] / speed, 1)
+            step["mode"] = "walking"
+        return steps
     
     def _get_route_cache_key(self, start_lat, start_lng, end_lat, end_lng, options=None):
         """경로 캐시 키 생성"""
@@ -398,13 +378,13 @@ class OptimizedOSMRouter:
             key_data += f"-{hash(str(sorted(options.items())))}"
         return hashlib.md5(key_data.encode()).hexdigest()
     
-    @lru_cache(maxsize=500)
-    def _cached_shortest_path(self, start_node, end_node):
-        """경로 계산 결과 캐싱"""
-        try:
-            return nx.shortest_path(self.graph, start_node, end_node, weight='weight')
-        except nx.NetworkXNoPath:
-            return None
+    def _shortest_path(self, start_node, end_node):
+        """기본 가중치 최단 경로 (CH 양방향 탐색, CH가 없으면 A*)"""
+        if self.ch is not None:
+            path, _ = self.ch.query(start_node, end_node)
+        else:
+            path, _ = self.graph.shortest_path(start_node, end_node)
+        return path
     
     def calculate_pedestrian_route(self, start_lat, start_lng, end_lat, end_lng, **kwargs):
         """최적화된 경로 계산"""
@@ -425,12 +405,12 @@ class OptimizedOSMRouter:
             
             logger.info(f"노드 찾기 완료: start={start_node}, end={end_node}")
             
-            if not start_node or not end_node:
+            if start_node is None or end_node is None:
                 logger.warning("가까운 노드를 찾을 수 없음")
                 result = self._create_direct_route(start_lat, start_lng, end_lat, end_lng)
             else:
-                # 캐시된 경로 계산
-                path = self._cached_shortest_path(start_node, end_node)
+                # 최단 경로 계산
+                path = self._shortest_path(start_node, end_node)
                 
                 if path:
                     logger.info(f"경로 계산 성공: {len(path)}개 노드")
@@ -459,26 +439,24 @@ class OptimizedOSMRouter:
         segments = []
         
         for node_id in path:
-            node_data = self.graph.nodes[node_id]
-            waypoints.append({"lat": node_data['lat'], "lng": node_data['lng']})
+            waypoints.append({"lat": float(self.graph.lat[node_id]), "lng": float(self.graph.lng[node_id])})
         
         waypoints.append({"lat": end_lat, "lng": end_lng})
         
         # 거리 계산
-        for i in range(len(path) - 1):
-            edge_data = self.graph.get_edge_data(path[i], path[i+1])
-            if edge_data:
-                segment_distance = edge_data.get('distance', edge_data.get('weight', 0))
-                total_distance += segment_distance
-                
-                segments.append({
-                    "start_node": path[i],
-                    "end_node": path[i+1],
-                    "distance": segment_distance,
-                    "highway_type": edge_data.get('highway_type', 'unknown')
-                })
+        edges = self.graph.path_edges(path)
+        for i, eid in enumerate(edges):
+            segment_distance = float(self.graph.distance[eid])
+            total_distance += segment_distance
+            
+            segments.append({
+                "start_node": int(path[i]),
+                "end_node": int(path[i+1]),
+                "distance": segment_distance,
+                "highway_type": HIGHWAY_CLASSES[self.graph.highway[eid]]
+            })
         
-        estimated_time = int((total_distance / 1000) / 4 * 60)
+        estimated_time = int((total_distance / 1000) / WALKING_SPEED_KMH * 60)
         
         return {
             "waypoints": waypoints,
@@ -495,7 +473,7 @@ class OptimizedOSMRouter:
     def _create_direct_route(self, start_lat, start_lng, end_lat, end_lng):
         """직선 경로"""
         distance = geodesic((start_lat, start_lng), (end_lat, end_lng)).kilometers
-        estimated_time = int(distance / 4 * 60)
+        estimated_time = int(distance / WALKING_SPEED_KMH * 60)
         
         return {
             "waypoints": [
@@ -516,8 +494,8 @@ class OptimizedOSMRouter:
         """네트워크 통계"""
         try:
             stats = {
-                "total_nodes": self.graph.number_of_nodes(),
-                "total_edges": self.graph.number_of_edges(),
+                "total_nodes": self.graph.node_count,
+                "total_edges": self.graph.edge_count,
                 "sidewalk_edges": 0,
                 "crossing_edges": 0,
                 "pedestrian_area_edges": 0,
@@ -526,36 +504,39 @@ class OptimizedOSMRouter:
                 "cache_stats": {
                     "route_cache_size": len(self.route_cache),
                     "max_cache_size": self.max_cache_size,
-                    "spatial_index_enabled": self.spatial_index is not None,
-                    "cached_nodes": len(self.node_coordinates) if self.node_coordinates else 0
+                    "spatial_index_enabled": self.graph.node_count > 0,
+                    "cached_nodes": self.graph.node_count,
+                    "graph_bytes": self.graph.nbytes,
+                    "ch_enabled": self.ch is not None,
+                    "ch_shortcuts": self.ch.shortcut_count if self.ch else 0
+                },
+                "graph_file": {
+                    "path": self.network_path,
+                    "built_at": self.metadata.get('created_time'),
+                    "input": self.metadata.get('input')
                 }
             }
             
-            # 엣지별 통계 계산
-            for u, v, data in self.graph.edges(data=True):
-                highway_type = data.get('highway_type', 'unknown')
-                stats["highway_type_distribution"][highway_type] = stats["highway_type_distribution"].get(highway_type, 0) + 1
-                
-                if highway_type == 'footway':
-                    stats["sidewalk_edges"] += 1
-                elif highway_type == 'crossing':
-                    stats["crossing_edges"] += 1
-                elif highway_type == 'pedestrian':
-                    stats["pedestrian_area_edges"] += 1
-                
-                if highway_type in ['footway', 'pedestrian', 'residential']:
-                    stats["wheelchair_accessible_edges"] += 1
+            # 도로 종류별 통계 계산
+            distribution = self.graph.highway_counts()
+            stats["highway_type_distribution"] = distribution
+            stats["sidewalk_edges"] = distribution.get('footway', 0)
+            stats["crossing_edges"] = distribution.get('crossing', 0)
+            stats["pedestrian_area_edges"] = distribution.get('pedestrian', 0)
+            stats["wheelchair_accessible_edges"] = sum(
+                distribution.get(t, 0) for t in ['footway', 'pedestrian', 'residential']
+            )
             
             stats["data_source"] = "Optimized OSM + Spatial Index + Cache"
-            stats["network_type"] = "Cached OSM with KDTree"
+            stats["network_type"] = "Cached OSM CSR graph with KDTree + CH"
             
             return stats
             
         except Exception as e:
             logger.error(f"통계 계산 실패: {e}")
             return {
-                "total_nodes": self.graph.number_of_nodes(),
-                "total_edges": self.graph.number_of_edges(),
+                "total_nodes": self.graph.node_count,
+                "total_edges": self.graph.edge_count,
                 "error": str(e),
                 "data_source": "Error in calculation"
             }
@@ -563,13 +544,12 @@ class OptimizedOSMRouter:
     def clear_cache(self):
         """캐시 정리"""
         self.route_cache.clear()
-        self._cached_shortest_path.cache_clear()
         logger.info("캐시 정리 완료")
 
-def init_pedestrian_router(database_url: str):
-    """최적화된 라우터 초기화"""
+def init_pedestrian_router(cache_dir: str = "cache"):
+    """최적화된 라우터 초기화 (그래프 파일 경로는 WALK_GRAPH_PATH 우선)"""
     try:
-        router = OptimizedOSMRouter(database_url)
+        router = OptimizedOSMRouter(cache_dir)
         logger.info("최적화된 OSM 라우터 초기화 완료")
         return router
     except Exception as e:
@@ -0,0 +1,39 @@
+# backend/single_flight.py - 동일한 외부 API 요청 합치기 (single-flight)
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """같은 키로 동시에 들어온 요청은 하나의 작업 결과를 함께 기다림
+
+    작업은 별도 태스크로 실행하고 호출자는 shield로 기다리므로, 먼저 요청한
+    클라이언트가 연결을 끊어도 뒤따라 기다리던 요청은 영향을 받지 않음.
+    결과는 보관하지 않으며(캐시 아님) 작업이 끝나면 키가 바로 제거됨
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.counters = {"leaders": 0, "followers": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            self.counters["leaders"] += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.counters["followers"] += 1
+            logger.debug(f"🔗 진행 중인 요청에 합류: {key}")
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict:
+        return {**self.counters, "inflight": len(self._inflight)}
+
+
+# 전역 인스턴스 (키 앞에 요청 종류를 붙여 구분)
+single_flight = SingleFlight()
@@ -0,0 +1,478 @@
+# backend/walk_graph.py - 보행 네트워크 CSR 그래프 + 힙 기반 Dijkstra/A*
+
+import heapq
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import scipy
+from scipy.spatial import cKDTree
+
+from zone_index import haversine_km, project_to_plane
+
+logger = logging.getLogger(__name__)
+
+# 도로 종류 코드 (uint8로 저장)
+HIGHWAY_CLASSES = [
+    "footway",
+    "pedestrian",
+    "path",
+    "steps",
+    "cycleway",
+    "residential",
+    "service",
+    "living_street",
+    "tertiary",
+    "secondary",
+    "primary",
+    "fallback",
+    "unknown",
+]
+HIGHWAY_CODES = {name: code for code, name in enumerate(HIGHWAY_CLASSES)}
+
+# 노드 병합 기준 좌표 자릿수 (기존 "위도,경도" 문자열 노드 ID와 동일한 소수 5자리)
+NODE_PRECISION = 5
+# 이보다 짧은 선분은 버림 (m)
+MIN_SEGMENT_METERS = 1.0
+
+
+def highway_code(highway: Optional[str]) -> int:
+    return HIGHWAY_CODES.get(highway or "unknown", HIGHWAY_CODES["unknown"])
+
+
+def _tree_to_arrays(tree: cKDTree, prefix: str) -> Dict[str, np.ndarray]:
+    """cKDTree 내부 상태를 배열로 저장 (scipy 버전이 같을 때만 복원 가능)"""
+    state = tree.__getstate__()
+    arrays = {
+        prefix + "scipy": np.frombuffer(scipy.__version__.encode(), dtype=np.uint8),
+        prefix + "items": np.array([len(state)], dtype=np.int64),
+    }
+    for i, item in enumerate(state):
+        if item is not None:
+            arrays[f"{prefix}{i}"] = np.asarray(item)
+    return arrays
+
+
+def _tree_from_arrays(arrays: Dict[str, np.ndarray], prefix: str) -> Optional[cKDTree]:
+    """저장된 cKDTree 상태 복원, 없거나 scipy 버전이 다르면 None (필요할 때 재구성)"""
+    version = arrays.get(prefix + "scipy")
+    if version is None or version.tobytes().decode() != scipy.__version__:
+        return None
+    state = []
+    for i in range(int(arrays[prefix + "items"][0])):
+        item = arrays.get(f"{prefix}{i}")
+        state.append(item.item() if item is not None and item.ndim == 0 else item)
+    try:
+        tree = cKDTree.__new__(cKDTree)
+        tree.__setstate__(tuple(state))
+        return tree
+    except Exception as e:
+        logger.warning(f"⚠️ KD-트리 복원 실패, 재구성 예정: {e}")
+        return None
+
+
+class GraphBuilder:
+    """LineString 단위로 엣지를 모아 CSRGraph로 변환
+
+    노드는 소수 5자리로 반올림한 좌표가 같으면 하나로 합침
+    """
+
+    def __init__(self):
+        self._node_ids: Dict[int, int] = {}
+        self._lat: List[float] = []
+        self._lng: List[float] = []
+        self._u: List[np.ndarray] = []
+        self._v: List[np.ndarray] = []
+        self._distance: List[np.ndarray] = []
+        self._weight: List[np.ndarray] = []
+        self._highway: List[np.ndarray] = []
+
+    @staticmethod
+    def _node_keys(lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+        # 소수 5자리 정수 좌표 두 개를 int64 하나로 합친 키
+        scale = 10 ** NODE_PRECISION
+        lat_key = np.round(np.asarray(lat, dtype=np.float64) * scale).astype(np.int64)
+        lng_key = np.round(np.asarray(lng, dtype=np.float64) * scale).astype(np.int64)
+        return (lat_key << 32) | (lng_key & 0xFFFFFFFF)
+
+    def _nodes(self, lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+        """좌표 배열의 노드 번호 (새 좌표는 노드로 등록, 배치 안의 중복은 한 번만 조회)"""
+        keys, first, inverse = np.unique(
+            self._node_keys(lat, lng), return_index=True, return_inverse=True
+        )
+        node_ids = self._node_ids
+        ids = np.empty(len(keys), dtype=np.int32)
+        for i, (key, index) in enumerate(zip(keys.tolist(), first.tolist())):
+            node = node_ids.get(key)
+            if node is None:
+                node = len(self._lat)
+                node_ids[key] = node
+                self._lat.append(float(lat[index]))
+                self._lng.append(float(lng[index]))
+            ids[i] = node
+        return ids[inverse.ravel()]
+
+    def _node(self, lat: float, lng: float) -> int:
+        return int(self._nodes(np.array([lat]), np.array([lng]))[0])
+
+    def add_polylines(
+        self,
+        lat: np.ndarray,
+        lng: np.ndarray,
+        line_ids: np.ndarray,
+        line_highway: np.ndarray,
+        line_multiplier: np.ndarray,
+    ) -> int:
+        """여러 선형의 점을 이어 붙인 배열로 엣지를 한 번에 추가, 추가된 엣지 수 반환
+
+        line_ids는 점별 선형 번호(연속 구간), line_highway(도로 종류 코드)와
+        line_multiplier(가중치 배율)는 선형 번호로 조회함
+        """
+        lat = np.asarray(lat, dtype=np.float64)
+        lng = np.asarray(lng, dtype=np.float64)
+        line_ids = np.asarray(line_ids)
+        if len(lat) < 2:
+            return 0
+        distance = haversine_km(lat[:-1], lng[:-1], lat[1:], lng[1:]) * 1000.0
+        # 같은 선형 안의 연속한 두 점만 선분으로 사용
+        keep = (line_ids[:-1] == line_ids[1:]) & (distance >= MIN_SEGMENT_METERS)
+        if not keep.any():
+            return 0
+
+        nodes = self._nodes(lat, lng)
+        segment_lines = line_ids[:-1][keep]
+        self._u.append(nodes[:-1][keep])
+        self._v.append(nodes[1:][keep])
+        self._distance.append(distance[keep])
+        self._weight.append(distance[keep] * np.asarray(line_multiplier)[segment_lines])
+        self._highway.append(np.asarray(line_highway, dtype=np.uint8)[segment_lines])
+        return int(keep.sum())
+
+    def add_linestring(self, coords: Sequence, highway: str, weight_multiplier: float) -> int:
+        """GeoJSON 좌표([경도, 위도], ...)의 연속 선분을 엣지로 추가, 추가된 엣지 수 반환"""
+        if len(coords) < 2:
+            return 0
+        points = np.asarray(coords, dtype=np.float64)[:, :2]
+        return self.add_polylines(
+            points[:, 1],
+            points[:, 0],
+            np.zeros(len(points), dtype=np.int64),
+            np.array([highway_code(highway)]),
+            np.array([weight_multiplier]),
+        )
+
+    def add_node(self, lat: float, lng: float) -> int:
+        return self._node(lat, lng)
+
+    def add_edges(self, u, v, weight, distance, highway: str):
+        """노드 번호 배열로 엣지 추가 (대체 네트워크 구성용)"""
+        u = np.asarray(u, dtype=np.int32)
+        self._u.append(u)
+        self._v.append(np.asarray(v, dtype=np.int32))
+        self._weight.append(np.asarray(weight, dtype=np.float64))
+        self._distance.append(np.asarray(distance, dtype=np.float64))
+        self._highway.append(np.full(len(u), highway_code(highway), dtype=np.uint8))
+
+    def build(self) -> "CSRGraph":
+        def concat(parts, dtype):
+            return np.concatenate(parts).astype(dtype) if parts else np.empty(0, dtype)
+
+        return CSRGraph.from_edges(
+            np.asarray(self._lat, dtype=np.float64),
+            np.asarray(self._lng, dtype=np.float64),
+            concat(self._u, np.int32),
+            concat(self._v, np.int32),
+            concat(self._weight, np.float32),
+            concat(self._distance, np.float32),
+            concat(self._highway, np.uint8),
+        )
+
+
+class CSRGraph:
+    """무방향 보행 그래프의 CSR(압축 희소 행) 표현
+
+    노드는 int32 번호, 좌표는 float32. 각 무방향 엣지는 양방향 두 항목으로
+    저장되며 edge_id로 원래 엣지(위험 가중치 배열의 인덱스)를 가리킴
+    """
+
+    # 파일 저장 대상 배열 (graph_store 형식)
+    ARRAY_FIELDS = (
+        "lat", "lng", "indptr", "indices", "edge_id",
+        "edge_u", "edge_v", "weight", "distance", "highway",
+    )
+
+    def __init__(
+        self,
+        lat: np.ndarray,
+        lng: np.ndarray,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        edge_id: np.ndarray,
+        edge_u: np.ndarray,
+        edge_v: np.ndarray,
+        weight: np.ndarray,
+        distance: np.ndarray,
+        highway: np.ndarray,
+    ):
+        self.lat = lat
+        self.lng = lng
+        self.indptr = indptr
+        self.indices = indices
+        self.edge_id = edge_id
+        self.edge_u = edge_u
+        self.edge_v = edge_v
+        self.weight = weight
+        self.distance = distance
+        self.highway = highway
+        self._tree: Optional[cKDTree] = None
+        self._directed_weight: Optional[np.ndarray] = None
+        self._weight_cache = None
+        # A* 휴리스틱 하한: 직선거리(m) × 최소 (가중치/거리) 비율
+        ratios = weight / np.maximum(distance, 1e-6)
+        self.min_weight_per_meter = float(ratios.min()) if len(ratios) else 1.0
+
+    @classmethod
+    def from_edges(cls, lat, lng, u, v, weight, distance, highway) -> "CSRGraph":
+        """엣지 목록으로 CSR 구성 (자기 루프 제거, 중복 엣지는 가중치가 작은 것만 유지)"""
+        node_count = len(lat)
+        keep = u != v
+        u, v = u[keep], v[keep]
+        weight, distance, highway = weight[keep], distance[keep], highway[keep]
+
+        # 무방향 중복 제거: (작은 번호, 큰 번호) 기준으로 가중치 오름차순 첫 항목
+        lo, hi = np.minimum(u, v), np.maximum(u, v)
+        order = np.lexsort((weight, hi, lo))
+        lo, hi = lo[order], hi[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = (lo[1:] != lo[:-1]) | (hi[1:] != hi[:-1])
+        order = order[first]
+        edge_u, edge_v = lo[first].astype(np.int32), hi[first].astype(np.int32)
+        weight = weight[order].astype(np.float32)
+        distance = distance[order].astype(np.float32)
+        highway = highway[order].astype(np.uint8)
+        edge_count = len(edge_u)
+
+        # 양방향 항목을 출발 노드 기준으로 정렬
+        sources = np.concatenate([edge_u, edge_v])
+        targets = np.concatenate([edge_v, edge_u])
+        ids = np.concatenate([np.arange(edge_count), np.arange(edge_count)]).astype(np.int32)
+        directed = np.argsort(sources, kind="stable")
+        indptr = np.zeros(node_count + 1, dtype=np.int32)
+        np.cumsum(np.bincount(sources, minlength=node_count), out=indptr[1:])
+
+        return cls(
+            lat=np.asarray(lat, dtype=np.float32),
+            lng=np.asarray(lng, dtype=np.float32),
+            indptr=indptr,
+            indices=targets[directed].astype(np.int32),
+            edge_id=ids[directed],
+            edge_u=edge_u,
+            edge_v=edge_v,
+            weight=weight,
+            distance=distance,
+            highway=highway,
+        )
+
+    @classmethod
+    def empty(cls) -> "CSRGraph":
+        return GraphBuilder().build()
+
+    def to_arrays(self, prefix: str = "graph.") -> Dict[str, np.ndarray]:
+        """파일 저장용 배열 (기본 방향 가중치와 KD-트리 상태 포함)"""
+        arrays = {prefix + name: getattr(self, name) for name in self.ARRAY_FIELDS}
+        arrays[prefix + "directed_weight"] = self.directed_weights()
+        if self.node_count:
+            arrays.update(_tree_to_arrays(self.tree, prefix + "kdtree."))
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], prefix: str = "graph.") -> "CSRGraph":
+        """to_arrays 결과(읽기 전용 memmap 뷰 포함)로 그래프 구성, 배열은 복사하지 않음"""
+        graph = cls(**{name: arrays[prefix + name] for name in cls.ARRAY_FIELDS})
+        graph._directed_weight = arrays.get(prefix + "directed_weight")
+        graph._tree = _tree_from_arrays(arrays, prefix + "kdtree.")
+        return graph
+
+    @property
+    def node_count(self) -> int:
+        return len(self.lat)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.edge_u)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            array.nbytes
+            for array in (
+                self.lat, self.lng, self.indptr, self.indices, self.edge_id,
+                self.edge_u, self.edge_v, self.weight, self.distance, self.highway,
+            )
+        )
+
+    def highway_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.highway, minlength=len(HIGHWAY_CLASSES))
+        return {HIGHWAY_CLASSES[code]: int(n) for code, n in enumerate(counts) if n}
+
+    @property
+    def tree(self) -> cKDTree:
+        if self._tree is None:
+            self._tree = cKDTree(project_to_plane(self.lat, self.lng))
+        return self._tree
+
+    def nearest_nodes(
+        self, lat: float, lng: float, k: int = 1, max_distance_m: float = 3000
+    ) -> List[Tuple[int, float]]:
+        """가까운 노드 최대 k개 [(노드 번호, 거리 m), ...] (거리순)"""
+        if self.node_count == 0:
+            return []
+        k = min(k, self.node_count)
+        distances, nodes = self.tree.query(
+            project_to_plane(lat, lng).reshape(2),
+            k=k,
+            distance_upper_bound=max_distance_m / 1000.0,
+        )
+        distances, nodes = np.atleast_1d(distances), np.atleast_1d(nodes)
+        return [
+            (int(node), float(dist) * 1000.0)
+            for dist, node in zip(distances, nodes)
+            if np.isfinite(dist)
+        ]
+
+    def nearest_node(
+        self, lat: float, lng: float, max_distance_m: float = 3000
+    ) -> Optional[int]:
+        found = self.nearest_nodes(lat, lng, 1, max_distance_m)
+        return found[0][0] if found else None
+
+    @property
+    def xy(self) -> np.ndarray:
+        """평면 투영 좌표 (km), KD-트리와 공유"""
+        return self.tree.data
+
+    def directed_weights(self, edge_multiplier: Optional[np.ndarray] = None) -> np.ndarray:
+        """CSR 항목 순서의 가중치 (배율 배열별로 한 번만 계산해 재사용)"""
+        if edge_multiplier is None:
+            if self._directed_weight is None:
+                self._directed_weight = self.weight[self.edge_id]
+            return self._directed_weight
+        cached = self._weight_cache
+        if cached is not None and cached[0] is edge_multiplier:
+            return cached[1]
+        directed = (self.weight * edge_multiplier).astype(np.float32)[self.edge_id]
+        self._weight_cache = (edge_multiplier, directed)
+        return directed
+
+    def shortest_path(
+        self,
+        source: int,
+        target: int,
+        edge_multiplier: Optional[np.ndarray] = None,
+        use_heuristic: bool = True,
+    ) -> Tuple[Optional[List[int]], float]:
+        """힙 기반 A* (use_heuristic=False면 Dijkstra), (노드 경로, 비용) 반환
+
+        edge_multiplier는 무방향 엣지별 가중치 배율 (위험 가중치 등, 1 이상)
+        """
+        if source == target:
+            return [source], 0.0
+        return self.shortest_path_multi(
+            [(source, 0.0)], [(target, 0.0)], edge_multiplier, use_heuristic
+        )
+
+    def shortest_path_multi(
+        self,
+        sources: Sequence[Tuple[int, float]],
+        targets: Sequence[Tuple[int, float]],
+        edge_multiplier: Optional[np.ndarray] = None,
+        use_heuristic: bool = True,
+    ) -> Tuple[Optional[List[int]], float]:
+        """다중 출발/도착 A*, (출발 후보 ~ 도착 후보 노드 경로, 총비용) 반환
+
+        sources/targets는 [(노드, 추가 비용), ...]. 출발 후보는 추가 비용(스냅 거리 등)에서
+        시작하고, 도착 후보는 도달 비용 + 추가 비용으로 가상 도착점에 이어지므로
+        한 번의 탐색으로 모든 조합 중 총비용이 가장 작은 경로를 찾음
+        """
+        indptr, indices = self.indptr, self.indices
+        directed_weight = self.directed_weights(edge_multiplier)
+
+        target_extra: Dict[int, float] = {}
+        for node, extra in targets:
+            target_extra[node] = min(float(extra), target_extra.get(node, np.inf))
+        if not target_extra:
+            return None, float("inf")
+
+        # 휴리스틱: 도착 후보별 (직선거리 하한 + 추가 비용)의 최솟값 (허용 가능·일관적)
+        # 직선거리 하한은 평면 투영 오차를 감안해 1% 줄인 최소 (가중치/거리) 비율로 환산
+        xy = self.xy
+        target_xy = xy[list(target_extra)]
+        extras = np.fromiter(target_extra.values(), dtype=np.float64)
+        scale = self.min_weight_per_meter * 0.99 * 1000.0 if use_heuristic else 0.0
+
+        def estimate(nodes: np.ndarray) -> List[float]:
+            if not scale:
+                return [float(extras.min())] * len(nodes)
+            delta = xy[nodes][:, None, :] - target_xy[None, :, :]
+            return (np.hypot(delta[..., 0], delta[..., 1]) * scale + extras).min(axis=1).tolist()
+
+        best: Dict[int, float] = {}
+        parent: Dict[int, int] = {}
+        for node, extra in sources:
+            if extra < best.get(node, np.inf):
+                best[node] = float(extra)
+                parent[node] = -1
+        starts = np.fromiter(best, dtype=np.int64)
+        heap = [
+            (cost + est, cost, node)
+            for node, cost, est in zip(starts.tolist(), list(best.values()), estimate(starts))
+        ]
+        heapq.heapify(heap)
+        closed = set()
+
+        while heap:
+            _, cost, node = heapq.heappop(heap)
+            if node < 0:
+                # 가상 도착점 항목 (-1 - 도착 노드)
+                path = [-1 - node]
+                while parent[path[-1]] != -1:
+                    path.append(parent[path[-1]])
+                return path[::-1], cost
+            if node in closed:
+                continue
+            closed.add(node)
+
+            extra = target_extra.get(node)
+            if extra is not None:
+                total = cost + extra
+                heapq.heappush(heap, (total, total, -1 - node))
+
+            start, end = indptr[node], indptr[node + 1]
+            neighbors = indices[start:end]
+            for neighbor, edge_cost, est in zip(
+                neighbors.tolist(), directed_weight[start:end].tolist(), estimate(neighbors)
+            ):
+                if neighbor in closed:
+                    continue
+                candidate = cost + edge_cost
+                if candidate < best.get(neighbor, np.inf):
+                    best[neighbor] = candidate
+                    parent[neighbor] = node
+                    heapq.heappush(heap, (candidate + est, candidate, neighbor))
+
+        return None, float("inf")
+
+    def path_edges(self, path: Sequence[int]) -> np.ndarray:
+        """노드 경로를 따라가는 무방향 엣지 번호 배열"""
+        edges = np.empty(max(len(path) - 1, 0), dtype=np.int64)
+        for i, (u, v) in enumerate(zip(path, path[1:])):
+            start, end = self.indptr[u], self.indptr[u + 1]
+            neighbors = self.indices[start:end]
+            candidates = np.flatnonzero(neighbors == v)
+            # 중복 엣지는 제거되어 있으므로 하나만 존재
+            edges[i] = self.edge_id[start + candidates[0]]
+        return edges
+
+    def path_distance(self, path: Sequence[int]) -> float:
+        """노드 경로의 실제 거리 합 (m)"""
+        return float(self.distance[self.path_edges(path)].sum())
@@ -0,0 +1,399 @@
+# backend/zone_index.py - 위험지역/공사장 공간 인덱스
+
+import math
+import logging
+from typing import List, Dict, Tuple, Optional
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+
+# 서울 중심 위도 기준 등장방형(equirectangular) 투영. 서울 범위에서는 오차가 수 m 수준
+REFERENCE_LAT = 37.55
+_KM_PER_DEG_LAT = math.pi * EARTH_RADIUS_KM / 180.0
+_KM_PER_DEG_LNG = _KM_PER_DEG_LAT * math.cos(math.radians(REFERENCE_LAT))
+
+# 투영 오차로 최근접 후보가 뒤바뀌는 경우를 대비해 여러 후보를 하버사인으로 재검증
+_NEAREST_CANDIDATES = 4
+
+
+def project_to_plane(lat, lng) -> np.ndarray:
+    """위경도를 서울 기준 로컬 평면 좌표(km)로 변환"""
+    lat = np.asarray(lat, dtype=np.float64)
+    lng = np.asarray(lng, dtype=np.float64)
+    return np.stack([lng * _KM_PER_DEG_LNG, lat * _KM_PER_DEG_LAT], axis=-1)
+
+
+def unproject_from_plane(xy) -> Tuple[np.ndarray, np.ndarray]:
+    """project_to_plane의 역변환 (위도, 경도)"""
+    xy = np.asarray(xy, dtype=np.float64)
+    return xy[..., 1] / _KM_PER_DEG_LAT, xy[..., 0] / _KM_PER_DEG_LNG
+
+
+def haversine_km(lat1, lng1, lat2, lng2) -> np.ndarray:
+    """하버사인 거리 (km, 배열 브로드캐스팅 지원)"""
+    lat1 = np.radians(lat1)
+    lat2 = np.radians(lat2)
+    dlat = lat2 - lat1
+    dlng = np.radians(np.asarray(lng2) - np.asarray(lng1))
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+# 선분 x 지역 거리 행렬 한 번에 계산할 최대 원소 수 (메모리 상한)
+_SEGMENT_CHUNK_ELEMENTS = 1_000_000
+
+
+def polyline_distances_km(path_lat, path_lng, zone_lat, zone_lng) -> np.ndarray:
+    """각 지역 중심에서 경로(연속 선분)까지의 최소 거리(km)
+
+    로컬 평면에 한 번 투영한 뒤 모든 선분 x 지역 쌍의 점-선분 거리를 벡터 연산으로 계산.
+    중간점 샘플링과 달리 긴 선분이 지역을 관통하는 경우도 정확히 잡아냄
+    """
+    path = project_to_plane(path_lat, path_lng).reshape(-1, 2)
+    centers = project_to_plane(zone_lat, zone_lng).reshape(-1, 2)
+    if len(centers) == 0:
+        return np.empty(0)
+    if len(path) == 0:
+        return np.full(len(centers), np.inf)
+    if len(path) == 1:
+        return np.linalg.norm(centers - path[0], axis=1)
+
+    starts = path[:-1]
+    deltas = path[1:] - starts
+    lengths_sq = np.einsum("ij,ij->i", deltas, deltas)
+    # 길이 0인 선분(중복 좌표)은 시작점과의 거리로 처리
+    safe_lengths_sq = np.where(lengths_sq > 0, lengths_sq, 1.0)
+
+    result = np.empty(len(centers))
+    chunk = max(1, _SEGMENT_CHUNK_ELEMENTS // len(starts))
+    for begin in range(0, len(centers), chunk):
+        c = centers[begin:begin + chunk, None, :]  # (Z, 1, 2)
+        offsets = c - starts[None, :, :]  # (Z, S, 2)
+        t = np.einsum("zsk,sk->zs", offsets, deltas) / safe_lengths_sq
+        t = np.clip(np.where(lengths_sq > 0, t, 0.0), 0.0, 1.0)
+        closest = starts[None, :, :] + t[..., None] * deltas[None, :, :]
+        distances = np.linalg.norm(c - closest, axis=-1)
+        result[begin:begin + chunk] = distances.min(axis=1)
+    return result
+
+
+def polyline_zone_mask(path_lat, path_lng, zone_lat, zone_lng, radius_km) -> np.ndarray:
+    """경로가 지역 반경(radius_km, 스칼라 또는 지역별 배열)을 지나가는지 여부"""
+    path_lat = np.asarray(path_lat, dtype=np.float64).ravel()
+    path_lng = np.asarray(path_lng, dtype=np.float64).ravel()
+    zone_lat = np.asarray(zone_lat, dtype=np.float64).ravel()
+    zone_lng = np.asarray(zone_lng, dtype=np.float64).ravel()
+    radius_km = np.broadcast_to(np.asarray(radius_km, dtype=np.float64), zone_lat.shape)
+
+    mask = np.zeros(zone_lat.shape, dtype=bool)
+    if zone_lat.size == 0 or path_lat.size == 0:
+        return mask
+
+    # 경로 bbox(+반경) 밖의 지역은 선분 계산 전에 제외
+    margin = float(radius_km.max()) * 1.01
+    lat_margin = margin / _KM_PER_DEG_LAT
+    lng_margin = margin / _KM_PER_DEG_LNG
+    candidates = np.flatnonzero(
+        (zone_lat >= path_lat.min() - lat_margin)
+        & (zone_lat <= path_lat.max() + lat_margin)
+        & (zone_lng >= path_lng.min() - lng_margin)
+        & (zone_lng <= path_lng.max() + lng_margin)
+    )
+    if candidates.size:
+        distances = polyline_distances_km(
+            path_lat, path_lng, zone_lat[candidates], zone_lng[candidates]
+        )
+        mask[candidates] = distances <= radius_km[candidates]
+    return mask
+
+
+def polylines_zone_hits(paths, zone_lat, zone_lng, radius_km: float) -> np.ndarray:
+    """여러 후보 경로 x 지역 교차 행렬 (후보 수, 지역 수)
+
+    paths는 (위도 배열, 경도 배열) 목록. 모든 후보의 선분을 하나로 이어 붙여
+    점-선분 거리를 한 번에 계산하고, 후보별 최소값은 reduceat으로 구함
+    """
+    zone_lat = np.asarray(zone_lat, dtype=np.float64).ravel()
+    zone_lng = np.asarray(zone_lng, dtype=np.float64).ravel()
+    hits = np.zeros((len(paths), zone_lat.size), dtype=bool)
+    if zone_lat.size == 0:
+        return hits
+
+    starts, deltas, offsets, owners = [], [], [], []
+    segment_count = 0
+    for candidate, (path_lat, path_lng) in enumerate(paths):
+        points = project_to_plane(path_lat, path_lng).reshape(-1, 2)
+        if len(points) == 0:
+            continue
+        if len(points) == 1:
+            points = np.vstack([points, points])
+        starts.append(points[:-1])
+        deltas.append(np.diff(points, axis=0))
+        offsets.append(segment_count)
+        owners.append(candidate)
+        segment_count += len(points) - 1
+    if not owners:
+        return hits
+
+    starts = np.concatenate(starts)
+    deltas = np.concatenate(deltas)
+    offsets = np.asarray(offsets)
+    owners = np.asarray(owners)
+    lengths_sq = np.einsum("ij,ij->i", deltas, deltas)
+    safe_lengths_sq = np.where(lengths_sq > 0, lengths_sq, 1.0)
+    centers = project_to_plane(zone_lat, zone_lng).reshape(-1, 2)
+
+    chunk = max(1, _SEGMENT_CHUNK_ELEMENTS // len(starts))
+    for begin in range(0, len(centers), chunk):
+        c = centers[begin:begin + chunk, None, :]
+        t = np.einsum("zsk,sk->zs", c - starts[None, :, :], deltas) / safe_lengths_sq
+        t = np.clip(np.where(lengths_sq > 0, t, 0.0), 0.0, 1.0)
+        closest = starts[None, :, :] + t[..., None] * deltas[None, :, :]
+        distances = np.linalg.norm(c - closest, axis=-1)  # (Z, S)
+        per_candidate = np.minimum.reduceat(distances, offsets, axis=1)  # (Z, C)
+        hits[owners, begin:begin + chunk] = (per_candidate <= radius_km).T
+    return hits
+
+
+class ZoneSpatialIndex:
+    """위험지역 좌표에 대한 KDTree 공간 인덱스 (시작 시 한 번 구축)"""
+
+    def __init__(self, zones: List[Dict]):
+        self.zones = list(zones)
+        self.lat = np.array([z["lat"] for z in self.zones], dtype=np.float64)
+        self.lng = np.array([z["lng"] for z in self.zones], dtype=np.float64)
+        self.risk = np.array([z.get("risk", 0.0) for z in self.zones], dtype=np.float64)
+        self.tree = cKDTree(project_to_plane(self.lat, self.lng)) if self.zones else None
+        self._positions: Optional[Dict[int, int]] = None
+
+    @classmethod
+    def from_arrays(cls, lat, lng, risk, zones) -> "ZoneSpatialIndex":
+        """좌표 배열로 직접 구축 (zones는 인덱스로 dict를 돌려주는 시퀀스)"""
+        index = cls.__new__(cls)
+        index.zones = zones
+        index.lat = np.asarray(lat, dtype=np.float64)
+        index.lng = np.asarray(lng, dtype=np.float64)
+        index.risk = np.asarray(risk, dtype=np.float64)
+        index.tree = (
+            cKDTree(project_to_plane(index.lat, index.lng)) if len(index.lat) else None
+        )
+        index._positions = None
+        return index
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def zone_positions(self) -> Dict[int, int]:
+        """지역 dict 객체(id) → 인덱스 번호 (처음 호출 시 한 번 구성)
+
+        인덱스에서 골라낸 지역 목록을 다시 인덱스 번호로 되돌릴 때 사용
+        """
+        if self._positions is None:
+            self._positions = {id(zone): i for i, zone in enumerate(self.zones)}
+        return self._positions
+
+    def nearest(self, lat: float, lng: float) -> Tuple[Optional[Dict], float]:
+        """가장 가까운 위험지역과 거리(km) 반환"""
+        if self.tree is None:
+            return None, float("inf")
+
+        k = min(_NEAREST_CANDIDATES, len(self.zones))
+        _, idx = self.tree.query(project_to_plane(lat, lng), k=k)
+        # 같은 거리(중복 좌표)일 때는 등록 순서가 앞선 지역을 선택
+        idx = np.sort(np.atleast_1d(idx))
+
+        distances = haversine_km(lat, lng, self.lat[idx], self.lng[idx])
+        best = int(np.argmin(distances))
+        return self.zones[int(idx[best])], float(distances[best])
+
+    def nearest_many(self, lats, lngs) -> Tuple[np.ndarray, np.ndarray]:
+        """여러 지점의 최근접 위험지역 인덱스와 거리(km)를 한 번에 계산"""
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        if self.tree is None:
+            return (
+                np.full(lats.shape, -1, dtype=np.intp),
+                np.full(lats.shape, np.inf),
+            )
+
+        k = min(_NEAREST_CANDIDATES, len(self.zones))
+        _, idx = self.tree.query(project_to_plane(lats, lngs), k=k)
+        idx = np.sort(idx.reshape(lats.shape + (k,)), axis=-1)
+
+        distances = haversine_km(
+            lats[..., None], lngs[..., None], self.lat[idx], self.lng[idx]
+        )
+        best = np.argmin(distances, axis=-1)[..., None]
+        return (
+            np.take_along_axis(idx, best, axis=-1)[..., 0],
+            np.take_along_axis(distances, best, axis=-1)[..., 0],
+        )
+
+    def indices_within_radius(
+        self, lat: float, lng: float, radius_km: float
+    ) -> np.ndarray:
+        """반경(km) 내 위험지역 인덱스 반환 (등록 순서)"""
+        if self.tree is None:
+            return np.empty(0, dtype=np.intp)
+
+        # 투영 오차 여유를 두고 후보를 뽑은 뒤 하버사인으로 확정
+        idx = self.tree.query_ball_point(
+            project_to_plane(lat, lng), r=radius_km * 1.01 + 0.001
+        )
+        idx = np.sort(np.asarray(idx, dtype=np.intp))
+        if idx.size == 0:
+            return idx
+
+        distances = haversine_km(lat, lng, self.lat[idx], self.lng[idx])
+        return idx[distances <= radius_km]
+
+    def indices_in_bbox(
+        self, lat_min: float, lng_min: float, lat_max: float, lng_max: float
+    ) -> np.ndarray:
+        """위경도 범위(bbox) 내 인덱스 반환 (등록 순서)"""
+        if self.tree is None:
+            return np.empty(0, dtype=np.intp)
+
+        # bbox를 덮는 원으로 후보를 뽑은 뒤 좌표 범위로 확정
+        corners = project_to_plane([lat_min, lat_max], [lng_min, lng_max])
+        center = corners.mean(axis=0)
+        radius = float(np.linalg.norm(corners[1] - corners[0])) / 2
+        idx = self.tree.query_ball_point(center, r=radius * 1.01 + 0.001)
+        idx = np.sort(np.asarray(idx, dtype=np.intp))
+        if idx.size == 0:
+            return idx
+
+        lat, lng = self.lat[idx], self.lng[idx]
+        inside = (lat >= lat_min) & (lat <= lat_max) & (lng >= lng_min) & (lng <= lng_max)
+        return idx[inside]
+
+    def indices_near_polyline(self, path_lat, path_lng, radius_km: float) -> np.ndarray:
+        """경로(선분열)에서 radius_km 이내의 지역 인덱스 (등록 순서)"""
+        path_lat = np.asarray(path_lat, dtype=np.float64).ravel()
+        path_lng = np.asarray(path_lng, dtype=np.float64).ravel()
+        if self.tree is None or path_lat.size == 0:
+            return np.empty(0, dtype=np.intp)
+
+        # 선분 중점 기준 (반경 + 선분 길이/2) 원으로 후보를 뽑은 뒤 정확한 거리로 확정
+        path = project_to_plane(path_lat, path_lng)
+        if len(path) > 1:
+            centers = (path[:-1] + path[1:]) / 2
+            half_lengths = np.linalg.norm(path[1:] - path[:-1], axis=1) / 2
+        else:
+            centers, half_lengths = path, np.zeros(1)
+        candidate_lists = self.tree.query_ball_point(
+            centers, r=(radius_km + half_lengths) * 1.01 + 0.001
+        )
+        candidates = np.unique(
+            np.fromiter(
+                (i for group in candidate_lists for i in group), dtype=np.intp
+            )
+        )
+        if candidates.size == 0:
+            return candidates
+
+        distances = polyline_distances_km(
+            path_lat, path_lng, self.lat[candidates], self.lng[candidates]
+        )
+        return candidates[distances <= radius_km]
+
+    def within_radius(self, lat: float, lng: float, radius_km: float) -> List[Dict]:
+        """반경(km) 내 위험지역 목록 반환 (등록 순서)"""
+        return [self.zones[int(i)] for i in self.indices_within_radius(lat, lng, radius_km)]
+
+
+# 클러스터링 격자 한 칸의 화면 크기 (px). 줌 레벨별 경도 폭 = 360 / (256 * 2^zoom) * 값
+CLUSTER_CELL_PX = 64
+# 이 줌 레벨 이상에서는 개별 마커를 그대로 반환
+CLUSTER_MAX_ZOOM = 14
+
+
+def cluster_cell_deg(zoom: int) -> Tuple[float, float]:
+    """줌 레벨의 클러스터 격자 크기 (위도, 경도 단위 도)"""
+    lng_deg = 360.0 / (256 * 2 ** zoom) * CLUSTER_CELL_PX
+    # Web Mercator에서 같은 픽셀 높이는 위도 방향으로 cos(위도)배 짧음
+    return lng_deg * math.cos(math.radians(REFERENCE_LAT)), lng_deg
+
+
+def grid_clusters(
+    lat: np.ndarray, lng: np.ndarray, risk: np.ndarray, indices: np.ndarray, zoom: int
+) -> Tuple[List[Dict], np.ndarray]:
+    """격자 기반 서버측 클러스터링
+
+    같은 격자 칸에 2개 이상 있는 지점은 중심 좌표/개수/위험도 요약으로 묶고,
+    단독 지점의 인덱스는 그대로 돌려줌 (클러스터 목록, 단독 지점 인덱스)
+    """
+    indices = np.asarray(indices, dtype=np.intp)
+    if indices.size == 0:
+        return [], indices
+
+    cell_lat, cell_lng = cluster_cell_deg(zoom)
+    lat, lng, risk = lat[indices], lng[indices], risk[indices]
+    rows = np.floor(lat / cell_lat).astype(np.int64)
+    cols = np.floor(lng / cell_lng).astype(np.int64)
+    keys = rows * 1_000_000 + cols
+
+    _, cell_of, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    cell_of = cell_of.ravel()
+    n_cells = len(counts)
+    lat_mean = np.bincount(cell_of, weights=lat, minlength=n_cells) / counts
+    lng_mean = np.bincount(cell_of, weights=lng, minlength=n_cells) / counts
+    risk_mean = np.bincount(cell_of, weights=risk, minlength=n_cells) / counts
+    risk_max = np.full(n_cells, -np.inf)
+    np.maximum.at(risk_max, cell_of, risk)
+
+    clusters = [
+        {
+            "lat": round(float(lat_mean[c]), 6),
+            "lng": round(float(lng_mean[c]), 6),
+            "count": int(counts[c]),
+            "max_risk": round(float(risk_max[c]), 3),
+            "avg_risk": round(float(risk_mean[c]), 3),
+        }
+        for c in np.flatnonzero(counts > 1)
+    ]
+    singles = indices[counts[cell_of] == 1]
+    return clusters, singles
+
+
+def zones_near_polyline(
+    path_lat,
+    path_lng,
+    zones: List[Dict],
+    radius_km: float,
+    index: Optional[ZoneSpatialIndex] = None,
+) -> List[Dict]:
+    """경로에서 radius_km 이내를 지나가는 지역 목록 (입력 순서 유지)
+
+    index에 zones를 담고 있는 공용 인덱스(ZONE_INDEX 등)를 넘기면 그 KDTree로 한 번에
+    후보를 찾음. 인덱스에 없는 지역과 index가 없는 경우는 bbox 필터 + 선분 거리로 계산
+    """
+    if len(zones) == 0 or len(path_lat) == 0:
+        return []
+
+    if index is not None:
+        lookup = index.zone_positions()
+        positions = np.array([lookup.get(id(zone), -1) for zone in zones], dtype=np.intp)
+    else:
+        positions = np.full(len(zones), -1, dtype=np.intp)
+
+    crosses = np.zeros(len(zones), dtype=bool)
+    indexed = np.flatnonzero(positions >= 0)
+    if indexed.size:
+        near = index.indices_near_polyline(path_lat, path_lng, radius_km)
+        crosses[indexed] = np.isin(positions[indexed], near)
+
+    rest = np.flatnonzero(positions < 0)
+    if rest.size:
+        crosses[rest] = polyline_zone_mask(
+            path_lat,
+            path_lng,
+            [zones[i]["lat"] for i in rest],
+            [zones[i]["lng"] for i in rest],
+            radius_km,
+        )
+    return [zone for zone, hit in zip(zones, crosses) if hit]